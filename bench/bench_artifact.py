@@ -0,0 +1,118 @@
+"""
+Benchmark dos artefatos binários de análise (lsi_artifact).
+
+Verifica, em programas sintéticos válidos e com erros injetados, que o
+artefato lido do disco reproduz exatamente a análise: tokens, tabela de
+símbolos, AST, erro léxico, erro sintático e diagnósticos. Depois compara,
+para programas cada vez maiores:
+  * analyze: BytesLexer + Parser.parse_ast (o que o artefato substitui);
+  * save: gravação do artefato;
+  * load: leitura do artefato (tokens, sem nenhum objeto por token);
+  * load+ast: leitura e decodificação da AST;
+  * pickle: leitura de uma lista de Token serializada com pickle (referência).
+
+Uso:
+  python3 bench/bench_artifact.py [--functions 500,2000,8000] [--repeat R]
+"""
+
+import argparse
+import os
+import pickle
+import tempfile
+from dataclasses import replace
+
+from bench_suite import best_time
+from lsi_artifact import ARTIFACT_SUFFIX, Artifact, build_artifact
+from lsi_ast import Node
+from lsi_lexer import BytesLexer
+from lsi_parser import Parser
+from program_gen import SHAPES, generate
+
+
+def same_tokens(a, b):
+    return len(a) == len(b) and all(
+        list(getattr(a, f)) == list(getattr(b, f)) for f in ("kinds", "starts", "ends", "lines", "cols")
+    ) and all(a.lexeme(i) == b.lexeme(i) for i in range(len(a)))
+
+
+def same_ast(a, b):
+    # comparação sem recursão (Node.__eq__ recursivo não suporta as
+    # expressões profundas do formato "long-expr")
+    stack = [(a, b)]
+    while stack:
+        x, y = stack.pop()
+        if isinstance(x, list):
+            if not isinstance(y, list) or len(x) != len(y):
+                return False
+            stack.extend(zip(x, y))
+        elif isinstance(x, Node):
+            if type(x) is not type(y) or (x.line, x.col) != (y.line, y.col):
+                return False
+            stack.extend((getattr(x, f), getattr(y, f)) for f in x._fields)
+        elif x != y or type(x) is not type(y):
+            return False
+    return True
+
+
+def check(parser, seeds, tmp):
+    path = os.path.join(tmp, "check.lsi")
+    n = 0
+    for seed in seeds:
+        for shape in SHAPES.values():
+            for lexical, syntax in ((0, 0), (0, 3), (1, 0)):
+                text = generate(seed, replace(shape, functions=min(shape.functions, 30)), lexical, syntax)
+                data = text.encode()
+                built = build_artifact(data, parser)
+                built.save(path + ARTIFACT_SUFFIX)
+                loaded = Artifact.load(path + ARTIFACT_SUFFIX, data)
+                assert loaded.source_hash == built.source_hash
+                assert str(loaded.lexical_error) == str(built.lexical_error)
+                assert loaded.syntax_error == built.syntax_error
+                assert loaded.diagnostics == built.diagnostics
+                if built.tokens is not None:
+                    assert same_tokens(loaded.tokens, built.tokens)
+                    assert list(loaded.symbol_table) == list(built.symbol_table)
+                    assert same_ast(loaded.ast(), built.ast())
+                    assert parser.parse_recover(loaded.tokens) == built.diagnostics
+                n += 1
+    print(f"{n} programas: artefato igual à análise completa")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--functions", default="500,2000,8000", help="quantidades de funções")
+    ap.add_argument("--repeat", type=int, default=3, help="repetições (vale o menor tempo)")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    parser = Parser()
+    with tempfile.TemporaryDirectory() as tmp:
+        check(parser, range(args.seed, args.seed + 5), tmp)
+
+        print(f"{'funções':>8} {'tokens':>9} {'MB':>6} {'analyze':>10} {'save':>10} {'load':>10} "
+              f"{'load+ast':>10} {'pickle':>10}")
+        for n in map(int, args.functions.split(",")):
+            data = generate(args.seed, replace(SHAPES["balanced"], functions=n)).encode()
+            path = os.path.join(tmp, f"prog_{n}.lsi")
+            pickled = os.path.join(tmp, f"prog_{n}.pickle")
+
+            t_analyze, artifact = best_time(args.repeat, lambda: build_artifact(data, parser))
+            t_save, _ = best_time(args.repeat, lambda: artifact.save(path + ARTIFACT_SUFFIX))
+            t_load, _ = best_time(args.repeat, lambda: Artifact.load(path + ARTIFACT_SUFFIX, data))
+            t_ast, _ = best_time(args.repeat, lambda: Artifact.load(path + ARTIFACT_SUFFIX, data).ast())
+
+            with open(pickled, "wb") as f:
+                pickle.dump(list(BytesLexer(data).tokenize_all()[0]), f)
+
+            def unpickle():
+                with open(pickled, "rb") as f:
+                    return pickle.load(f)
+            t_pickle, _ = best_time(args.repeat, unpickle)
+
+            size = os.path.getsize(path + ARTIFACT_SUFFIX) / 2**20
+            print(f"{n:8} {len(artifact.tokens):9} {size:6.1f} " + " ".join(
+                f"{t * 1000:7.1f} ms" for t in (t_analyze, t_save, t_load, t_ast, t_pickle)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark de escalabilidade da análise em lote (lsi_batch).
+
+Gera um corpus temporário de arquivos .lsi (cópias dos arquivos de tests/,
+válidos e com erros) e mede a vazão de run_batch para 1, 2, 4, ... processos,
+até o número de CPUs, com o speedup em relação a um processo.
+
+Uso:
+  python3 bench/bench_batch.py [--files N] [--copies C] [--jobs J ...]
+"""
+
+import argparse
+import glob
+import os
+import tempfile
+import time
+
+from bench_utils import ROOT, scaled_sample
+from lsi_batch import expand_inputs, run_batch
+
+
+def make_corpus(directory, n_files, copies):
+    """
+    Cria `n_files` arquivos em `directory`: a maioria programas válidos de
+    `copies` cópias da amostra, e um a cada dez copiado de tests/*.lsi.
+    """
+    valid = scaled_sample(copies)
+    samples = []
+    for path in sorted(glob.glob(os.path.join(ROOT, "tests", "*.lsi"))):
+        with open(path) as f:
+            samples.append(f.read())
+
+    for i in range(n_files):
+        text = samples[(i // 10) % len(samples)] if i % 10 == 0 else valid
+        with open(os.path.join(directory, f"f{i:05d}.lsi"), "w") as f:
+            f.write(text)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--files", type=int, default=2000, help="arquivos no corpus")
+    ap.add_argument("--copies", type=int, default=4,
+                    help="cópias de tests/correct_50_lines.lsi por arquivo válido")
+    ap.add_argument("--jobs", type=int, nargs="+", default=None,
+                    help="números de processos a medir (padrão: 1, 2, 4, ... CPUs)")
+    args = ap.parse_args()
+
+    cpus = os.cpu_count() or 1
+    jobs_list = args.jobs
+    if jobs_list is None:
+        jobs_list, j = [], 1
+        while j < cpus:
+            jobs_list.append(j)
+            j *= 2
+        jobs_list.append(cpus)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        make_corpus(tmp, args.files, args.copies)
+        files = expand_inputs([tmp])
+        print(f"corpus: {len(files)} arquivos, CPUs: {cpus}")
+        print(f"{'processos':>9} {'tempo (s)':>10} {'arquivos/s':>11} {'speedup':>8}")
+
+        base = None
+        for jobs in jobs_list:
+            t0 = time.perf_counter()
+            n = sum(1 for _ in run_batch(files, jobs))
+            elapsed = time.perf_counter() - t0
+            base = base or elapsed
+            print(f"{jobs:9d} {elapsed:10.3f} {n / elapsed:11.0f} {base / elapsed:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Benchmark da análise incremental (lsi_incremental) contra a análise completa.
+
+Para programas sintéticos de tamanhos crescentes:
+  - aplica edições aleatórias (inserções e remoções de trechos e de linhas
+    inteiras do próprio programa) e verifica que os tokens, a AST e os erros
+    do IncrementalDocument são idênticos aos de uma nova análise léxica e
+    sintática do texto editado;
+  - em edições que mantêm o programa válido (troca de literais e linhas em
+    branco), otimiza cada AST devolvida (lsi_opt, que a modifica no próprio
+    lugar) e verifica que isso não altera as ASTs seguintes e que as ASTs já
+    devolvidas não mudam com as edições seguintes;
+  - compara a latência por edição dos dois caminhos em edições que mantêm o
+    programa válido (troca de um literal numérico), como ao digitar.
+
+Uso:
+  python3 bench/bench_incremental.py [--sizes 10,40,160] [--edits N] [--seed S]
+"""
+
+import argparse
+import random
+import time
+
+from bench_utils import scaled_sample
+from lsi_incremental import IncrementalDocument
+from lsi_lexer import TOKEN_CODES, LexerError, RegexLexer
+from lsi_opt import optimize
+from lsi_parser import Parser
+
+_FIELDS = ("kinds", "starts", "ends", "lines", "cols")
+
+
+def random_edit(rng, text):
+    """
+    Sorteia uma edição (offset, deleted, inserted) de `text`.
+    """
+    offset = rng.randrange(len(text) + 1)
+    choice = rng.random()
+    if choice < 0.4:
+        # pequena alteração de caracteres
+        deleted = min(rng.randrange(4), len(text) - offset)
+        inserted = rng.choice(["", "x", "1", " ", "\n", "+", "=", "(", ")", "{", "}", ";", "/"])
+    elif choice < 0.7:
+        # copia uma linha inteira de outro ponto do programa
+        lines = text.splitlines(keepends=True)
+        deleted = 0
+        inserted = rng.choice(lines) if lines else "\n"
+    else:
+        # remove um trecho
+        deleted = min(rng.randrange(40), len(text) - offset)
+        inserted = ""
+    return offset, deleted, inserted
+
+
+def literal_edit(rng, tokens):
+    """
+    Sorteia uma edição que troca um literal numérico de `tokens` por outro.
+    """
+    num = TOKEN_CODES["NUM"]
+    candidates = [i for i, kind in enumerate(tokens.kinds) if kind == num]
+    i = rng.choice(candidates)
+    return tokens.starts[i], tokens.ends[i] - tokens.starts[i], str(rng.randrange(1000))
+
+
+def valid_edit(rng, doc):
+    """
+    Sorteia uma edição que mantém o programa de `doc` válido: troca de um
+    literal numérico ou uma linha em branco no início de uma linha.
+    """
+    if rng.random() < 0.5:
+        return literal_edit(rng, doc.tokens)
+    text = doc.text
+    starts = [0] + [i + 1 for i, c in enumerate(text) if c == "\n"]
+    return rng.choice(starts), 0, "\n"
+
+
+def full_analysis(parser, text):
+    """
+    Analisa `text` do zero; retorna (TokenBuffer, AST ou mensagem de erro).
+    """
+    try:
+        tokens = RegexLexer(text).tokenize_all(as_buffer=True)[0]
+    except LexerError as e:
+        return None, f"léxico: {e}"
+    try:
+        return tokens, parser.parse_ast(tokens)
+    except Exception as e:
+        return tokens, f"sintático: {e}"
+
+
+def incremental_analysis(doc, edit):
+    """
+    Aplica `edit` a `doc`; retorna (TokenBuffer, AST ou mensagem de erro).
+    """
+    try:
+        doc.edit(*edit)
+    except LexerError as e:
+        return None, f"léxico: {e}"
+    try:
+        return doc.tokens, doc.parse_ast()
+    except Exception as e:
+        return doc.tokens, f"sintático: {e}"
+
+
+def same_tokens(a, b):
+    if a is None or b is None:
+        return a is b
+    return a.text == b.text and all(getattr(a, f) == getattr(b, f) for f in _FIELDS)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--sizes", default="10,40,160", help="quantidades de cópias de correct_50_lines.lsi")
+    ap.add_argument("--edits", type=int, default=200, help="edições por tamanho")
+    ap.add_argument("--seed", type=int, default=1, help="semente das edições")
+    args = ap.parse_args()
+
+    parser = Parser()
+    sizes = [int(n) for n in args.sizes.split(",")]
+
+    # Edições aleatórias: resultados idênticos aos da análise completa
+    for copies in sizes:
+        rng = random.Random(args.seed)
+        text = scaled_sample(copies)
+        doc = IncrementalDocument(text, parser)
+        for _ in range(args.edits):
+            edit = random_edit(rng, text)
+            offset, deleted, inserted = edit
+            text = text[:offset] + inserted + text[offset + deleted:]
+            got = incremental_analysis(doc, edit)
+            expected = full_analysis(parser, text)
+            assert doc.text == text
+            assert same_tokens(got[0], expected[0]), f"tokens divergem após a edição {edit!r}"
+            assert got[1] == expected[1], f"AST/erro divergem após a edição {edit!r}: {got[1]!r} != {expected[1]!r}"
+    print(f"{args.edits} edições aleatórias x {len(sizes)} tamanhos: resultados idênticos à análise completa")
+
+    # ASTs devolvidas modificadas pelo chamador: cada uma é otimizada, assim
+    # como a da análise completa, e as três anteriores devem continuar iguais
+    # às suas referências (linhas inclusive) depois das edições seguintes
+    rng = random.Random(args.seed)
+    text = scaled_sample(sizes[0])
+    doc = IncrementalDocument(text, parser)
+    previous = []
+    for _ in range(args.edits):
+        edit = valid_edit(rng, doc)
+        offset, deleted, inserted = edit
+        text = text[:offset] + inserted + text[offset + deleted:]
+        got = incremental_analysis(doc, edit)[1]
+        expected = full_analysis(parser, text)[1]
+        assert got == expected, f"AST diverge após a edição {edit!r}"
+        for old, reference in previous:
+            assert old == reference, f"AST devolvida antes foi alterada pela edição {edit!r}"
+        optimize(got)
+        optimize(expected)
+        previous = previous[-2:] + [(got, expected)]
+    print(f"{args.edits} edições válidas: ASTs devolvidas independentes entre si e das edições seguintes")
+
+    # Latência por edição em um programa que continua válido
+    print(f"{'cópias':>7} {'linhas':>7} {'completa':>12} {'incremental':>12} {'speedup':>8} {'reuso':>6}")
+    for copies in sizes:
+        rng = random.Random(args.seed)
+        text = scaled_sample(copies)
+        doc = IncrementalDocument(text, parser)
+        doc.parse_ast()
+
+        t_full = t_incr = 0.0
+        reused = total = 0
+        for _ in range(args.edits):
+            edit = literal_edit(rng, doc.tokens)
+            offset, deleted, inserted = edit
+            text = text[:offset] + inserted + text[offset + deleted:]
+
+            t0 = time.perf_counter()
+            got = incremental_analysis(doc, edit)
+            t_incr += time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            expected = full_analysis(parser, text)
+            t_full += time.perf_counter() - t0
+
+            assert got[1] == expected[1], f"AST diverge após a edição {edit!r}"
+            reused += doc.stats["reused"]
+            total += doc.stats["reused"] + doc.stats["reparsed"]
+
+        lines = text.count("\n") + 1
+        print(f"{copies:7} {lines:7} {t_full / args.edits * 1000:9.3f} ms {t_incr / args.edits * 1000:9.3f} ms "
+              f"{t_full / t_incr:7.1f}x {reused / total:6.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark dos motores de análise léxica: Lexer x RegexLexer x BytesLexer.
+
+Verifica, em entradas aleatórias (com comentários, erros léxicos,
+caracteres não-ASCII e '\\r'), que o RegexLexer e o BytesLexer produzem os
+mesmos tokens, tabela de símbolos e mensagens de erro que o Lexer original,
+e compara, para programas cada vez maiores:
+  * Lexer: o algoritmo caractere a caractere (referência);
+  * RegexLexer: tokenize_all() com a lista de Token;
+  * buffer: RegexLexer.tokenize_all(as_buffer=True) (TokenBuffer, linhas e
+    colunas adiadas);
+  * +posições: o mesmo, lendo também lines/cols;
+  * bytes: BytesLexer.tokenize_all(as_buffer=True) sobre os bytes;
+  * split: só as chamadas a re.split do SPLIT_PATTERN, sem nenhum outro
+    trabalho: o piso do tempo do buffer.
+
+Uso:
+  python3 bench/bench_lexer.py [--functions 500,2000,8000] [--repeat R]
+"""
+
+import argparse
+import random
+from dataclasses import replace
+
+from bench_suite import best_time
+from lsi_lexer import SPLIT_PATTERN, BytesLexer, Lexer, LexerError, RegexLexer, decode_source
+from program_gen import SHAPES, generate
+
+_PIECES = list("abcxyz_019 \n\t+-*/=(){},;<>!") + [
+    "//", "if", "def", "int", "==", " é", "²", "@", "$", "\x1c", "\xa0", "\r\n", "// ção\n",
+]
+
+
+def run(lexer, as_buffer):
+    # tokens (tipo, lexema, linha, coluna) e tabela de símbolos, ou o erro léxico
+    try:
+        tokens, symtab = lexer.tokenize_all(as_buffer)
+    except LexerError as e:
+        return str(e), e.line, e.col
+    return [(t.typ, t.lexeme, t.line, t.col) for t in tokens], list(symtab.items())
+
+
+def check(seed, n=20000):
+    rnd = random.Random(seed)
+    for _ in range(n):
+        text = "".join(rnd.choice(_PIECES) for _ in range(rnd.randint(0, 40)))
+        expected = run(Lexer(text), False)
+        for as_buffer in (False, True):
+            assert run(RegexLexer(text), as_buffer) == expected, repr(text)
+        data = text.encode()
+        expected = run(Lexer(decode_source(data)), False)
+        for as_buffer in (False, True):
+            assert run(BytesLexer(data), as_buffer) == expected, repr(text)
+    print(f"{n} entradas aleatórias: tokens e erros iguais aos do Lexer")
+
+
+def split_only(text, chunk=1 << 16):
+    return [SPLIT_PATTERN.split(text[i:i + chunk]) for i in range(0, len(text), chunk)]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--functions", default="500,2000,8000", help="quantidades de funções")
+    ap.add_argument("--repeat", type=int, default=3, help="repetições (vale o menor tempo)")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    check(args.seed)
+
+    modes = ("RegexLexer", "buffer", "+posições", "bytes", "split")
+    print(f"{'funções':>8} {'tokens':>9} {'MB':>5} {'Lexer':>9} " + " ".join(f"{m:>16}" for m in modes))
+    for n in map(int, args.functions.split(",")):
+        text = generate(args.seed, replace(SHAPES["balanced"], functions=n))
+        data = text.encode()
+
+        def positions():
+            tokens, _ = RegexLexer(text).tokenize_all(as_buffer=True)
+            return tokens.lines, tokens.cols
+
+        t_ref, (tokens, _) = best_time(1, lambda: Lexer(text).tokenize_all())
+        times = (
+            best_time(args.repeat, lambda: RegexLexer(text).tokenize_all())[0],
+            best_time(args.repeat, lambda: RegexLexer(text).tokenize_all(as_buffer=True))[0],
+            best_time(args.repeat, positions)[0],
+            best_time(args.repeat, lambda: BytesLexer(data).tokenize_all(as_buffer=True))[0],
+            best_time(args.repeat, lambda: split_only(text))[0],
+        )
+        print(f"{n:8} {len(tokens):9} {len(data) / 2**20:5.1f} {t_ref * 1000:6.0f} ms " + " ".join(
+            f"{t * 1000:6.0f} ms {t_ref / t:5.1f}x" for t in times))
+
+
+if __name__ == "__main__":
+    main()
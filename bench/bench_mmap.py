@@ -0,0 +1,88 @@
+"""
+Benchmark de memória: texto decodificado (str) x arquivo mapeado (mmap).
+
+Grava um programa sintético grande em um arquivo temporário (ou usa o arquivo
+informado) e o tokeniza de dois modos:
+  - open(path).read() + RegexLexer (o arquivo inteiro vira uma str);
+  - open_source(path) + BytesLexer (varredura direta sobre o mmap).
+Mede, com tracemalloc, o pico de memória alocada durante a leitura e a
+análise léxica, comparado ao tamanho dos tokens produzidos, e verifica que
+os dois modos produzem os mesmos tokens.
+
+Uso:
+  python3 bench/bench_mmap.py [--copies N] [arquivo.lsi]
+"""
+
+import argparse
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+from operator import eq
+
+from bench_utils import scaled_sample
+from lsi_lexer import BytesLexer, RegexLexer, open_source
+
+# starts/ends não são comparados: no mmap são deslocamentos de bytes
+_FIELDS = ("kinds", "lines", "cols")
+
+
+def read_text(path):
+    with open(path) as f:
+        return RegexLexer(f.read()).tokenize_all(as_buffer=True)[0]
+
+
+def read_mmap(path):
+    return BytesLexer(open_source(path)).tokenize_all(as_buffer=True)[0]
+
+
+def measure(load, path):
+    """
+    Executa `load(path)` e retorna (TokenBuffer, bytes de pico, segundos).
+
+    O tempo é medido em uma segunda execução, sem o tracemalloc.
+    """
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    tokens = load(path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    gc.collect()
+    t0 = time.perf_counter()
+    load(path)
+    return tokens, peak - base, time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("file", nargs="?", help="arquivo .lsi (padrão: amostra sintética)")
+    ap.add_argument("--copies", type=int, default=4000, help="cópias de correct_50_lines.lsi na amostra")
+    args = ap.parse_args()
+
+    path = args.file
+    if path is None:
+        fd, path = tempfile.mkstemp(suffix=".lsi")
+        with os.fdopen(fd, "w") as f:
+            f.write(scaled_sample(args.copies))
+    try:
+        size = os.path.getsize(path)
+        print(f"arquivo: {size / 2**20:.1f} MB")
+        results = []
+        for name, load in (("str + RegexLexer", read_text), ("mmap + BytesLexer", read_mmap)):
+            tokens, peak, elapsed = measure(load, path)
+            results.append(tokens)
+            print(f"  {name:20} pico {peak / 2**20:8.1f} MB  tokens {tokens.nbytes() / 2**20:7.1f} MB  "
+                  f"({peak / tokens.nbytes():.2f}x)  {elapsed:6.2f} s")
+        a, b = results
+        assert all(getattr(a, f) == getattr(b, f) for f in _FIELDS), "os TokenBuffers divergem"
+        assert all(map(eq, map(a.lexeme, range(len(a))), map(b.lexeme, range(len(b))))), "os lexemas divergem"
+        print(f"  {len(a)} tokens idênticos nos dois modos")
+    finally:
+        if args.file is None:
+            os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Benchmark e verificação diferencial do parser descendente recursivo gerado.
+
+1. Verificação: compara lsi_rd_parser (gerado por lsi_codegen) com
+   lsi_parser.Parser em tests/*.lsi e em programas aleatórios derivados da
+   GRAMMAR, com e sem mutações (tokens removidos, trocados ou inseridos), e em
+   entradas com milhares de `(` e `{` aninhados. Os dois devem aceitar as
+   mesmas entradas e reportar o mesmo erro.
+2. Benchmark: tempo de análise sintática de uma amostra grande (TokenBuffer)
+   nos dois parsers.
+
+Uso:
+  python3 bench/bench_rd_parser.py [--copies N] [--programs P] [--seed S] [arquivo.lsi]
+"""
+
+import argparse
+import glob
+import os
+import random
+import time
+
+from bench_utils import ROOT, load_source, random_derivation
+from lsi_codegen import load_parser
+from lsi_lexer import EOF_CODE, TOKEN_TYPES, LexerError, RegexLexer, Token
+from lsi_parser import GRAMMAR, KIND_TO_TERMINAL, Parser
+
+_CODES = {term: code for code, term in enumerate(KIND_TO_TERMINAL)}
+
+
+def outcome(parse, tokens):
+    """
+    Retorna True se `tokens` é aceito, ou a mensagem do erro sintático.
+    """
+    try:
+        return parse(tokens)
+    except Exception as e:
+        return str(e)
+
+
+def mutate(rng, codes):
+    """
+    Aplica uma mutação aleatória (remoção, troca ou inserção) aos códigos,
+    mantendo o EOF final.
+    """
+    body = list(codes[:-1])
+    op = rng.randrange(3)
+    pos = rng.randrange(len(body) + 1)
+    if op == 0 and body:
+        del body[min(pos, len(body) - 1)]
+    elif op == 1 and body:
+        body[min(pos, len(body) - 1)] = rng.randrange(1, len(KIND_TO_TERMINAL))
+    else:
+        body.insert(pos, rng.randrange(1, len(KIND_TO_TERMINAL)))
+    return body + [EOF_CODE]
+
+
+def as_tokens(codes):
+    """
+    Converte códigos de token em Tokens (entrada do Parser de tabela).
+    """
+    return [Token(TOKEN_TYPES[c], KIND_TO_TERMINAL[c], 1, 1) for c in codes]
+
+
+def deep_cases(depths=(500, 1500, 5000)):
+    """
+    Entradas com `(` e `{` aninhados além do limite de recursão do Python
+    (o parser gerado passa para o Parser de tabela), válidas e com um
+    fechamento a menos ou a mais.
+    """
+    cases = []
+    for n in depths:
+        for text in ("def f() { X = " + "(" * n + "1" + ")" * n + "; }",
+                     "def f() { X = " + "(" * n + "1" + ")" * (n - 1) + "; }",
+                     "def f() " + "{ " * n + "X = 1;" + " }" * n,
+                     "def f() " + "{ " * n + "X = 1;" + " }" * (n + 1),
+                     "def f() " + "{ if (1) " * n + "{ }" + " }" * n):
+            buf, _ = RegexLexer(text).tokenize_all(as_buffer=True)
+            cases.append(list(buf.kinds))
+    return cases
+
+
+def differential_check(rd, parser, programs, seed):
+    """
+    Compara os dois parsers; retorna (entradas verificadas, aceitas).
+    """
+    cases = []
+    for path in sorted(glob.glob(os.path.join(ROOT, "tests", "*.lsi"))):
+        with open(path) as f:
+            try:
+                buf, _ = RegexLexer(f.read()).tokenize_all(as_buffer=True)
+            except LexerError:
+                continue
+        cases.append(list(buf.kinds))
+
+    cases.extend(deep_cases())
+
+    rng = random.Random(seed)
+    for _ in range(programs):
+        codes = [_CODES[t] for t in random_derivation(rng, GRAMMAR, max_depth=rng.randint(4, 14))]
+        codes.append(EOF_CODE)
+        cases.append(codes)
+        for _ in range(3):
+            cases.append(mutate(rng, codes))
+
+    accepted = 0
+    for codes in cases:
+        expected = outcome(parser.parse, as_tokens(codes))
+        got = outcome(rd["parse_codes"], codes)
+        assert got == expected, f"divergência em {codes}: {got!r} != {expected!r}"
+        accepted += expected is True
+    return len(cases), accepted
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("file", nargs="?", help="arquivo .lsi (padrão: amostra sintética)")
+    ap.add_argument("--copies", type=int, default=2000,
+                    help="cópias de tests/correct_50_lines.lsi na amostra sintética")
+    ap.add_argument("--programs", type=int, default=2000,
+                    help="programas aleatórios na verificação diferencial")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    rd = load_parser()
+    parser = Parser()
+
+    n, accepted = differential_check(rd, parser, args.programs, args.seed)
+    print(f"verificação diferencial: {n} entradas ({accepted} aceitas), resultados idênticos")
+
+    text = load_source(args.file, args.copies)
+    buf, _ = RegexLexer(text).tokenize_all(as_buffer=True)
+    print(f"entrada: {len(buf)} tokens")
+
+    results = {}
+    for name, fn in (("Parser (tabela LL(1))", lambda: Parser().parse(buf)),
+                     ("lsi_rd_parser (gerado)", lambda: rd["parse"](buf))):
+        t0 = time.perf_counter()
+        fn()
+        results[name] = time.perf_counter() - t0
+        print(f"{name:24} {results[name]:8.3f} s")
+
+    base, fast = results.values()
+    print(f"speedup: {base / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark de escalabilidade da análise semântica (lsi_semantic).
+
+Mede o tempo de analyze sobre programas sintéticos com cada vez mais funções
+(formato "wide" do program_gen, cujos nomes sorteados produzem muitos erros
+semânticos) e reporta o custo por token, que deve ficar aproximadamente
+constante: a análise é uma única passada linear. Verifica também que as
+amostras válidas (cópias de correct_50_lines.lsi) não têm nenhum erro e têm
+todas as variáveis resolvidas.
+
+Uso:
+  python3 bench/bench_semantic.py [--functions 5000,10000,20000,40000] [--repeat R]
+"""
+
+import argparse
+from dataclasses import replace
+
+from bench_suite import best_time
+from bench_utils import scaled_sample
+from lsi_ast import Assign, Var, iter_children
+from lsi_lexer import RegexLexer
+from lsi_parser import Parser
+from lsi_semantic import analyze
+from program_gen import SHAPES, generate
+
+
+def load(text):
+    tokens, symtab = RegexLexer(text).tokenize_all(as_buffer=True)
+    return len(tokens), Parser().parse_ast(tokens), symtab
+
+
+def count_uses(program):
+    # Var e Assign da árvore (pilha explícita: as expressões podem ser fundas)
+    count, stack = 0, [program]
+    while stack:
+        node = stack.pop()
+        count += isinstance(node, (Var, Assign))
+        stack.extend(iter_children(node))
+    return count
+
+
+def check_valid(copies):
+    """
+    Analisa `copies` cópias de correct_50_lines.lsi e verifica que não há
+    erros e que todo Var/Assign foi resolvido.
+    """
+    _, program, symtab = load(scaled_sample(copies))
+    result = analyze(program, symtab)
+    assert result.ok, result.diagnostics[:5]
+    uses = count_uses(program)
+    assert len(result.bindings) == uses, (len(result.bindings), uses)
+    print(f"amostra válida ({copies} cópias): {uses} usos resolvidos, nenhum erro")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--functions", default="5000,10000,20000,40000", help="quantidades de funções")
+    ap.add_argument("--repeat", type=int, default=3, help="repetições (vale o menor tempo)")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    check_valid(200)
+
+    print(f"{'funções':>8} {'tokens':>9} {'erros':>7} {'tempo':>11} {'ns/token':>9}")
+    for n in map(int, args.functions.split(",")):
+        n_tokens, program, _ = load(generate(args.seed, replace(SHAPES["wide"], functions=n)))
+        seconds, result = best_time(args.repeat, lambda: analyze(program))
+        print(f"{n:8} {n_tokens:9} {len(result.diagnostics):7} {seconds * 1000:8.1f} ms "
+              f"{seconds / n_tokens * 1e9:9.0f}")
+
+
+if __name__ == "__main__":
+    main()
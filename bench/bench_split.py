@@ -0,0 +1,100 @@
+"""
+Benchmark da análise paralela de um único arquivo (lsi_split).
+
+Gera um programa sintético grande e:
+  - verifica que parse_parallel produz os mesmos tokens, tabela de símbolos
+    e diagnósticos que a análise sequencial (RegexLexer.tokenize_all +
+    Parser.parse_recover), no programa válido e em versões com erros
+    léxicos e sintáticos injetados, com vários números de pedaços;
+  - mede a vazão da análise sequencial e de parse_parallel com 1, 2, 4, ...
+    processos, até o número de CPUs, com o speedup em relação à sequencial.
+
+Uso:
+  python3 bench/bench_split.py [--functions N] [--jobs J ...] [--repeat R]
+"""
+
+import argparse
+import os
+import random
+from dataclasses import replace
+
+from bench_suite import best_time
+from lsi_lexer import LexerError, RegexLexer
+from lsi_parser import Parser
+from lsi_split import parse_parallel
+from program_gen import SHAPES, generate, inject_errors
+
+_FIELDS = ("kinds", "starts", "ends", "lines", "cols")
+
+
+def sequential(text, parser):
+    # como lsi_batch: parse rápido e, só em caso de erro, parse_recover
+    tokens, symtab = RegexLexer(text).tokenize_all(as_buffer=True)
+    try:
+        parser.parse(tokens)
+    except Exception:
+        return tokens, symtab, parser.parse_recover(tokens)
+    return tokens, symtab, []
+
+
+def outcome(fn, text):
+    # (tokens, tabela, diagnósticos) ou o erro léxico, comparáveis com ==
+    try:
+        tokens, symtab, diagnostics = fn(text)
+    except LexerError as e:
+        return ("lexical_error", str(e))
+    return ([getattr(tokens, f) for f in _FIELDS], list(symtab.items()), diagnostics)
+
+
+def check(text, seed, parser):
+    """
+    Compara parse_parallel com a análise sequencial em `text` e em versões
+    com erros injetados.
+    """
+    rng = random.Random(seed)
+    variants = [("válido", text)]
+    variants += [(f"{k} erro(s) sintático(s)", inject_errors(rng, text, syntax=k)) for k in (1, 5)]
+    variants += [("1 erro léxico", inject_errors(rng, text, lexical=1))]
+    for label, variant in variants:
+        expected = outcome(lambda t: sequential(t, parser), variant)
+        for pieces in (2, 7, 32):
+            got = outcome(lambda t: parse_parallel(t, jobs=1, pieces=pieces, parser=parser), variant)
+            assert got == expected, f"divergência: {label}, {pieces} pedaços"
+        print(f"  {label}: igual à análise sequencial")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--functions", type=int, default=20000, help="funções do programa gerado")
+    ap.add_argument("--jobs", type=int, nargs="+", default=None,
+                    help="números de processos a medir (padrão: 1, 2, 4, ... CPUs)")
+    ap.add_argument("--repeat", type=int, default=3, help="repetições (vale o menor tempo)")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    cpus = os.cpu_count() or 1
+    jobs_list = args.jobs
+    if jobs_list is None:
+        jobs_list, j = [], 1
+        while j < cpus:
+            jobs_list.append(j)
+            j *= 2
+        jobs_list.append(cpus)
+
+    parser = Parser()
+    text = generate(args.seed, replace(SHAPES["balanced"], functions=args.functions))
+    mb = len(text) / 2**20
+    print(f"programa: {args.functions} funções, {mb:.1f} MB, CPUs: {cpus}")
+
+    check(generate(args.seed, replace(SHAPES["balanced"], functions=200)), args.seed, parser)
+
+    print(f"{'modo':>14} {'tempo (s)':>10} {'MB/s':>8} {'speedup':>8}")
+    base, _ = best_time(args.repeat, lambda: sequential(text, parser))
+    print(f"{'sequencial':>14} {base:10.3f} {mb / base:8.2f} {1.0:8.2f}x")
+    for jobs in jobs_list:
+        elapsed, _ = best_time(args.repeat, lambda: parse_parallel(text, jobs=jobs, parser=parser))
+        print(f"{f'{jobs} processo(s)':>14} {elapsed:10.3f} {mb / elapsed:8.2f} {base / elapsed:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""
+Suíte de benchmarks do lexer e do parser sobre programas sintéticos.
+
+Gera programas com program_gen.py em vários formatos (muitas funções,
+aninhamento profundo, expressões longas...) e mede separadamente:
+  - tabelas: compute_first, compute_follow e build_table sobre a GRAMMAR;
+  - lex: Lexer.tokenize_all (caractere a caractere) e
+    RegexLexer.tokenize_all(as_buffer=True);
+  - parse: Parser.parse sobre o TokenBuffer (Parser.parse_recover se houver
+    erros sintáticos injetados).
+Para cada medição, reporta o tempo (menor de R execuções), tokens/s e o pico
+de memória (tracemalloc, em uma execução separada).
+
+Os resultados podem ser gravados como baseline (--save-baseline) e, nas
+execuções seguintes, comparados com ela: medições com menos tokens/s ou com
+mais memória por token que a baseline além da tolerância são marcadas como
+regressão, e o código de saída passa a ser 1. A comparação é recusada
+(código de saída 2) se a baseline foi gravada com outra escala, semente ou
+quantidade de erros injetados.
+
+Uso:
+  python3 bench/bench_suite.py [--shapes balanced,wide,...] [--scale F] [--repeat R]
+                               [--lexical-errors K] [--syntax-errors K]
+                               [--baseline ARQUIVO] [--save-baseline] [--tolerance T]
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from dataclasses import replace
+
+from bench_utils import ROOT
+from lsi_lexer import Lexer, LexerError, RegexLexer
+from lsi_parser import GRAMMAR, Parser, build_table, compute_first, compute_follow
+from program_gen import SHAPES, generate
+
+DEFAULT_BASELINE = os.path.join(ROOT, "bench", "baseline.json")
+BASELINE_VERSION = 1
+
+# Repetições das medições das tabelas (cada uma leva poucos ms)
+_TABLE_CALLS = 50
+
+
+def best_time(repeat, fn):
+    """
+    Executa `fn` `repeat` vezes; retorna (menor tempo, último resultado).
+    """
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def peak_memory(fn):
+    """
+    Retorna o pico de memória alocada (bytes) durante `fn()`.
+    """
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak - base
+
+
+def _expect_error(fn):
+    # mede também entradas com erro: o erro faz parte do trabalho medido
+    def run():
+        try:
+            return fn()
+        except Exception as e:
+            return e
+    return run
+
+
+def measure_tables(repeat):
+    """
+    Mede compute_first, compute_follow e build_table sobre a GRAMMAR.
+
+    Retorno:
+      dict: {nome da medição: {"seconds", "peak_bytes"}}
+    """
+    FIRST = compute_first(GRAMMAR)
+    FOLLOW = compute_follow(FIRST, GRAMMAR)
+    stages = {
+        "tabelas/compute_first": lambda: compute_first(GRAMMAR),
+        "tabelas/compute_follow": lambda: compute_follow(FIRST, GRAMMAR),
+        "tabelas/build_table": lambda: build_table(FIRST, FOLLOW, GRAMMAR),
+    }
+    results = {}
+    for name, fn in stages.items():
+        seconds, _ = best_time(repeat, lambda: [fn() for _ in range(_TABLE_CALLS)])
+        results[name] = {"seconds": seconds / _TABLE_CALLS, "peak_bytes": peak_memory(fn)}
+    return results
+
+
+def measure_program(label, text, repeat):
+    """
+    Mede a análise léxica e sintática de `text`.
+
+    Retorno:
+      dict: {nome da medição: {"seconds", "tokens", "tokens_per_s", "peak_bytes"}}
+    """
+    results = {}
+    try:
+        buf, _ = RegexLexer(text).tokenize_all(as_buffer=True)
+    except LexerError:
+        buf = None
+
+    stages = [
+        ("lex-lexer", _expect_error(lambda: Lexer(text).tokenize_all())),
+        ("lex-regex", _expect_error(lambda: RegexLexer(text).tokenize_all(as_buffer=True))),
+    ]
+    if buf is not None:
+        parser = Parser()
+        parse = _expect_error(lambda: parser.parse(buf))
+        stages.append(("parse", parse))
+        if parse() is not True:
+            stages.append(("parse-recover", lambda: parser.parse_recover(buf)))
+
+    n_tokens = len(buf) if buf is not None else 0
+    for stage, fn in stages:
+        seconds, _ = best_time(repeat, fn)
+        results[f"{label}/{stage}"] = {
+            "seconds": seconds,
+            "tokens": n_tokens,
+            "tokens_per_s": n_tokens / seconds if seconds and n_tokens else 0.0,
+            "peak_bytes": peak_memory(fn),
+        }
+    return results
+
+
+# Parâmetros que mudam os programas medidos: uma baseline só é comparável
+# com uma execução de mesma configuração (os formatos podem ser um
+# subconjunto, pois cada medição tem o nome do seu formato)
+CONFIG_KEYS = ("scale", "seed", "lexical_errors", "syntax_errors")
+
+
+class BaselineMismatch(Exception):
+    """
+    A baseline foi gravada com outra configuração (ver CONFIG_KEYS).
+    """
+
+
+def slowdown(cur, old):
+    """
+    Quantas vezes `cur` é mais lenta que `old`: pela vazão (tokens/s) nas
+    medições com tokens, pelo tempo nas demais (tabelas, entradas com erro
+    léxico).
+    """
+    if cur.get("tokens_per_s") and old.get("tokens_per_s"):
+        return old["tokens_per_s"] / cur["tokens_per_s"]
+    return cur["seconds"] / old["seconds"]
+
+
+def memory_growth(cur, old):
+    """
+    Retorna (razão, diferença em bytes) do pico de memória de `cur` sobre o
+    esperado pela baseline `old`: o mesmo pico por token nas medições com
+    tokens, o mesmo pico nas demais.
+    """
+    if cur.get("tokens") and old.get("tokens"):
+        expected = old["peak_bytes"] / old["tokens"] * cur["tokens"]
+    else:
+        expected = old["peak_bytes"]
+    return (cur["peak_bytes"] / expected if expected else 1.0), cur["peak_bytes"] - expected
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compara `results` com a baseline (de mesma configuração; ver
+    load_baseline). Vazão e memória por token são comparadas em vez de
+    tempo e memória absolutos.
+
+    Retorno:
+      dict: {nome da medição: lista de regressões (str)}
+    """
+    regressions = {}
+    for name, cur in results.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        found = []
+        ratio = slowdown(cur, old)
+        if ratio > 1 + tolerance:
+            found.append(f"tempo {ratio:.2f}x")
+        ratio, extra = memory_growth(cur, old)
+        if ratio > 1 + tolerance and extra > 64 * 1024:
+            found.append(f"memória {ratio:.2f}x")
+        if found:
+            regressions[name] = found
+    return regressions
+
+
+def load_baseline(path, config):
+    """
+    Lê a baseline de `path`; retorna {} se ela não existir ou for de outra
+    versão do formato.
+
+    Parâmetros:
+      config (dict): A configuração da execução atual.
+
+    Lança:
+      BaselineMismatch: Se a baseline foi gravada com outra configuração.
+    """
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    if data.get("version") != BASELINE_VERSION:
+        print(f"baseline {path} ignorada: versão {data.get('version')} (esperada {BASELINE_VERSION})",
+              file=sys.stderr)
+        return {}
+    saved = data.get("config", {})
+    differ = [f"{k}={saved.get(k)!r} (agora {config[k]!r})" for k in CONFIG_KEYS if saved.get(k) != config[k]]
+    if differ:
+        raise BaselineMismatch(f"baseline {path} gravada com outra configuração: {', '.join(differ)}")
+    return data["metrics"]
+
+
+def save_baseline(path, results, config):
+    data = {
+        "version": BASELINE_VERSION,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "config": config,
+        "metrics": results,
+    }
+    with open(path, "w") as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+        f.write("\n")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--shapes", default=",".join(SHAPES), help=f"formatos ({', '.join(SHAPES)})")
+    ap.add_argument("--scale", type=float, default=1.0, help="multiplica a quantidade de funções dos formatos")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--repeat", type=int, default=3, help="repetições (vale o menor tempo)")
+    ap.add_argument("--lexical-errors", type=int, default=0, help="erros léxicos injetados por programa")
+    ap.add_argument("--syntax-errors", type=int, default=0, help="erros sintáticos injetados por programa")
+    ap.add_argument("--baseline", default=DEFAULT_BASELINE, help="arquivo da baseline (JSON)")
+    ap.add_argument("--save-baseline", action="store_true", help="grava os resultados como a nova baseline")
+    ap.add_argument("--tolerance", type=float, default=0.25,
+                    help="piora relativa tolerada antes de marcar regressão (padrão: 0.25)")
+    args = ap.parse_args()
+
+    shapes = args.shapes.split(",")
+    unknown = [s for s in shapes if s not in SHAPES]
+    if unknown:
+        ap.error(f"formato(s) desconhecido(s): {', '.join(unknown)}")
+
+    config = {k: getattr(args, k) for k in ("shapes",) + CONFIG_KEYS}
+    try:
+        baseline = {} if args.save_baseline else load_baseline(args.baseline, config)
+    except BaselineMismatch as e:
+        ap.exit(2, f"{e}\nuse os mesmos parâmetros ou grave uma nova baseline (--save-baseline)\n")
+
+    results = measure_tables(args.repeat)
+    for name in shapes:
+        shape = SHAPES[name]
+        shape = replace(shape, functions=max(1, round(shape.functions * args.scale)))
+        label = name
+        if args.lexical_errors or args.syntax_errors:
+            label += f"+erros({args.lexical_errors},{args.syntax_errors})"
+        text = generate(args.seed, shape, args.lexical_errors, args.syntax_errors)
+        results.update(measure_program(label, text, args.repeat))
+
+    regressions = compare(results, baseline, args.tolerance)
+
+    print(f"{'medição':38} {'tokens':>8} {'tempo':>11} {'tokens/s':>11} {'pico':>9}  baseline")
+    for name, r in results.items():
+        tokens = f"{r['tokens']:8}" if "tokens" in r else f"{'':8}"
+        rate = f"{r['tokens_per_s']:11,.0f}" if r.get("tokens_per_s") else f"{'':11}"
+        old = baseline.get(name)
+        if name in regressions:
+            status = "REGRESSÃO: " + ", ".join(regressions[name])
+        elif old is not None:
+            status = f"ok ({slowdown(r, old):.2f}x)"
+        else:
+            status = "-"
+        print(f"{name:38} {tokens} {r['seconds'] * 1000:8.3f} ms {rate} {r['peak_bytes'] / 2**20:6.2f} MB  {status}")
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results, config)
+        print(f"baseline gravada em {args.baseline}")
+    elif regressions:
+        print(f"{len(regressions)} regressão(ões) em relação a {args.baseline}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
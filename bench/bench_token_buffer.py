@@ -0,0 +1,65 @@
+"""
+Benchmark de memória: lista de Tokens x TokenBuffer.
+
+Mede, com tracemalloc, a memória retida pelo resultado de tokenize_all() e o
+pico durante a análise, para a lista de dataclasses Token e para o TokenBuffer
+(as_buffer=True).
+
+Uso:
+  python3 bench/bench_token_buffer.py [--copies N] [arquivo.lsi]
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+
+from bench_utils import load_source
+from lsi_lexer import Lexer, RegexLexer
+
+
+def measure(lexer_cls, text, as_buffer):
+    """
+    Tokeniza `text` e retorna (n_tokens, bytes retidos, bytes de pico, segundos).
+    """
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    t0 = time.perf_counter()
+    tokens, _ = lexer_cls(text).tokenize_all(as_buffer=as_buffer)
+    elapsed = time.perf_counter() - t0
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    n = len(tokens)
+    del tokens
+    return n, current - base, peak - base, elapsed
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("file", nargs="?", help="arquivo .lsi (padrão: amostra sintética)")
+    ap.add_argument("--copies", type=int, default=2000,
+                    help="cópias de tests/correct_50_lines.lsi na amostra sintética")
+    args = ap.parse_args()
+
+    text = load_source(args.file, args.copies)
+    print(f"entrada: {len(text)} caracteres")
+    print(f"{'modo':32} {'tokens':>9} {'retido (MB)':>12} {'pico (MB)':>10} {'B/token':>8} {'tempo (s)':>10}")
+
+    results = {}
+    for name, cls, as_buffer in (
+        ("Lexer / list[Token]", Lexer, False),
+        ("RegexLexer / list[Token]", RegexLexer, False),
+        ("RegexLexer / TokenBuffer", RegexLexer, True),
+    ):
+        n, kept, peak, elapsed = measure(cls, text, as_buffer)
+        results[name] = kept
+        print(f"{name:32} {n:9d} {kept / 2**20:12.1f} {peak / 2**20:10.1f} "
+              f"{kept / n:8.1f} {elapsed:10.3f}")
+
+    ratio = results["RegexLexer / list[Token]"] / results["RegexLexer / TokenBuffer"]
+    print(f"redução de memória retida com TokenBuffer: {ratio:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
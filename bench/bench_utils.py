@@ -0,0 +1,123 @@
+"""
+Utilitários compartilhados pelos benchmarks de bench/.
+
+Ao ser importado, coloca src/ no sys.path para que os módulos do compilador
+(lsi_lexer, lsi_parser, ...) possam ser importados como em run.sh.
+"""
+
+import os
+import re
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, "src")
+SAMPLE = os.path.join(ROOT, "tests", "correct_50_lines.lsi")
+
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
+
+_FUNCTION_NAMES = re.compile(r"\b(fatorial|fibonacci|principal)\b")
+
+
+def scaled_sample(copies):
+    """
+    Gera um programa LSI válido replicando tests/correct_50_lines.lsi.
+
+    As funções de cada cópia são renomeadas (fatorial_0, fatorial_1, ...) para
+    que o resultado continue sendo um programa com nomes distintos.
+
+    Parâmetros:
+      copies (int): Quantidade de cópias do arquivo de exemplo.
+
+    Retorno:
+      str: O código-fonte gerado.
+    """
+    with open(SAMPLE) as f:
+        src = f.read()
+    return "\n".join(_FUNCTION_NAMES.sub(rf"\1_{i}", src) for i in range(copies))
+
+
+def load_source(path, copies):
+    """
+    Retorna o conteúdo de `path`, ou um programa sintético de `copies` cópias
+    se nenhum arquivo for informado.
+    """
+    if path:
+        with open(path) as f:
+            return f.read()
+    return scaled_sample(copies)
+
+
+def shortest_productions(grammar, eps="epsilon"):
+    """
+    Retorna, para cada Não-Terminal, a produção com a menor derivação
+    possível (em número de terminais), calculada por ponto fixo.
+
+    Parâmetros:
+      grammar (dict): A gramática ({Não-Terminal: [produções]}).
+      eps (str): O símbolo da produção vazia.
+
+    Retorno:
+      dict: {Não-Terminal: produção}
+    """
+    shortest = {A: None for A in grammar}
+
+    def prod_len(prod):
+        total = 0
+        for X in prod:
+            if X == eps:
+                continue
+            if X in grammar:
+                if shortest[X] is None:
+                    return None
+                total += shortest[X]
+            else:
+                total += 1
+        return total
+
+    changed = True
+    while changed:
+        changed = False
+        for A, prods in grammar.items():
+            for prod in prods:
+                n = prod_len(prod)
+                if n is not None and (shortest[A] is None or n < shortest[A]):
+                    shortest[A] = n
+                    changed = True
+
+    return {A: min(prods, key=lambda p: prod_len(p) if prod_len(p) is not None else 1 << 30)
+            for A, prods in grammar.items()}
+
+
+def random_derivation(rng, grammar, start="MAIN", max_depth=12):
+    """
+    Gera uma sentença aleatória (lista de terminais) derivada de `grammar`.
+
+    Até `max_depth` níveis de expansão, as produções são sorteadas
+    uniformemente; abaixo disso, escolhe-se a produção com a menor derivação
+    possível, garantindo que a sentença termine.
+
+    Parâmetros:
+      rng (random.Random): Gerador de números aleatórios.
+      grammar (dict): A gramática ({Não-Terminal: [produções]}).
+      start (str): O símbolo inicial.
+      max_depth (int): Profundidade a partir da qual as derivações encurtam.
+
+    Retorno:
+      list: Os terminais da sentença (sem EPS).
+    """
+    eps = "epsilon"
+    shortest = shortest_productions(grammar, eps)
+
+    out = []
+    stack = [(start, 0)]
+    while stack:
+        X, depth = stack.pop()
+        if X == eps:
+            continue
+        if X not in grammar:
+            out.append(X)
+            continue
+        prod = rng.choice(grammar[X]) if depth < max_depth else shortest[X]
+        stack.extend((Y, depth + 1) for Y in reversed(prod))
+    return out
@@ -0,0 +1,123 @@
+"""
+Benchmark da VM de bytecode (lsi_vm) contra o interpretador sobre a AST
+(lsi_interp).
+
+Executa fibonacci(N) e K chamadas de fatorial(M) de tests/correct_50_lines.lsi
+(ou de um arquivo informado) nos dois executores, verifica que os resultados e
+as saídas de `print` do programa são idênticos e compara os tempos. Por fim,
+executa fibonacci(F) com memoização das funções puras (--memo) nos dois.
+
+Uso:
+  python3 bench/bench_vm.py [--fib N] [--fact M] [--fact-calls K] [--memo-fib F] [--repeat R] [arquivo.lsi]
+"""
+
+import argparse
+import io
+import os
+import time
+
+from bench_utils import ROOT, SAMPLE
+from lsi_interp import Interpreter, InterpreterError, MemoCache, load_program
+from lsi_vm import compile_program, execute
+
+
+def best_of(repeat, fn):
+    """
+    Executa `fn` `repeat` vezes; retorna (menor tempo, último resultado).
+    """
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def run_both(program):
+    """
+    Executa `principal` de `program` nos dois executores; retorna, para
+    cada um, (saída do print, (mensagem, linha, coluna) do erro ou None).
+    """
+    results = []
+    for run in (lambda out: Interpreter(program, out).run(),
+                lambda out: execute(compile_program(program), out=out)):
+        out = io.StringIO()
+        try:
+            run(out)
+            error = None
+        except InterpreterError as e:
+            error = (str(e), e.line, e.col)
+        results.append((out.getvalue(), error))
+    return results
+
+
+def check_div_order():
+    """
+    Os operandos de '/' são avaliados da esquerda para a direita nos dois
+    executores: mesmas saídas (os dois operandos têm print) e a mesma posição
+    da divisão por zero (tests/div_order.lsi).
+    """
+    with open(os.path.join(ROOT, "tests", "div_order.lsi")) as f:
+        interp, vm = run_both(load_program(f.read()))
+    assert interp == vm, f"div_order.lsi diverge: {interp} != {vm}"
+    assert interp[0].split() == ["10", "2", "5", "7", "0"], interp
+    assert interp[1] is not None and interp[1][1:] == (16, 21), interp
+    print("div_order.lsi: mesma ordem de avaliação e mesmo erro nos dois executores")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("file", nargs="?", default=SAMPLE, help="arquivo .lsi (padrão: correct_50_lines.lsi)")
+    ap.add_argument("--fib", type=int, default=24, help="argumento de fibonacci")
+    ap.add_argument("--fact", type=int, default=300, help="argumento de fatorial")
+    ap.add_argument("--fact-calls", type=int, default=200, help="chamadas de fatorial por medição")
+    ap.add_argument("--memo-fib", type=int, default=80, help="argumento de fibonacci com memoização")
+    ap.add_argument("--repeat", type=int, default=3, help="repetições (vale o menor tempo)")
+    args = ap.parse_args()
+
+    check_div_order()
+
+    with open(args.file) as f:
+        program = load_program(f.read())
+
+    t0 = time.perf_counter()
+    bytecode = compile_program(program)
+    print(f"compilação para bytecode: {(time.perf_counter() - t0) * 1000:.2f} ms, "
+          f"{len(bytecode.code)} palavras, {len(bytecode.consts)} constantes")
+
+    # Saída do programa completo (principal) nos dois executores
+    out_interp, out_vm = io.StringIO(), io.StringIO()
+    Interpreter(program, out_interp).run()
+    execute(bytecode, out=out_vm)
+    assert out_interp.getvalue() == out_vm.getvalue(), "saídas de principal divergem"
+
+    workloads = (("fibonacci", args.fib, 1), ("fatorial", args.fact, args.fact_calls))
+    for entry, n, calls in workloads:
+        interp = Interpreter(program, io.StringIO())
+        t_interp, r_interp = best_of(
+            args.repeat, lambda: [interp.run(entry, (n,)) for _ in range(calls)][-1])
+        t_vm, r_vm = best_of(
+            args.repeat, lambda: [execute(bytecode, entry, (n,), io.StringIO()) for _ in range(calls)][-1])
+        assert r_interp == r_vm, f"{entry}({n}): {r_interp} != {r_vm}"
+
+        print(f"{entry}({n})" + (f" x {calls}:" if calls > 1 else ":"))
+        print(f"  {'Interpreter (AST)':20} {t_interp:8.3f} s")
+        print(f"  {'VM (bytecode)':20} {t_vm:8.3f} s")
+        print(f"  speedup: {t_interp / t_vm:.2f}x")
+
+    n = args.memo_fib
+    print(f"fibonacci({n}) com memoização:")
+    results = []
+    for name, run in (
+        ("Interpreter (AST)", lambda memo: Interpreter(program, io.StringIO(), memo).run("fibonacci", (n,))),
+        ("VM (bytecode)", lambda memo: execute(bytecode, "fibonacci", (n,), io.StringIO(), memo)),
+    ):
+        memo = MemoCache()
+        t0 = time.perf_counter()
+        results.append(run(memo))
+        print(f"  {name:20} {time.perf_counter() - t0:8.4f} s  ({memo.stats()})")
+    assert results[0] == results[1], f"fibonacci({n}) com memo: {results[0]} != {results[1]}"
+
+
+if __name__ == "__main__":
+    main()
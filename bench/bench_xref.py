@@ -0,0 +1,101 @@
+"""
+Benchmark do índice de referências cruzadas (lsi_xref).
+
+Verifica, em programas sintéticos, que as ocorrências do índice são
+exatamente as da AST (FuncDef, parâmetros e VarDecl como definições; Var,
+Assign e Call como usos) e compara, para programas cada vez maiores:
+  * parse: Parser.parse sobre os tokens (referência);
+  * xref: Parser.parse_xref (a mesma passada, registrando as ocorrências);
+  * build: análise léxica + parse_xref + gravação do índice;
+  * load: leitura do índice gravado (sem análise léxica);
+  * query: consulta às definições e aos usos de todos os nomes.
+
+Uso:
+  python3 bench/bench_xref.py [--functions 500,2000,8000] [--repeat R]
+"""
+
+import argparse
+import os
+import tempfile
+from dataclasses import replace
+
+from bench_suite import best_time
+from lsi_ast import Assign, Call, FuncDef, Var, VarDecl, iter_children
+from lsi_lexer import RegexLexer
+from lsi_parser import Parser
+from lsi_xref import XREF_SUFFIX, load_or_build
+from program_gen import SHAPES, generate
+
+
+def ast_occurrences(program):
+    # (nome, tipo, linha, coluna) de cada ocorrência de identificador da AST
+    out, stack = [], [program]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, FuncDef):
+            out.append((node.name, "function", node.line, node.col))
+            out.extend((p.name, "param", p.line, p.col) for p in node.params)
+        elif isinstance(node, VarDecl):
+            out.extend((i.name, "var", i.line, i.col) for i in node.names)
+        elif isinstance(node, (Var, Assign, Call)):
+            out.append((node.name, "use", node.line, node.col))
+        stack.extend(iter_children(node))
+    return sorted(out)
+
+
+def index_occurrences(index):
+    return sorted((name, kind, line, col)
+                  for name in index.names
+                  for kind, _, line, col in index.definitions(name) + index.uses(name))
+
+
+def check(parser, seeds):
+    for seed in seeds:
+        for shape in SHAPES.values():
+            text = generate(seed, replace(shape, functions=min(shape.functions, 50)))
+            tokens, _ = RegexLexer(text).tokenize_all(as_buffer=True)
+            expected = ast_occurrences(parser.parse_ast(tokens))
+            got = index_occurrences(parser.parse_xref(tokens))
+            assert got == expected, (seed, shape)
+    print(f"{len(seeds) * len(SHAPES)} programas: índice igual às ocorrências da AST")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--functions", default="500,2000,8000", help="quantidades de funções")
+    ap.add_argument("--repeat", type=int, default=3, help="repetições (vale o menor tempo)")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    parser = Parser()
+    check(parser, range(args.seed, args.seed + 10))
+
+    print(f"{'funções':>8} {'tokens':>9} {'parse':>9} {'xref':>9} {'build':>9} {'load':>9} {'query':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in map(int, args.functions.split(",")):
+            path = os.path.join(tmp, f"prog_{n}.lsi")
+            with open(path, "w") as f:
+                f.write(generate(args.seed, replace(SHAPES["balanced"], functions=n)))
+            with open(path) as f:
+                tokens, _ = RegexLexer(f.read()).tokenize_all(as_buffer=True)
+
+            t_parse, _ = best_time(args.repeat, lambda: parser.parse(tokens))
+            t_xref, _ = best_time(args.repeat, lambda: parser.parse_xref(tokens))
+
+            def build():
+                if os.path.exists(path + XREF_SUFFIX):
+                    os.remove(path + XREF_SUFFIX)
+                return load_or_build(path, parser)
+            t_build, (index, cached) = best_time(args.repeat, build)
+            assert not cached
+            t_load, (loaded, cached) = best_time(args.repeat, lambda: load_or_build(path, parser))
+            assert cached and index_occurrences(loaded) == index_occurrences(index)
+            t_query, _ = best_time(args.repeat,
+                                   lambda: [(loaded.definitions(x), loaded.uses(x)) for x in loaded.names])
+
+            print(f"{n:8} {len(tokens):9} " + " ".join(
+                f"{t * 1000:6.1f} ms" for t in (t_parse, t_xref, t_build, t_load, t_query)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""
+Gerador de programas LSI sintéticos derivados da GRAMMAR.
+
+Os programas são derivações aleatórias da gramática, guiadas por um formato
+(Shape): quantidade de funções, comandos por bloco, profundidade máxima de
+aninhamento de blocos/`if`, tamanho e profundidade das expressões. Os
+terminais são escritos como código-fonte formatado (um comando por linha,
+blocos indentados). Opcionalmente, erros léxicos ou sintáticos são
+injetados no texto.
+
+Uso:
+  python3 bench/program_gen.py [--shape NOME] [--functions N] [--seed S]
+                               [--lexical-errors K] [--syntax-errors K] > programa.lsi
+"""
+
+import argparse
+import random
+import sys
+from dataclasses import dataclass, replace
+
+from bench_utils import shortest_productions
+from lsi_lexer import RegexLexer
+from lsi_parser import EPS, GRAMMAR
+
+
+@dataclass(frozen=True)
+class Shape:
+    """
+    Formato dos programas gerados.
+
+    Atributos:
+      functions (int): Quantidade de funções (FDEF).
+      statements (float): Média de comandos por bloco.
+      nesting (int): Profundidade máxima de blocos aninhados (`if`, `{}`).
+      blocks (int): Máximo de comandos de bloco (`if`, `{}`) por função.
+      block_share (float): Probabilidade de um comando ser de bloco, quando
+        permitido.
+      expr_terms (float): Média de operandos por nível de expressão.
+      expr_size (int): Máximo de operandos por expressão completa.
+      expr_depth (int): Profundidade máxima de parênteses e chamadas.
+      params (float): Média de parâmetros por função e de argumentos por
+        chamada.
+    """
+    functions: int = 100
+    statements: float = 4.0
+    nesting: int = 3
+    blocks: int = 4
+    block_share: float = 0.25
+    expr_terms: float = 2.0
+    expr_size: int = 8
+    expr_depth: int = 2
+    params: float = 1.5
+
+
+# Formatos predefinidos (ver bench_suite.py)
+SHAPES = {
+    "balanced": Shape(),
+    "wide": Shape(functions=2000, statements=2.0, nesting=1, blocks=1, expr_terms=1.5, expr_size=4, expr_depth=1),
+    "deep": Shape(functions=20, statements=2.0, nesting=100, blocks=100, block_share=0.9, expr_size=4),
+    "long-expr": Shape(functions=40, statements=2.0, nesting=1, blocks=1, expr_terms=30.0, expr_size=400,
+                       expr_depth=4),
+}
+
+# Não-Terminais cuja expansão é decidida pelo formato (os demais: sorteio)
+_LOOP_TAILS = {"EXPR_TAIL", "NUMEXPR_TAIL", "TERM_TAIL"}
+_LIST_HEADS = {"PARLIST", "PARLIST_TAIL", "PARLISTCALL", "PARLISTCALL_TAIL", "VARLIST_TAIL"}
+_BLOCK_STMTS = {"IFSTMT", "LBRACE"}
+
+_EXIT = object()  # marcador de saída de um Não-Terminal na pilha
+
+_LEXEMES = {
+    "def": "def", "int": "int", "if": "if", "else": "else", "print": "print", "return": "return",
+    "PLUS": "+", "MINUS": "-", "TIMES": "*", "DIV": "/", "EQUAL": "=",
+    "LPAREN": "(", "RPAREN": ")", "LBRACE": "{", "RBRACE": "}", "COMMA": ",", "SEMI": ";",
+    "LT": "<", "LE": "<=", "GT": ">", "GE": ">=", "EQ": "==", "NE": "!=",
+}
+
+
+def _more(rng, mean):
+    # sorteia se há mais um elemento, para uma média de `mean` elementos
+    return rng.random() < 1.0 - 1.0 / max(mean, 1.0)
+
+
+def derive(rng, shape, grammar=GRAMMAR):
+    """
+    Gera a sequência de terminais de um programa com o formato `shape`.
+
+    A derivação é a mais à esquerda, com uma pilha explícita (sem recursão,
+    para permitir aninhamentos profundos). Os orçamentos de blocos por
+    função e de operandos por expressão limitam o tamanho de cada função.
+
+    Parâmetros:
+      rng (random.Random): Gerador de números aleatórios.
+      shape (Shape): O formato do programa.
+      grammar (dict): A gramática (GRAMMAR ou uma variante com os mesmos
+        Não-Terminais).
+
+    Retorno:
+      list: Os terminais do programa (sem EPS).
+    """
+
+    shortest = shortest_productions(grammar, EPS)
+    out = []
+    functions = 0
+    blocks = 0        # blocos (STMTLIST) abertos
+    block_budget = 0  # comandos de bloco restantes na função
+    exprs = 0         # expressões (EXPR) abertas
+    operands = 0      # operandos restantes na expressão
+
+    def choose(A, prods):
+        nonlocal functions, block_budget
+        if A == "MAIN":
+            return prods[0] if shape.functions else shortest[A]
+        if A == "FLIST":
+            if functions < shape.functions:
+                functions += 1
+                block_budget = shape.blocks
+                return prods[0]
+            return shortest[A]
+        if A == "STMTLIST":
+            return prods[0] if _more(rng, shape.statements + 1) else shortest[A]
+        if A == "STMT":
+            if block_budget > 0 and blocks <= shape.nesting and rng.random() < shape.block_share:
+                block_budget -= 1
+                return rng.choice([p for p in prods if p[0] in _BLOCK_STMTS])
+            return rng.choice([p for p in prods if p[0] not in _BLOCK_STMTS])
+        if A == "IF_TAIL" and block_budget <= 0:
+            return shortest[A]
+        if A in _LOOP_TAILS:
+            if operands > 0 and _more(rng, shape.expr_terms):
+                return rng.choice(prods[:-1])
+            return shortest[A]
+        if A in _LIST_HEADS:
+            return prods[0] if _more(rng, shape.params + 1) else shortest[A]
+        if A in ("FACTOR", "FACTOR_TAIL") and (exprs > shape.expr_depth or operands <= 0):
+            return shortest[A]
+        return rng.choice(prods)
+
+    stack = ["MAIN"]
+    while stack:
+        X = stack.pop()
+        if X is _EXIT:
+            A = stack.pop()
+            if A == "STMTLIST":
+                blocks -= 1
+            elif A == "EXPR":
+                exprs -= 1
+            continue
+        if X == EPS:
+            continue
+        if X not in grammar:
+            out.append(X)
+            continue
+        if X == "STMTLIST":
+            blocks += 1
+        elif X == "EXPR":
+            if exprs == 0:
+                operands = shape.expr_size
+            exprs += 1
+        elif X == "FACTOR":
+            operands -= 1
+        prod = choose(X, grammar[X])
+        stack.append(X)
+        stack.append(_EXIT)
+        stack.extend(reversed(prod))
+    return out
+
+
+def render(rng, terminals, names=8):
+    """
+    Escreve os terminais como código-fonte: um comando por linha e blocos
+    indentados. Identificadores são sorteados entre `names` nomes (v0, v1,
+    ...) e números entre 0 e 999; cada função recebe um nome distinto.
+
+    Retorno:
+      str: O código-fonte.
+    """
+
+    parts = []
+    indent = 0
+    functions = 0
+    pool = [f"v{i}" for i in range(names)]
+    prev = None
+    for t in terminals:
+        if t == "RBRACE":
+            indent -= 1
+            if parts and parts[-1].startswith("\n"):
+                parts.pop()
+            parts.append("\n" + "    " * indent)
+        if t == "id":
+            if prev == "def":
+                lex = f"f{functions}"
+                functions += 1
+            else:
+                lex = rng.choice(pool)
+        elif t == "NUM":
+            lex = str(rng.randrange(1000))
+        else:
+            lex = _LEXEMES[t]
+        if parts and not parts[-1].endswith((" ", "\n", "(")) and t not in ("SEMI", "COMMA", "RPAREN") \
+                and not (t == "LPAREN" and prev == "id"):
+            parts.append(" ")
+        parts.append(lex)
+        if t == "LBRACE":
+            indent += 1
+            parts.append("\n" + "    " * indent)
+        elif t == "SEMI":
+            parts.append("\n" + "    " * indent)
+        elif t == "RBRACE":
+            parts.append("\n" + "    " * indent if indent else "\n\n")
+        prev = t
+    return "".join(parts).rstrip() + "\n"
+
+
+def inject_errors(rng, text, lexical=0, syntax=0):
+    """
+    Injeta erros em `text`: `lexical` caracteres inválidos ('$', '@', '#')
+    e `syntax` tokens removidos ou duplicados.
+
+    Retorno:
+      str: O texto com os erros.
+    """
+
+    if syntax:
+        tokens, _ = RegexLexer(text).tokenize_all(as_buffer=True)
+        n = len(tokens) - 1
+        edits = sorted(rng.sample(range(n), min(syntax, n)), reverse=True)
+        for i in edits:
+            start, end = tokens.starts[i], tokens.ends[i]
+            if rng.random() < 0.5:
+                text = text[:start] + text[end:]
+            else:
+                text = text[:end] + " " + text[start:end] + text[end:]
+    for _ in range(lexical):
+        pos = rng.randrange(len(text) + 1)
+        text = text[:pos] + rng.choice("$@#") + text[pos:]
+    return text
+
+
+def generate(seed=0, shape=SHAPES["balanced"], lexical_errors=0, syntax_errors=0):
+    """
+    Gera um programa LSI completo (ver derive, render e inject_errors).
+
+    Retorno:
+      str: O código-fonte.
+    """
+
+    rng = random.Random(seed)
+    text = render(rng, derive(rng, shape))
+    return inject_errors(rng, text, lexical_errors, syntax_errors)
+
+
+# =========================================
+# MAIN
+# =========================================
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--shape", choices=sorted(SHAPES), default="balanced", help="formato predefinido")
+    ap.add_argument("--functions", type=int, help="quantidade de funções (padrão: a do formato)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--lexical-errors", type=int, default=0, help="caracteres inválidos a injetar")
+    ap.add_argument("--syntax-errors", type=int, default=0, help="tokens a remover ou duplicar")
+    args = ap.parse_args()
+
+    shape = SHAPES[args.shape]
+    if args.functions is not None:
+        shape = replace(shape, functions=args.functions)
+    sys.stdout.write(generate(args.seed, shape, args.lexical_errors, args.syntax_errors))
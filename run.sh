@@ -1,3 +1,3 @@
 #!/bin/bash
 source venv/bin/activate
-python3 src/lsi_parser.py $1
+python3 src/lsi_parser.py "$@"
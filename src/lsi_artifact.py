@@ -0,0 +1,465 @@
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+
+from lsi_ast import (Assign, BinOp, Block, Call, FuncDef, Ident, If, Node, Num, Print, Program, Return, Var,
+                     VarDecl)
+from lsi_lexer import (EOF_CODE, KEYWORDS, TOKEN_CODES, BytesLexer, LexerError, RegexLexer, TokenBuffer,
+                       gc_paused)
+from lsi_xref import source_hash
+
+# =========================================
+# ARTEFATOS BINÁRIOS DE ANÁLISE
+# =========================================
+#
+# Um artefato guarda o resultado das análises léxica e sintática de um
+# arquivo (tokens, tabela de símbolos, AST ou erros) em um formato binário
+# versionado, gravado ao lado do fonte (`<arquivo>.lsia`). Enquanto o fonte
+# não muda (mesmo hash SHA-256), o artefato substitui o Lexer e o Parser.
+#
+# Formato (versão 2): um cabeçalho de 64 bytes (_HEADER) seguido das seções,
+# cada uma alinhada a 4 bytes (ver as mudanças abaixo):
+#   kinds        (B, n_tokens)   código do tipo de cada token (TOKEN_TYPES)
+#   starts, ends (I, n_tokens)   deslocamentos do lexema no fonte
+#   lines, cols  (I, n_tokens)   posição do token
+#   lexeme_ids   (I, n_tokens)   índice do lexema de cada token no pool
+#   pool_kinds   (B, n_token_lexemes)  tipo do primeiro token de cada lexema
+#   pool_offsets (I, n_lexemes + 1)    limites de cada lexema em `pool`
+#   pool         (bytes UTF-8)   os lexemas distintos, concatenados: primeiro
+#                                os dos tokens (na ordem da primeira
+#                                ocorrência), depois os usados só pela AST
+#   ast          (I, n_ast)      a AST em pós-ordem (_encode_ast)
+#   meta         (JSON UTF-8)    o erro léxico ou sintático, se houver
+# Os arrays são gravados na ordem de bytes da máquina (indicada no
+# cabeçalho) com array.tofile, sem conversão por elemento. A leitura mapeia o
+# arquivo (mmap) e expõe cada seção como uma memoryview com o tipo do array:
+# nenhum objeto é criado por token, e os lexemas são decodificados uma vez
+# por lexema distinto. (Em uma máquina com a outra ordem de bytes, as seções
+# são copiadas e convertidas.)
+#
+# Versões:
+#   1: formato inicial.
+#   2: os registros _INT da AST guardam o valor (lsi_ast.num_value) também
+#      de literais com dígitos Unicode (ex: '²3', '①'); na versão 1, esses
+#      fontes ficavam gravados como erro sintático. Artefatos da versão 1 são
+#      descartados e refeitos.
+
+ARTIFACT_VERSION = 2
+ARTIFACT_SUFFIX = ".lsia"
+
+_MAGIC = b"LSIA"
+# magic, versão, ordem de bytes, status, SHA-256 do fonte, n_tokens,
+# n_lexemes, n_token_lexemes, bytes do pool, n_ast, bytes do meta
+_HEADER = struct.Struct("<4sHBB32s6I")
+_BYTEORDERS = ("little", "big")
+
+# Status do artefato
+OK, LEXICAL_ERROR, SYNTAX_ERROR = range(3)
+
+# Tipos de nó da AST, na ordem dos códigos gravados
+NODE_TYPES = (Program, FuncDef, Ident, VarDecl, Assign, Print, Return, If, Block, BinOp, Num, Var, Call)
+_NODE_CODES = {cls: code for code, cls in enumerate(NODE_TYPES)}
+
+# Registros do fluxo da AST
+_NODE, _LIST, _NONE, _STR, _INT = range(5)
+
+
+class ArtifactError(Exception):
+    """
+    Artefato inválido: formato, versão ou tamanho incompatíveis.
+    """
+
+
+class ArtifactTokenBuffer(TokenBuffer):
+    """
+    TokenBuffer lido de um artefato: os campos são memoryviews sobre o
+    arquivo mapeado, e os lexemas vêm do pool do artefato (`text` pode ser
+    None).
+    """
+
+    __slots__ = ("lexeme_ids", "lexemes")
+
+    def lexeme(self, i):
+        """
+        Retorna o lexema do i-ésimo token ('$' para o EOF).
+        """
+        if self.kinds[i] == EOF_CODE:
+            return "$"
+        return self.lexemes[self.lexeme_ids[i]]
+
+
+class Artifact:
+    """
+    Resultado das análises léxica e sintática de um arquivo.
+
+    Atributos:
+      source_hash (str): Hash SHA-256 (hex) do código-fonte.
+      tokens (TokenBuffer): Os tokens (None se houve erro léxico).
+      symbol_table (dict): A Tabela de Símbolos do lexer.
+      lexical_error (LexerError): O erro léxico, ou None.
+      syntax_error (str): A mensagem do primeiro erro sintático (a de
+        Parser.parse), ou None.
+      diagnostics (list): Todos os erros sintáticos (SyntaxDiagnostic, os de
+        Parser.parse_recover); vazia sem erro sintático.
+    """
+
+    def __init__(self, source_hash, tokens=None, symbol_table=None, lexical_error=None,
+                 syntax_error=None, diagnostics=(), ast=None):
+        self.source_hash = source_hash
+        self.tokens = tokens
+        self.symbol_table = symbol_table
+        self.lexical_error = lexical_error
+        self.syntax_error = syntax_error
+        self.diagnostics = list(diagnostics)
+        self._ast = ast
+        self._ast_stream = None
+        self._lexemes = None
+
+    @property
+    def status(self):
+        if self.lexical_error is not None:
+            return LEXICAL_ERROR
+        return OK if self.syntax_error is None else SYNTAX_ERROR
+
+    def ast(self):
+        """
+        Retorna a AST (lsi_ast.Program), decodificada do artefato no primeiro
+        acesso, ou None se houve erro.
+        """
+
+        if self._ast is None and self._ast_stream is not None:
+            with gc_paused():
+                self._ast = _decode_ast(self._ast_stream.tolist(), self._lexemes)
+            self._ast_stream = None
+        return self._ast
+
+    # -----------------------------------------
+    # Gravação
+    # -----------------------------------------
+    def save(self, path):
+        """
+        Grava o artefato em `path` (ver o comentário do módulo). A escrita é
+        atômica (arquivo temporário + rename).
+        """
+
+        tokens = self.tokens
+        ids = {}
+        lexeme_ids = array("I")
+        pool_kinds = array("B")
+        kinds = array("B")
+        if tokens is not None:
+            kinds = tokens.kinds
+            lexeme = tokens.lexeme
+            for i, code in enumerate(kinds):
+                lex = lexeme(i)
+                j = ids.get(lex)
+                if j is None:
+                    j = ids[lex] = len(ids)
+                    pool_kinds.append(code)
+                lexeme_ids.append(j)
+        n_token_lexemes = len(ids)
+
+        def intern(lex):
+            j = ids.get(lex)
+            if j is None:
+                j = ids[lex] = len(ids)
+            return j
+
+        ast = self.ast()
+        stream = _encode_ast(ast, intern) if ast is not None else array("I")
+
+        pool = "".join(ids).encode("utf-8")
+        pool_offsets = array("I", [0])
+        total = 0
+        for lex in ids:
+            total += len(lex.encode("utf-8"))
+            pool_offsets.append(total)
+
+        meta = {}
+        if self.lexical_error is not None:
+            e = self.lexical_error
+            meta["lexical_error"] = [str(e), e.line, e.col]
+        if self.syntax_error is not None:
+            meta["syntax_error"] = self.syntax_error
+            meta["diagnostics"] = [[d.line, d.col, d.message] for d in self.diagnostics]
+        meta = json.dumps(meta).encode("utf-8")
+
+        header = _HEADER.pack(
+            _MAGIC, ARTIFACT_VERSION, _BYTEORDERS.index(sys.byteorder), self.status,
+            bytes.fromhex(self.source_hash), len(kinds), len(ids), n_token_lexemes,
+            len(pool), len(stream), len(meta),
+        )
+        empty = array("I")
+        sections = [
+            kinds,
+            *(getattr(tokens, f) if tokens is not None else empty for f in ("starts", "ends", "lines", "cols")),
+            lexeme_ids, pool_kinds, pool_offsets, pool, stream, meta,
+        ]
+
+        directory = os.path.dirname(path) or "."
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            for section in sections:
+                if isinstance(section, array):
+                    section.tofile(f)
+                else:
+                    f.write(section)
+                f.write(bytes(-f.tell() % 4))
+        os.replace(tmp, path)
+
+    # -----------------------------------------
+    # Leitura
+    # -----------------------------------------
+    @classmethod
+    def load(cls, path, data=None, expected_hash=None):
+        """
+        Lê o artefato `path` sem copiar os arrays (ver o comentário do módulo).
+
+        Parâmetros:
+          path (str): O arquivo do artefato.
+          data (str, bytes ou mmap): O código-fonte, associado aos tokens
+            (opcional).
+          expected_hash (str): Se informado, o artefato só é lido se foi
+            gerado a partir de um fonte com esse hash.
+
+        Retorno:
+          Artifact: O artefato, ou None se ele estiver desatualizado.
+
+        Lança:
+          OSError: Se o arquivo não puder ser lido.
+          ArtifactError: Se o arquivo não for um artefato desta versão.
+        """
+
+        with open(path, "rb") as f:
+            try:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # arquivo vazio
+                raise ArtifactError(f"{path}: artefato vazio")
+        if len(buf) < _HEADER.size:
+            raise ArtifactError(f"{path}: artefato truncado")
+        (magic, version, byteorder, status, digest, n_tokens, n_lexemes, n_token_lexemes,
+         pool_bytes, n_ast, meta_bytes) = _HEADER.unpack_from(buf)
+        if magic != _MAGIC:
+            raise ArtifactError(f"{path}: não é um artefato LSI")
+        if version != ARTIFACT_VERSION:
+            raise ArtifactError(f"{path}: versão do artefato {version} (esperada {ARTIFACT_VERSION})")
+        if expected_hash is not None and digest.hex() != expected_hash:
+            return None
+
+        view = memoryview(buf)
+        swap = _BYTEORDERS[byteorder] != sys.byteorder
+        pos = _HEADER.size
+
+        def section(code, count):
+            nonlocal pos
+            size = count * array(code).itemsize
+            if pos + size > len(buf):
+                raise ArtifactError(f"{path}: artefato truncado")
+            values = view[pos:pos + size]
+            pos += size + (-size % 4)
+            if code == "B":
+                return values
+            if swap:
+                values = array(code, values.tobytes())
+                values.byteswap()
+                return values
+            return values.cast(code)
+
+        kinds = section("B", n_tokens)
+        starts, ends, lines, cols, lexeme_ids = (section("I", n_tokens) for _ in range(5))
+        pool_kinds = section("B", n_token_lexemes)
+        pool_offsets = section("I", n_lexemes + 1)
+        pool = section("B", pool_bytes)
+        stream = section("I", n_ast)
+        meta = json.loads(bytes(section("B", meta_bytes)) or b"{}")
+
+        # um str por lexema distinto
+        text = str(pool, "utf-8")
+        if text.isascii():
+            lexemes = [text[a:b] for a, b in zip(pool_offsets, pool_offsets[1:])]
+        else:
+            lexemes = [str(pool[a:b], "utf-8") for a, b in zip(pool_offsets, pool_offsets[1:])]
+
+        artifact = cls(digest.hex())
+        if status == LEXICAL_ERROR:
+            message, line, col = meta["lexical_error"]
+            artifact.lexical_error = LexerError(message, line, col)
+            return artifact
+
+        tokens = ArtifactTokenBuffer(data)
+        tokens.kinds, tokens.starts, tokens.ends, tokens.lines, tokens.cols = kinds, starts, ends, lines, cols
+        tokens.lexeme_ids = lexeme_ids
+        tokens.lexemes = lexemes
+        artifact.tokens = tokens
+
+        symtab = {kw: {"kind": "keyword"} for kw in KEYWORDS}
+        id_code = TOKEN_CODES["ID"]
+        for lex, code in zip(lexemes, pool_kinds):
+            if code == id_code:
+                symtab[lex] = {"kind": "id"}
+        artifact.symbol_table = symtab
+
+        if status == SYNTAX_ERROR:
+            from lsi_parser import SyntaxDiagnostic
+            artifact.syntax_error = meta["syntax_error"]
+            artifact.diagnostics = [SyntaxDiagnostic(*d) for d in meta["diagnostics"]]
+        else:
+            artifact._ast_stream = stream
+            artifact._lexemes = lexemes
+        return artifact
+
+
+# =========================================
+# AST EM PÓS-ORDEM
+# =========================================
+#
+# A AST é gravada como um fluxo de inteiros em pós-ordem: os valores dos
+# campos de um nó vêm antes do registro do nó, e os itens de uma lista antes
+# do registro da lista. Registros:
+#   _NODE código linha coluna   (consome len(_fields) valores)
+#   _LIST n                     (consome n valores)
+#   _NONE
+#   _STR índice_no_pool         (nomes e operadores)
+#   _INT índice_no_pool         (valores de Num, em decimal; lsi_ast.num_value)
+# A decodificação é um único laço com uma pilha de valores, sem recursão.
+
+def _encode_ast(root, intern):
+    out = array("I")
+    stack = [(root, False)]
+    while stack:
+        value, done = stack.pop()
+        if done:
+            if isinstance(value, list):
+                out.extend((_LIST, len(value)))
+            else:
+                out.extend((_NODE, _NODE_CODES[type(value)], value.line, value.col))
+        elif isinstance(value, Node):
+            stack.append((value, True))
+            stack.extend((getattr(value, f), False) for f in reversed(value._fields))
+        elif isinstance(value, list):
+            stack.append((value, True))
+            stack.extend((item, False) for item in reversed(value))
+        elif value is None:
+            out.append(_NONE)
+        elif isinstance(value, str):
+            out.extend((_STR, intern(value)))
+        elif isinstance(value, int):
+            out.extend((_INT, intern(str(value))))
+        else:
+            raise ArtifactError(f"valor não suportado na AST: {value!r}")
+    return out
+
+
+def _decode_ast(stream, lexemes):
+    values = []
+    push = values.append
+    i = 0
+    n = len(stream)
+    while i < n:
+        tag = stream[i]
+        if tag == _NODE:
+            cls = NODE_TYPES[stream[i + 1]]
+            k = len(cls._fields)
+            if k:
+                args = values[-k:]
+                del values[-k:]
+            else:
+                args = ()
+            push(cls(*args, line=stream[i + 2], col=stream[i + 3]))
+            i += 4
+        elif tag == _STR:
+            push(lexemes[stream[i + 1]])
+            i += 2
+        elif tag == _LIST:
+            k = stream[i + 1]
+            if k:
+                items = values[-k:]
+                del values[-k:]
+            else:
+                items = []
+            push(items)
+            i += 2
+        elif tag == _INT:
+            push(int(lexemes[stream[i + 1]]))
+            i += 2
+        else:
+            push(None)
+            i += 1
+    return values.pop()
+
+
+# =========================================
+# CONSTRUÇÃO E REUSO
+# =========================================
+def build_artifact(data, parser=None):
+    """
+    Executa as análises léxica e sintática de `data` e retorna o Artifact.
+
+    Como na linha de comando de lsi_parser, um texto (str) é analisado pelo
+    RegexLexer e bytes (ou mmap) pelo BytesLexer. Sem erros, a AST é
+    construída (Parser.parse_ast); com um erro sintático, são guardadas a
+    mensagem do primeiro e os diagnósticos de Parser.parse_recover.
+
+    Lança:
+      UnicodeDecodeError: Se `data` em bytes não puder ser decodificado.
+    """
+
+    from lsi_parser import Parser
+
+    artifact = Artifact(source_hash(data))
+    lexer = RegexLexer(data) if isinstance(data, str) else BytesLexer(data)
+    try:
+        tokens, symtab = lexer.tokenize_all(as_buffer=True)
+    except LexerError as e:
+        artifact.lexical_error = e
+        return artifact
+    artifact.tokens = tokens
+    artifact.symbol_table = symtab
+
+    parser = parser or Parser()
+    try:
+        artifact._ast = parser.parse_ast(tokens)
+    except Exception as e:
+        artifact.syntax_error = str(e)
+        artifact.diagnostics = parser.parse_recover(tokens)
+    return artifact
+
+
+def load_or_build(path, data=None, parser=None, save=True):
+    """
+    Retorna o Artifact do arquivo `path`: o gravado em `path +
+    ARTIFACT_SUFFIX`, se ele corresponder ao conteúdo atual do arquivo, ou um
+    novo (gravado ao lado do fonte, se `save`).
+
+    Parâmetros:
+      path (str): O arquivo .lsi.
+      data (str, bytes ou mmap): O conteúdo de `path`, se já foi lido
+        (padrão: open_source(path)).
+
+    Retorno:
+      tuple: (Artifact, bool lido do disco)
+    """
+
+    if data is None:
+        from lsi_lexer import open_source
+        data = open_source(path)
+    digest = source_hash(data)
+    try:
+        artifact = Artifact.load(path + ARTIFACT_SUFFIX, data, expected_hash=digest)
+        if artifact is not None:
+            return artifact, True
+    except (OSError, ArtifactError, ValueError, KeyError):
+        pass
+
+    artifact = build_artifact(data, parser)
+    if save:
+        try:
+            artifact.save(path + ARTIFACT_SUFFIX)
+        except OSError:
+            pass
+    return artifact, False
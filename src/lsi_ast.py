@@ -0,0 +1,382 @@
+import unicodedata
+
+# =========================================
+# ÁRVORE SINTÁTICA ABSTRATA (AST) DA LINGUAGEM LSI
+# =========================================
+#
+# Os nós usam __slots__ (sem __dict__ por instância), de modo que a árvore de
+# programas grandes ocupa pouca memória. Todo nó guarda a linha e a coluna do
+# token que o origina.
+#
+# As ações semânticas (SEMANTIC_ACTIONS) ficam associadas às produções da
+# GRAMMAR do lsi_parser, na mesma ordem, e são executadas pelo Parser durante
+# a própria análise LL(1) (Parser.parse_ast).
+
+
+class Node:
+    """
+    Classe base dos nós da AST.
+
+    Atributos:
+      line (int): Linha do token que origina o nó.
+      col (int): Coluna do token que origina o nó.
+
+    Cada subclasse lista seus campos em `_fields` (como no módulo `ast`),
+    usados por __repr__, __eq__ e iter_children.
+    """
+
+    __slots__ = ("line", "col")
+    _fields = ()
+
+    def __init__(self, *values, line=0, col=0):
+        for field, value in zip(self._fields, values):
+            setattr(self, field, value)
+        self.line = line
+        self.col = col
+
+    def __repr__(self):
+        args = ", ".join(f"{f}={getattr(self, f)!r}" for f in self._fields)
+        return f"{type(self).__name__}({args})"
+
+    def __eq__(self, other):
+        if type(self) is not type(other):
+            return NotImplemented
+        return (self.line, self.col) == (other.line, other.col) and all(
+            getattr(self, f) == getattr(other, f) for f in self._fields
+        )
+
+    __hash__ = None
+
+
+class Program(Node):
+    """Programa completo: lista de definições de função."""
+    __slots__ = ("functions",)
+    _fields = ("functions",)
+
+
+class FuncDef(Node):
+    """def name(int p1, ...) { body } — posição do identificador da função."""
+    __slots__ = ("name", "params", "body")
+    _fields = ("name", "params", "body")
+
+
+class Ident(Node):
+    """Nome declarado (parâmetro ou variável de um `int A, B;`)."""
+    __slots__ = ("name",)
+    _fields = ("name",)
+
+
+class VarDecl(Node):
+    """int A, B, C; — `names` é uma lista de Ident."""
+    __slots__ = ("names",)
+    _fields = ("names",)
+
+
+class Assign(Node):
+    """name = value;"""
+    __slots__ = ("name", "value")
+    _fields = ("name", "value")
+
+
+class Print(Node):
+    """print value;"""
+    __slots__ = ("value",)
+    _fields = ("value",)
+
+
+class Return(Node):
+    """return [value]; — `value` é None em `return;`."""
+    __slots__ = ("value",)
+    _fields = ("value",)
+
+
+class If(Node):
+    """if (cond) { body } [else { orelse }] — `orelse` é None sem else."""
+    __slots__ = ("cond", "body", "orelse")
+    _fields = ("cond", "body", "orelse")
+
+
+class Block(Node):
+    """{ body } usado como comando."""
+    __slots__ = ("body",)
+    _fields = ("body",)
+
+
+class BinOp(Node):
+    """
+    Operação binária associativa à esquerda.
+
+    `op` é o nome do terminal do operador: PLUS, MINUS, TIMES, DIV,
+    LT, LE, GT, GE, EQ ou NE.
+    """
+    __slots__ = ("op", "left", "right")
+    _fields = ("op", "left", "right")
+
+
+class Num(Node):
+    """Literal inteiro."""
+    __slots__ = ("value",)
+    _fields = ("value",)
+
+
+class Var(Node):
+    """Uso de variável."""
+    __slots__ = ("name",)
+    _fields = ("name",)
+
+
+class Call(Node):
+    """Chamada de função name(args...)."""
+    __slots__ = ("name", "args")
+    _fields = ("name", "args")
+
+
+def iter_children(node):
+    """
+    Gera os nós filhos diretos de `node` (campos que são nós ou listas de nós).
+    """
+
+    for f in node._fields:
+        value = getattr(node, f)
+        if isinstance(value, Node):
+            yield value
+        elif isinstance(value, list):
+            for item in value:
+                if isinstance(item, Node):
+                    yield item
+
+
+# Campos de cada tipo de nó (usados por copy_tree)
+_NODE_FIELDS = {cls: cls._fields for cls in Node.__subclasses__()}
+
+
+def copy_tree(node, line_delta=0):
+    """
+    Retorna uma cópia profunda da árvore `node`, com as linhas somadas de
+    `line_delta`. A cópia não é recursiva, de modo que aceita as expressões
+    profundas que o parser produz.
+
+    Parâmetros:
+      node (Node): A raiz da árvore.
+      line_delta (int): Deslocamento somado à linha de cada nó.
+
+    Retorno:
+      Node: A cópia (nenhum nó ou lista é compartilhado com `node`).
+    """
+
+    fields_of = _NODE_FIELDS
+    new_node = object.__new__
+    root = new_node(type(node))
+    pending = [(node, root)]
+    push = pending.append
+    while pending:
+        old, new = pending.pop()
+        new.line = old.line + line_delta
+        new.col = old.col
+        for f in fields_of[type(old)]:
+            value = getattr(old, f)
+            cls = type(value)
+            if cls in fields_of:
+                copy = new_node(cls)
+                push((value, copy))
+                value = copy
+            elif cls is list:
+                items = []
+                for item in value:
+                    cls = type(item)
+                    if cls in fields_of:
+                        copy = new_node(cls)
+                        push((item, copy))
+                        item = copy
+                    items.append(item)
+                value = items
+            setattr(new, f, value)
+    return root
+
+
+def dump(node, indent=0):
+    """
+    Retorna uma representação textual indentada da árvore (um nó por linha).
+    """
+
+    pad = "  " * indent
+    if isinstance(node, list):
+        return "\n".join(dump(n, indent) for n in node) if node else pad + "[]"
+    if not isinstance(node, Node):
+        return pad + repr(node)
+
+    simple = [f"{f}={getattr(node, f)!r}" for f in node._fields
+              if not isinstance(getattr(node, f), (Node, list))]
+    lines = [f"{pad}{type(node).__name__}({', '.join(simple)}) @{node.line}:{node.col}"]
+    for f in node._fields:
+        value = getattr(node, f)
+        if isinstance(value, (Node, list)):
+            lines.append(f"{pad}  {f}:")
+            lines.append(dump(value, indent + 2))
+    return "\n".join(lines)
+
+
+# =========================================
+# AÇÕES SEMÂNTICAS
+# =========================================
+#
+# Cada ação recebe a lista `v` com os valores dos símbolos do lado direito da
+# produção (Tokens para terminais, resultados das ações para não-terminais) e
+# devolve o valor do não-terminal.
+#
+# Listas (FLIST, STMTLIST, *_TAIL, ...) são construídas pela recursão à direita
+# da gramática: cada ação acrescenta seu elemento no FINAL da lista vinda da
+# cauda, de modo que a lista fica em ordem inversa e é invertida (in-place)
+# uma única vez por quem a consome. As caudas de expressões (EXPR_TAIL,
+# NUMEXPR_TAIL, TERM_TAIL) devolvem pares (token do operador, operando) e são
+# dobradas em BinOp associativos à esquerda.
+
+def _at(tok):
+    """Argumentos de posição (line/col) a partir de um Token."""
+    return {"line": tok.line, "col": tok.col}
+
+
+def _empty(v):
+    return []
+
+
+def _none(v):
+    return None
+
+
+def _first(v):
+    return v[0]
+
+
+def _second(v):
+    return v[1]
+
+
+def _ordered(items):
+    items.reverse()
+    return items
+
+
+def _cons(item, rest):
+    rest.append(item)
+    return rest
+
+
+def _fold(left, tail):
+    """
+    Dobra `left (op operando)*` em BinOps associativos à esquerda.
+    """
+    for op, right in reversed(tail):
+        left = BinOp(op.typ, left, right, **_at(op))
+    return left
+
+
+def _binary_tail(v):
+    # [op, operando, cauda]
+    return _cons((v[0], v[1]), v[2])
+
+
+def _binary(v):
+    # [operando, cauda]
+    return _fold(v[0], v[1])
+
+
+def _program(v):
+    return Program(_ordered(v[0]), line=1, col=1)
+
+
+def _fdef(v):
+    # def id ( PARLIST ) { STMTLIST }
+    return FuncDef(v[1].lexeme, _ordered(v[3]), _ordered(v[6]), **_at(v[1]))
+
+
+def _ident(tok):
+    return Ident(tok.lexeme, **_at(tok))
+
+
+def _stmtlist(v):
+    if v[0] is None:  # comando vazio ';'
+        return v[1]
+    return _cons(v[0], v[1])
+
+
+def num_value(lexeme):
+    """
+    Retorna o valor inteiro de um lexema NUM.
+
+    O lexer aceita como dígito qualquer caractere com str.isdigit(), inclusive
+    os que int() recusa (ex: '²', '①'); cada um vale unicodedata.digit(), de
+    modo que a AST aceita as mesmas entradas que Parser.parse.
+    """
+    try:
+        return int(lexeme)
+    except ValueError:
+        value = 0
+        for c in lexeme:
+            value = value * 10 + unicodedata.digit(c)
+        return value
+
+
+def _factor_id(v):
+    # id FACTOR_TAIL — sem cauda é variável; com cauda, chamada
+    tok, args = v
+    if args is None:
+        return Var(tok.lexeme, **_at(tok))
+    return Call(tok.lexeme, args, **_at(tok))
+
+
+SEMANTIC_ACTIONS = {
+    "MAIN": [_program, lambda v: Program([], line=1, col=1)],
+
+    "FLIST": [lambda v: _cons(v[0], v[1]), _empty],
+
+    "FDEF": [_fdef],
+
+    "PARLIST": [lambda v: _cons(v[0], v[1]), _empty],
+    "PARLIST_TAIL": [lambda v: _cons(v[1], v[2]), _empty],
+    "PARAM": [lambda v: _ident(v[1])],
+
+    "VARLIST": [lambda v: _cons(_ident(v[0]), v[1])],
+    "VARLIST_TAIL": [lambda v: _cons(_ident(v[1]), v[2]), _empty],
+
+    "STMTLIST": [_stmtlist, _empty],
+
+    "STMT": [
+        lambda v: VarDecl(_ordered(v[1]), **_at(v[0])),
+        _first,
+        _first,
+        _first,
+        _first,
+        lambda v: Block(_ordered(v[1]), **_at(v[0])),
+        _none,
+    ],
+
+    "ATRIBST": [lambda v: Assign(v[0].lexeme, v[2], **_at(v[0]))],
+
+    "FCALL": [lambda v: Call(v[0].lexeme, _ordered(v[2]), **_at(v[0]))],
+    "PARLISTCALL": [lambda v: _cons(v[0], v[1]), _empty],
+    "PARLISTCALL_TAIL": [lambda v: _cons(v[1], v[2]), _empty],
+
+    "PRINTST": [lambda v: Print(v[1], **_at(v[0]))],
+    "RETURNST": [lambda v: Return(v[1], **_at(v[0]))],
+    "RETURN_TAIL": [_first, _none],
+
+    "IFSTMT": [lambda v: If(v[2], _ordered(v[5]), v[7], **_at(v[0]))],
+    "IF_TAIL": [lambda v: _ordered(v[2]), _none],
+
+    "EXPR": [_binary],
+    "EXPR_TAIL": [_binary_tail] * 6 + [_empty],
+
+    "NUMEXPR": [_binary],
+    "NUMEXPR_TAIL": [_binary_tail, _binary_tail, _empty],
+
+    "TERM": [_binary],
+    "TERM_TAIL": [_binary_tail, _binary_tail, _empty],
+
+    "FACTOR": [
+        lambda v: Num(num_value(v[0].lexeme), **_at(v[0])),
+        _factor_id,
+        _second,
+    ],
+    "FACTOR_TAIL": [lambda v: _ordered(v[1]), _none],
+}
@@ -0,0 +1,207 @@
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from lsi_lexer import LexerError, RegexLexer, decode_source
+from lsi_parser import Parser
+
+# =========================================
+# ANÁLISE EM LOTE DE ARQUIVOS .lsi
+# =========================================
+#
+# Verifica (léxico + sintático) muitos arquivos em uma única execução,
+# distribuindo-os entre processos. Cada processo constrói o Parser (e,
+# portanto, obtém as tabelas LL(1)) uma única vez, e o resultado de cada
+# arquivo é emitido como uma linha JSON assim que fica pronto.
+
+LSI_EXTENSION = ".lsi"
+
+# Parser do processo de trabalho (criado por _init_worker)
+_PARSER = None
+
+
+def expand_inputs(inputs):
+    """
+    Expande diretórios, padrões glob e arquivos em uma lista de arquivos .lsi.
+
+    Diretórios são percorridos recursivamente; padrões glob aceitam `**`.
+    Arquivos repetidos aparecem uma única vez, na ordem da primeira ocorrência.
+
+    Parâmetros:
+      inputs (list): Caminhos de arquivos, diretórios ou padrões glob.
+
+    Retorno:
+      list: Os caminhos dos arquivos encontrados.
+
+    Lança:
+      FileNotFoundError: Se uma entrada não corresponder a nenhum arquivo.
+    """
+
+    files = []
+    for entry in inputs:
+        if os.path.isdir(entry):
+            found = []
+            for root, dirs, names in os.walk(entry):
+                dirs.sort()
+                found.extend(os.path.join(root, n) for n in sorted(names)
+                             if n.endswith(LSI_EXTENSION))
+        elif glob.has_magic(entry):
+            found = sorted(glob.glob(entry, recursive=True))
+        elif os.path.exists(entry):
+            found = [entry]
+        else:
+            raise FileNotFoundError(f"Entrada não encontrada: {entry}")
+        files.extend(found)
+    return list(dict.fromkeys(files))
+
+
+def _init_worker():
+    """
+    Inicializa um processo de trabalho: o Parser (e suas tabelas) é criado
+    uma única vez e reaproveitado para todos os arquivos do processo.
+    """
+
+    global _PARSER
+    _PARSER = Parser()
+
+
+def check_file(path, recover=False):
+    """
+    Executa a análise léxica e sintática de um arquivo.
+
+    Parâmetros:
+      path (str): Caminho do arquivo .lsi.
+      recover (bool): Se True, um erro sintático inclui a lista de todos os
+        erros do arquivo (Parser.parse_recover) em "errors".
+
+    Retorno:
+      dict: Resultado serializável em JSON, com "file", "status" ("ok",
+        "lexical_error", "syntax_error", "io_error" ou "internal_error"),
+        "bytes" (tamanho do arquivo), "tokens" e, em caso de erro, "message"
+        e (se conhecidas) "line" e "col".
+    """
+
+    global _PARSER
+    if _PARSER is None:
+        _init_worker()
+
+    result = {"file": path, "status": "ok", "bytes": 0, "tokens": 0}
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        text = decode_source(data)
+    except (OSError, UnicodeDecodeError) as e:
+        result.update(status="io_error", message=str(e))
+        return result
+    result["bytes"] = len(data)
+
+    try:
+        tokens, _ = RegexLexer(text).tokenize_all(as_buffer=True)
+    except LexerError as e:
+        result.update(status="lexical_error", line=e.line, col=e.col, message=str(e))
+        return result
+    result["tokens"] = len(tokens)
+
+    try:
+        _PARSER.parse(tokens)
+    except Exception as e:
+        # caminho raro: uma segunda passada localiza o(s) erro(s); se ela não
+        # encontra nenhum, a falha não foi um erro sintático
+        diagnostics = _PARSER.parse_recover(tokens)
+        if not diagnostics:
+            result.update(status="internal_error", message=f"{type(e).__name__}: {e}")
+            return result
+        first = diagnostics[0]
+        result.update(status="syntax_error", line=first.line, col=first.col,
+                      message=first.message)
+        if recover:
+            result["errors"] = [
+                {"line": d.line, "col": d.col, "message": d.message} for d in diagnostics
+            ]
+    return result
+
+
+def _check_file_recover(path):
+    return check_file(path, recover=True)
+
+
+def run_batch(files, jobs=None, recover=False):
+    """
+    Analisa `files` em paralelo e gera os resultados na ordem dos arquivos.
+
+    Os arquivos são enviados aos processos em lotes (chunksize), para que o
+    custo de comunicação por arquivo seja pequeno mesmo com milhares de
+    arquivos pequenos. Com jobs=1, tudo roda no processo atual.
+
+    Parâmetros:
+      files (list): Caminhos dos arquivos.
+      jobs (int): Número de processos (padrão: os.cpu_count()).
+      recover (bool): Repassado para check_file.
+
+    Retorno:
+      generator: Um dict de resultado (ver check_file) por arquivo.
+    """
+
+    jobs = jobs or os.cpu_count() or 1
+    worker = _check_file_recover if recover else check_file
+
+    if jobs == 1 or len(files) <= 1:
+        yield from map(worker, files)
+        return
+
+    chunksize = max(1, min(64, len(files) // (jobs * 4)))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker) as pool:
+        yield from pool.map(worker, files, chunksize=chunksize)
+
+
+# =========================================
+# MAIN
+# =========================================
+if __name__ == "__main__":
+    import argparse
+
+    """
+    Ponto de entrada da análise em lote.
+
+    Emite uma linha JSON por arquivo em stdout e, ao final, um resumo com a
+    vazão (arquivos/s e MB/s) em stderr. O código de saída é 1 se algum
+    arquivo tiver erro.
+    """
+
+    ap = argparse.ArgumentParser(description="Análise léxica e sintática em lote de arquivos .lsi.")
+    ap.add_argument("inputs", nargs="+", metavar="ENTRADA",
+                    help="arquivo, diretório (recursivo) ou padrão glob")
+    ap.add_argument("-j", "--jobs", type=int, default=None,
+                    help="número de processos (padrão: número de CPUs)")
+    ap.add_argument("--recover", action="store_true",
+                    help="inclui todos os erros sintáticos de cada arquivo")
+    args = ap.parse_args()
+
+    try:
+        files = expand_inputs(args.inputs)
+    except FileNotFoundError as e:
+        ap.error(str(e))
+
+    counts = {"ok": 0, "lexical_error": 0, "syntax_error": 0, "io_error": 0, "internal_error": 0}
+    total_bytes = 0
+    out = sys.stdout
+    t0 = time.perf_counter()
+
+    for result in run_batch(files, args.jobs, args.recover):
+        counts[result["status"]] += 1
+        total_bytes += result["bytes"]
+        out.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+    elapsed = time.perf_counter() - t0
+    rate = len(files) / elapsed if elapsed else 0.0
+    mb_rate = total_bytes / 2**20 / elapsed if elapsed else 0.0
+    print(
+        f"{len(files)} arquivos em {elapsed:.2f} s ({rate:.0f} arquivos/s, {mb_rate:.2f} MB/s) — "
+        + ", ".join(f"{k}: {v}" for k, v in counts.items()),
+        file=sys.stderr,
+    )
+
+    sys.exit(0 if counts["ok"] == len(files) else 1)
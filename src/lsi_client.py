@@ -0,0 +1,89 @@
+import json
+import os
+import socket
+import sys
+import tempfile
+
+# =========================================
+# CLIENTE DO SERVIDOR DE ANÁLISE
+# =========================================
+#
+# Substituto de run.sh / lsi_parser.py: repassa os argumentos ao servidor
+# residente (lsi_server.py) e reproduz a sua saída e o seu código de saída.
+# Importa apenas módulos leves da biblioteca padrão; se nenhum servidor
+# estiver ativo, a análise é feita localmente, com o mesmo resultado.
+#
+# Protocolo: uma mensagem JSON por linha, em ambos os sentidos.
+#   {"op": "run", "argv": [...], "cwd": "..."}
+#     -> {"status": 0, "stdout": "...", "stderr": "...", "cached": false}
+#   {"op": "stats"}     -> {"hits": ..., "misses": ..., "entries": ..., "bytes": ...}
+#   {"op": "shutdown"}  -> {"ok": true}
+#   (erro de protocolo) -> {"error": "..."}
+
+
+def default_socket_path():
+    """
+    Retorna o caminho do socket do servidor: a variável de ambiente
+    LSI_SOCKET ou um arquivo por usuário no diretório temporário.
+    """
+
+    return os.environ.get("LSI_SOCKET") or os.path.join(
+        tempfile.gettempdir(), f"lsi-parser-{os.getuid()}.sock")
+
+
+def request(message, path=None):
+    """
+    Envia uma mensagem ao servidor e retorna a resposta.
+
+    Parâmetros:
+      message (dict): A requisição (ver o protocolo acima).
+      path (str): O caminho do socket (padrão: default_socket_path()).
+
+    Retorno:
+      dict: A resposta do servidor.
+
+    Lança:
+      OSError: Se não houver servidor escutando em `path`.
+    """
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path or default_socket_path())
+        sock.sendall(json.dumps(message).encode() + b"\n")
+        with sock.makefile("rb") as f:
+            line = f.readline()
+    if not line:
+        raise ConnectionError("o servidor encerrou a conexão sem responder")
+    return json.loads(line)
+
+
+def _run_local(argv):
+    from lsi_lexer import open_source
+    from lsi_parser import cli_arg_parser, parse_cli_args, run_cli
+
+    # como em lsi_parser.py: o arquivo é analisado em bytes (as mesmas
+    # posições com '\r\n' e o mesmo hash do conteúdo em --artifact)
+    args = parse_cli_args(cli_arg_parser(), argv)
+    return run_cli(args, open_source(args.file), sys.stdout)
+
+
+# =========================================
+# MAIN
+# =========================================
+if __name__ == "__main__":
+
+    """
+    Ponto de entrada do cliente: aceita os mesmos argumentos de lsi_parser.py.
+    """
+
+    argv = sys.argv[1:]
+    try:
+        reply = request({"op": "run", "argv": argv, "cwd": os.getcwd()})
+    except OSError:
+        sys.exit(_run_local(argv))
+
+    if "error" in reply:
+        print(f"lsi_client: {reply['error']}", file=sys.stderr)
+        sys.exit(2)
+    sys.stdout.write(reply["stdout"])
+    sys.stderr.write(reply["stderr"])
+    sys.exit(reply["status"])
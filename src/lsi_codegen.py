@@ -0,0 +1,408 @@
+import os
+import sys
+
+from lsi_lexer import EOF_CODE, TOKEN_CODES
+from lsi_parser import EPS, GRAMMAR, KIND_TO_TERMINAL, get_tables, grammar_hash
+
+# =========================================
+# GERADOR DE PARSER DESCENDENTE RECURSIVO
+# =========================================
+#
+# Gera, a partir da GRAMMAR e da Tabela LL(1), um módulo Python independente.
+# Apenas MAIN e os Não-Terminais que fecham um ciclo de referências viram
+# funções (_function_symbols; na GRAMMAR atual, STMTLIST e EXPR); os demais
+# são expandidos (inline) no ponto de uso. Cada despacho decide a produção
+# comparando o código inteiro do token atual (TOKEN_CODES do lsi_lexer, o
+# mesmo guardado em TokenBuffer.kinds) com os terminais da sua linha da
+# tabela. Produções que terminam no próprio Não-Terminal (FLIST, STMTLIST,
+# *_TAIL) viram laços.
+#
+# O parser gerado aceita exatamente a mesma linguagem que lsi_parser.Parser e
+# reporta os mesmos erros, nos mesmos pontos, com as mesmas mensagens. Cada
+# nível de `(` ou `{` aninhado custa um quadro da pilha do Python; se o
+# aninhamento passar do limite de recursão, parse_codes repete a análise com
+# lsi_parser.Parser (pilha explícita), que não tem esse limite.
+
+# Terminal da gramática -> código do token
+_CODES = {term: code for code, term in enumerate(KIND_TO_TERMINAL)}
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lsi_rd_parser.py")
+
+_HEADER = '''\
+# =========================================
+# PARSER DESCENDENTE RECURSIVO DA LINGUAGEM LSI
+# =========================================
+#
+# GERADO AUTOMATICAMENTE por lsi_codegen.py a partir da GRAMMAR do lsi_parser.
+# Não edite: altere a gramática e execute
+#   python3 src/lsi_codegen.py
+#
+# Módulo independente (sem importações, exceto em _deep_fallback). Os tokens
+# são códigos inteiros na ordem de TOKEN_TYPES do lsi_lexer (os mesmos de
+# TokenBuffer.kinds).
+
+# Hash da gramática usada na geração (lsi_parser.grammar_hash)
+GRAMMAR_HASH = {grammar_hash!r}
+
+# Código do token -> nome do terminal (para mensagens de erro)
+_NAMES = {names!r}
+
+# Tipo de token do Lexer -> código
+_TYPE_CODES = {type_codes!r}
+
+_EOF = {eof!r}
+
+
+def _expected(term, c):
+    return Exception(f"Esperado '{{term}}', encontrado '{{_NAMES[c]}}'.")
+
+
+def _no_rule(nt, c):
+    return Exception(f"Erro sintático: não há regra ({{nt}}, {{_NAMES[c]}})")
+
+
+def parse(tokens):
+    """
+    Executa a análise sintática descendente recursiva.
+
+    Parâmetros:
+      tokens: Um TokenBuffer (lido pelos códigos em `kinds`), uma lista de
+        Tokens ou uma sequência de códigos inteiros.
+
+    Retorno:
+      bool: True se o parsing foi bem-sucedido.
+
+    Lança:
+      Exception: Em caso de Erro Sintático (mesmas mensagens de
+        lsi_parser.Parser).
+    """
+
+    k = getattr(tokens, "kinds", tokens)
+    if len(k) and not isinstance(k[0], int):
+        k = [_TYPE_CODES[tok.typ] for tok in k]
+    if not len(k) or k[-1] != _EOF:
+        k = list(k) + [_EOF]
+    return parse_codes(k)
+
+
+def parse_codes(k):
+    """
+    Analisa a sequência de códigos `k`, que deve terminar com o código de EOF.
+    """
+
+    try:
+        i = {start}(k, 0)
+    except RecursionError:
+        return _deep_fallback(k)
+    if k[i] != _EOF:
+        raise _expected("$", k[i])
+    return True
+
+
+def _deep_fallback(k):
+    """
+    Aninhamento mais profundo que o limite de recursão do Python: a mesma
+    análise (mesmo resultado e mesmas mensagens) pelo lsi_parser.Parser.
+    """
+
+    from array import array
+    from lsi_lexer import TokenBuffer
+    from lsi_parser import Parser
+
+    tokens = TokenBuffer("")
+    tokens.kinds = array("B", k)
+    return Parser().parse(tokens)
+'''
+
+
+class _Emitter:
+    """
+    Acumula as linhas do módulo gerado e os conjuntos de códigos constantes.
+    """
+
+    def __init__(self):
+        self.lines = []
+        self.sets = {}
+
+    def emit(self, depth, line):
+        self.lines.append("    " * depth + line)
+
+    def test(self, var, codes):
+        """
+        Retorna a condição "var pertence a codes" (== para um único código,
+        `in` com um frozenset constante do módulo para vários).
+        """
+
+        codes = tuple(sorted(codes))
+        if len(codes) == 1:
+            return f"{var} == {codes[0]}"
+        name = self.sets.get(codes)
+        if name is None:
+            name = self.sets[codes] = f"_S{len(self.sets)}"
+        return f"{var} in {name}"
+
+
+def _func_name(A):
+    return f"_{A}"
+
+
+def _branches(A, table):
+    """
+    Retorna os ramos do despacho de A: uma lista de (códigos, produção), com
+    os códigos das células da tabela que escolhem a produção. Produções que
+    só diferem no terminal inicial (ex: TIMES FACTOR TERM_TAIL e DIV FACTOR
+    TERM_TAIL) compartilham um único ramo.
+    """
+
+    prods = GRAMMAR[A]
+    cells = [set() for _ in prods]
+    for (B, t), prod in table.items():
+        if B == A:
+            index = next(p for p, q in enumerate(prods) if q is prod)
+            cells[index].add(_CODES[t])
+
+    branches = []
+    merged = {}
+    for codes, prod in zip(cells, prods):
+        if not codes:
+            continue
+        key = tuple(prod[1:]) if prod[0] not in GRAMMAR and prod[0] != EPS else None
+        if key is not None and key in merged:
+            merged[key][0].update(codes)
+            continue
+        branch = (codes, prod)
+        branches.append(branch)
+        if key is not None:
+            merged[key] = branch
+    return branches
+
+
+def _is_loop(A):
+    """A vira um laço se alguma produção termina no próprio A."""
+    return any(prod[-1] == A for prod in GRAMMAR[A])
+
+
+def _function_symbols(start="MAIN"):
+    """
+    Escolhe os Não-Terminais que viram funções; os demais são expandidos
+    (inline) em quem os usa.
+
+    Uma busca em profundidade a partir de `start` marca como função o
+    destino de cada aresta de retorno, o que quebra todos os ciclos de
+    referências (ex: EXPR em EXPR -> ... -> FACTOR -> LPAREN EXPR RPAREN).
+    A auto-referência no fim de uma produção de laço não conta.
+    """
+
+    functions = {start}
+    state = {start: 1}  # 1 = no caminho atual, 2 = concluído
+
+    def refs(A, prods):
+        loop = _is_loop(A)
+        for prod in prods:
+            for j, X in enumerate(prod):
+                if X in GRAMMAR and not (loop and X == A and j == len(prod) - 1):
+                    yield X
+
+    stack = [(start, refs(start, GRAMMAR[start]))]
+    while stack:
+        A, it = stack[-1]
+        for X in it:
+            if state.get(X) == 1:
+                functions.add(X)
+            elif X not in state:
+                state[X] = 1
+                stack.append((X, refs(X, GRAMMAR[X])))
+                break
+        else:
+            state[A] = 2
+            stack.pop()
+
+    return [A for A in GRAMMAR if A in functions]
+
+
+class _Generator:
+    """
+    Emite o código do parser.
+
+    Cada função corresponde a um Não-Terminal de `functions`; os demais são
+    expandidos no ponto de uso. Nesse caso, o fim de um ramo não é `return`:
+    o índice é atualizado e a execução segue após o despacho (ou sai do laço
+    com `break`).
+    """
+
+    def __init__(self, table):
+        self.em = _Emitter()
+        self.branches = {A: _branches(A, table) for A in GRAMMAR}
+        self.functions = set(_function_symbols())
+
+    def function(self, A):
+        em = self.em
+        em.emit(0, f"def {_func_name(A)}(k, i):")
+        em.emit(1, f'"""{A} -> ' + " | ".join(" ".join(p) for p in GRAMMAR[A]) + '"""')
+        self.nonterminal(A, 1, inline=False, known=None)
+        em.emit(0, "")
+        em.emit(0, "")
+
+    def nonterminal(self, A, depth, inline, known):
+        """
+        Emite o despacho de A. `known` é o conjunto de códigos ao qual o
+        token atual `c` (ainda não consumido) certamente pertence, ou None:
+        ramos impossíveis são omitidos e, se restar um único ramo que cobre
+        `known`, o teste é dispensado.
+        """
+
+        em = self.em
+        loop = _is_loop(A)
+        if loop:
+            em.emit(depth, "while True:")
+            depth += 1
+            known = None
+        if known is None:
+            em.emit(depth, "c = k[i]")
+
+        branches = [(codes, prod) for codes, prod in self.branches[A]
+                    if known is None or codes & known]
+        if known is not None and len(branches) == 1 and branches[0][0] >= known:
+            self.body(A, branches[0][1], depth, loop, inline, known)
+            return
+
+        for n, (codes, prod) in enumerate(branches):
+            em.emit(depth, ("if " if n == 0 else "elif ") + em.test("c", codes) + ":")
+            self.body(A, prod, depth + 1, loop, inline,
+                      codes if known is None else codes & known)
+        if inline and not loop:
+            em.emit(depth, "else:")
+            em.emit(depth + 1, f"raise _no_rule({A!r}, c)")
+        else:
+            em.emit(depth, f"raise _no_rule({A!r}, c)")
+
+    def body(self, A, prod, depth, loop, inline, known):
+        """
+        Emite o reconhecimento dos símbolos de `prod`. O primeiro terminal,
+        se houver, já foi verificado pelo despacho. Terminais consecutivos
+        são comparados em k[i + n] e o índice é avançado uma única vez. Em
+        um laço, o próprio A no fim da produção vira `continue`.
+        """
+
+        em = self.em
+        symbols = [X for X in prod if X != EPS]
+        offset = 0
+        start = len(em.lines)
+
+        def flush():
+            nonlocal offset
+            if offset:
+                em.emit(depth, f"i += {offset}")
+                offset = 0
+
+        for j, X in enumerate(symbols):
+            last = j == len(symbols) - 1
+            if X not in GRAMMAR:
+                if j > 0:
+                    pos = f"k[i + {offset}]" if offset else "k[i]"
+                    em.emit(depth, f"if {pos} != {_CODES[X]}:")
+                    em.emit(depth + 1, f"raise _expected({X!r}, {pos})")
+                offset += 1
+                continue
+
+            flush()
+            if loop and last and X == A:
+                em.emit(depth, "continue")
+                return
+            if X not in self.functions:
+                self.nonterminal(X, depth, True, known if j == 0 else None)
+            elif last and not inline:
+                em.emit(depth, f"return {_func_name(X)}(k, i)")
+                return
+            else:
+                em.emit(depth, f"i = {_func_name(X)}(k, i)")
+
+        if not inline:
+            em.emit(depth, f"return i + {offset}" if offset else "return i")
+            return
+        flush()
+        if loop:
+            em.emit(depth, "break")
+        elif len(em.lines) == start:
+            em.emit(depth, "pass")
+
+
+def generate_parser(table=None):
+    """
+    Gera o código-fonte do módulo do parser descendente recursivo.
+
+    Parâmetros:
+      table (dict): A Tabela LL(1) (padrão: a de get_tables()).
+
+    Retorno:
+      str: O código-fonte do módulo.
+    """
+
+    if table is None:
+        table = get_tables()[2]
+
+    gen = _Generator(table)
+    for A in GRAMMAR:
+        if A in gen.functions:
+            gen.function(A)
+    em = gen.em
+
+    names = tuple(KIND_TO_TERMINAL)
+    header = _HEADER.format(
+        grammar_hash=grammar_hash(),
+        names=names,
+        type_codes=dict(TOKEN_CODES),
+        eof=EOF_CODE,
+        start=_func_name("MAIN"),
+    )
+    sets = "\n".join(f"{name} = frozenset({codes!r})" for codes, name in em.sets.items())
+    return f"{header}\n\n{sets}\n\n\n" + "\n".join(em.lines).rstrip() + "\n"
+
+
+def load_parser(table=None):
+    """
+    Gera o parser e o carrega em memória, sem gravar arquivo.
+
+    Retorno:
+      dict: O namespace do módulo gerado (com "parse", "parse_codes", ...).
+    """
+
+    namespace = {"__name__": "lsi_rd_parser"}
+    exec(compile(generate_parser(table), "<lsi_rd_parser>", "exec"), namespace)
+    return namespace
+
+
+# =========================================
+# MAIN
+# =========================================
+if __name__ == "__main__":
+    import argparse
+
+    """
+    Gera src/lsi_rd_parser.py (ou o arquivo de -o). Com --check, apenas
+    verifica se o arquivo existente corresponde à GRAMMAR atual (código de
+    saída 1 se estiver desatualizado).
+    """
+
+    ap = argparse.ArgumentParser(description="Gera o parser descendente recursivo da linguagem LSI.")
+    ap.add_argument("-o", "--output", default=DEFAULT_OUTPUT, help="arquivo de saída")
+    ap.add_argument("--check", action="store_true",
+                    help="verifica se o arquivo de saída está atualizado")
+    args = ap.parse_args()
+
+    source = generate_parser()
+    if args.check:
+        try:
+            with open(args.output) as f:
+                current = f.read()
+        except OSError:
+            current = None
+        if current != source:
+            print(f"{args.output} está desatualizado; execute python3 src/lsi_codegen.py")
+            sys.exit(1)
+        print(f"{args.output} está atualizado.")
+        sys.exit(0)
+
+    with open(args.output, "w") as f:
+        f.write(source)
+    print(f"Parser gerado em {args.output}")
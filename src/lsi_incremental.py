@@ -0,0 +1,374 @@
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from itertools import repeat
+from operator import add
+
+from lsi_ast import Program, copy_tree
+from lsi_lexer import (
+    _ERR_GROUP, _KEYWORD_TYPES, _OP_TYPES, EOF_CODE, MASTER_PATTERN, TOKEN_CODES, LexerError,
+    RegexLexer, TokenBuffer,
+)
+from lsi_parser import Parser
+
+# =========================================
+# ANÁLISE LÉXICA E SINTÁTICA INCREMENTAL
+# =========================================
+#
+# Para editores: depois de uma edição (deslocamento, quantidade de caracteres
+# removidos, texto inserido), apenas a região danificada é analisada de novo.
+#
+# Léxico (relex): a varredura recomeça no fim do último token anterior à
+# edição (entre dois tokens o lexer não guarda estado) e termina assim que um
+# token novo, já depois do texto inserido, coincide com um token antigo na
+# posição deslocada: daí em diante o texto é o mesmo e os tokens também. Os
+# tokens seguintes são reaproveitados, com deslocamentos e linhas ajustados.
+#
+# Sintático (IncrementalDocument): o programa é uma sequência de FDEF. Cada
+# função é analisada isoladamente (Parser.parse_ast_symbol) e o resultado fica
+# guardado pelo índice do seu primeiro token; após uma edição, só as funções
+# que tocam a região alterada são reanalisadas.
+#
+# Os resultados (TokenBuffer, AST e erros) são idênticos aos de uma análise
+# completa do texto editado.
+
+_DEF_CODE = TOKEN_CODES["DEF"]
+
+
+@dataclass
+class TokenEdit:
+    """
+    Descreve a alteração do TokenBuffer feita por relex().
+
+    Os tokens old[first:old_stop] foram substituídos por new[first:new_stop].
+    Os tokens antigos a partir de `clean` (>= old_stop) continuam iguais no
+    novo buffer, no índice deslocado de new_stop - old_stop, com a mesma
+    coluna e a linha somada de `line_delta`.
+    """
+    first: int
+    old_stop: int
+    new_stop: int
+    clean: int
+    line_delta: int
+
+    @property
+    def shift(self):
+        """Deslocamento dos índices dos tokens depois da região alterada."""
+        return self.new_stop - self.old_stop
+
+
+def _token_type(lex):
+    typ = _KEYWORD_TYPES.get(lex) or _OP_TYPES.get(lex)
+    if typ is None:
+        typ = "NUM" if lex[0].isdigit() else "ID"
+    return typ
+
+
+def _full_relex(buf, text):
+    new = RegexLexer(text).tokenize_all(as_buffer=True)[0]
+    return new, TokenEdit(0, len(buf), len(new), len(buf), 0)
+
+
+def relex(buf, offset, deleted, inserted):
+    """
+    Atualiza os tokens de `buf` para uma edição do seu código-fonte.
+
+    Parâmetros:
+      buf (TokenBuffer): Os tokens do texto antes da edição (buf.text).
+      offset (int): Posição da edição no texto antigo.
+      deleted (int): Quantidade de caracteres removidos a partir de `offset`.
+      inserted (str): Texto inserido em `offset`.
+
+    Retorno:
+      tuple: (TokenBuffer do texto editado, TokenEdit)
+
+    Lança:
+      ValueError: Se a edição estiver fora do texto.
+      LexerError: Se o texto editado tiver um erro léxico.
+    """
+
+    old = buf.text
+    if offset < 0 or deleted < 0 or offset + deleted > len(old):
+        raise ValueError(f"edição fora do texto: offset={offset}, deleted={deleted}, tamanho={len(old)}")
+
+    text = old[:offset] + inserted + old[offset + deleted:]
+    delta = len(inserted) - deleted
+    old_edit_end = offset + deleted
+    edit_end = offset + len(inserted)
+
+    kinds, starts, ends, lines, cols = buf.kinds, buf.starts, buf.ends, buf.lines, buf.cols
+    n = len(buf) - 1  # índice do EOF
+
+    # Primeiro token que pode mudar: o que termina em `offset` ou depois (um
+    # token colado à edição pode crescer, ex: "AB" + "C", ou "<" + "=")
+    first = bisect_left(ends, offset, 0, n)
+    if first:
+        pos = ends[first - 1]
+        prev = starts[first - 1]
+        line = lines[first - 1]
+        last_nl = starts[first - 1] - cols[first - 1]
+    else:
+        pos = prev = 0
+        line = 1
+        last_nl = -1
+
+    # Candidato à ressincronização: primeiro token antigo após a região removida
+    j = bisect_left(starts, old_edit_end, 0, n)
+    new_kinds, new_starts, new_ends, new_lines, new_cols = [], [], [], [], []
+    match = MASTER_PATTERN.match
+    resynced = False
+
+    while True:
+        m = match(text, pos)
+        kind = m.lastindex
+        if kind is None:
+            break
+        if kind == _ERR_GROUP:
+            # caractere fora do padrão: o Lexer original decide (erro léxico
+            # ou token não-ASCII)
+            return _full_relex(buf, text)
+
+        s, e = m.span(1)
+        if s >= edit_end:
+            target = s - delta
+            while j < n and starts[j] < target:
+                j += 1
+            if j < n and starts[j] == target and ends[j] == e - delta:
+                resynced = True
+                break
+
+        nl = text.count("\n", prev, s)
+        if nl:
+            line += nl
+            last_nl = text.rindex("\n", prev, s)
+        prev = s
+        new_kinds.append(TOKEN_CODES[_token_type(m.group(1))])
+        new_starts.append(s)
+        new_ends.append(e)
+        new_lines.append(line)
+        new_cols.append(s - last_nl)
+        pos = e
+
+    if not resynced:
+        # a varredura chegou ao fim do texto: o EOF também é novo
+        size = len(text)
+        nl = text.count("\n", prev, size)
+        if nl:
+            line += nl
+            last_nl = text.rindex("\n", prev, size)
+        new_kinds.append(EOF_CODE)
+        new_starts.append(size)
+        new_ends.append(size)
+        new_lines.append(line)
+        new_cols.append(size - last_nl)
+        j = n + 1
+
+    new_stop = first + len(new_kinds)
+    line_delta = inserted.count("\n") - old.count("\n", offset, old_edit_end)
+
+    out = TokenBuffer(text)
+    out.kinds = kinds[:first] + array("B", new_kinds) + kinds[j:]
+    if delta:
+        out.starts = starts[:first] + array("I", new_starts) + array("I", map(add, starts[j:], repeat(delta)))
+        out.ends = ends[:first] + array("I", new_ends) + array("I", map(add, ends[j:], repeat(delta)))
+    else:
+        out.starts = starts[:first] + array("I", new_starts) + starts[j:]
+        out.ends = ends[:first] + array("I", new_ends) + ends[j:]
+    if line_delta:
+        out.lines = lines[:first] + array("I", new_lines) + array("I", map(add, lines[j:], repeat(line_delta)))
+    else:
+        out.lines = lines[:first] + array("I", new_lines) + lines[j:]
+    out.cols = cols[:first] + array("I", new_cols) + cols[j:]
+
+    # Tokens reaproveitados na mesma linha do fim da edição mudam de coluna
+    clean = j
+    if j <= n:
+        nl_after = old.find("\n", old_edit_end)
+        while clean <= n and (nl_after < 0 or starts[clean] < nl_after):
+            k = new_stop + clean - j
+            s = out.starts[k]
+            out.cols[k] = s - text.rfind("\n", 0, s)
+            clean += 1
+
+    return out, TokenEdit(first, j, new_stop, clean, line_delta)
+
+
+# =========================================
+# DOCUMENTO INCREMENTAL
+# =========================================
+class _Chunk:
+    """
+    Resultado da análise de uma função (FDEF) a partir de um token `def`.
+
+    Atributos:
+      stop (int): Índice do token seguinte à função (se não houve erro).
+      check (int): Índice seguinte ao último token examinado (o resultado
+        depende só dos tokens até aqui).
+      fdef (FuncDef): A AST da função, ou None se houve erro.
+      error (str): A mensagem do erro sintático, ou None.
+      line_shift (int): Deslocamento das linhas da função desde a análise
+        (aplicado às cópias de `fdef` devolvidas por parse_ast).
+    """
+
+    __slots__ = ("stop", "check", "fdef", "error", "line_shift")
+
+    def __init__(self, stop, check, fdef, error):
+        self.stop = stop
+        self.check = check
+        self.fdef = fdef
+        self.error = error
+        self.line_shift = 0
+
+
+class IncrementalDocument:
+    """
+    Código-fonte LSI mantido sob edições, com tokens e AST atualizados de
+    forma incremental.
+
+    Parâmetros:
+      text (str): O código-fonte inicial.
+      parser (Parser): O Parser a usar (padrão: um novo Parser).
+
+    Atributos:
+      tokens (TokenBuffer): Os tokens do texto atual, ou None se o texto tem
+        um erro léxico.
+      stats (dict): Contadores da última operação: "relexed" (tokens novos
+        na última edição), "reparsed" e "reused" (funções analisadas e
+        reaproveitadas na última parse_ast).
+
+    Lança:
+      LexerError: Se o texto inicial tiver um erro léxico.
+    """
+
+    def __init__(self, text, parser=None):
+        self.parser = parser if parser is not None else Parser()
+        self.tokens = RegexLexer(text).tokenize_all(as_buffer=True)[0]
+        self._text = text
+        self._chunks = {}
+        self.stats = {"relexed": len(self.tokens), "reparsed": 0, "reused": 0}
+
+    @property
+    def text(self):
+        return self._text
+
+    def edit(self, offset, deleted, inserted):
+        """
+        Aplica uma edição ao texto e atualiza os tokens (ver relex).
+
+        Retorno:
+          TokenEdit: A alteração dos tokens.
+
+        Lança:
+          ValueError: Se a edição estiver fora do texto.
+          LexerError: Se o texto editado tiver um erro léxico; o texto é
+            atualizado mesmo assim, e a próxima edição refaz a análise léxica
+            completa.
+        """
+
+        if self.tokens is None:
+            old = self._text
+            if offset < 0 or deleted < 0 or offset + deleted > len(old):
+                raise ValueError(f"edição fora do texto: offset={offset}, deleted={deleted}, tamanho={len(old)}")
+            self._text = old[:offset] + inserted + old[offset + deleted:]
+            self.tokens = RegexLexer(self._text).tokenize_all(as_buffer=True)[0]
+            self.stats["relexed"] = len(self.tokens)
+            return TokenEdit(0, 0, len(self.tokens), 0, 0)
+
+        try:
+            tokens, change = relex(self.tokens, offset, deleted, inserted)
+        except LexerError:
+            self._text = self._text[:offset] + inserted + self._text[offset + deleted:]
+            self.tokens = None
+            self._chunks = {}
+            raise
+
+        self._text = tokens.text
+        self.tokens = tokens
+        self.stats["relexed"] = change.new_stop - change.first
+
+        # Reaproveita as funções antes da região alterada (índices iguais) e
+        # depois dela (índices e linhas deslocados)
+        shift = change.shift
+        chunks = {}
+        for start, chunk in self._chunks.items():
+            if chunk.check <= change.first:
+                chunks[start] = chunk
+            elif start >= change.clean:
+                chunk.check += shift
+                if chunk.fdef is not None:
+                    chunk.stop += shift
+                    chunk.line_shift += change.line_delta
+                chunks[start + shift] = chunk
+        self._chunks = chunks
+        return change
+
+    def parse_ast(self):
+        """
+        Retorna a AST do texto atual, reanalisando apenas as funções que não
+        estão guardadas.
+
+        Retorno:
+          lsi_ast.Program: A mesma AST de Parser().parse_ast(tokens); uma nova
+            árvore a cada chamada, que o chamador pode modificar.
+
+        Lança:
+          LexerError: Se o texto atual tiver um erro léxico.
+          Exception: O mesmo erro sintático de Parser().parse_ast(tokens).
+        """
+
+        if self.tokens is None:
+            # reproduz o erro léxico
+            RegexLexer(self._text).tokenize_all(as_buffer=True)
+
+        tokens = self.tokens
+        kinds = tokens.kinds
+        chunks = self._chunks
+        on_chain = {}
+        functions = []
+        reparsed = reused = 0
+
+        i = 0
+        while kinds[i] != EOF_CODE:
+            if kinds[i] != _DEF_CODE:
+                # sobra fora de uma função: o erro vem do contexto de
+                # MAIN/FLIST, como na análise completa
+                self.stats.update(reparsed=reparsed, reused=reused)
+                return self.parser.parse_ast(tokens)
+
+            chunk = chunks.get(i)
+            if chunk is None:
+                reparsed += 1
+                try:
+                    fdef, stop = self.parser.parse_ast_symbol(tokens, "FDEF", i)
+                    chunk = _Chunk(stop, stop, fdef, None)
+                except Exception as e:
+                    chunk = _Chunk(None, e.token_index + 1, None, str(e))
+                chunks[i] = chunk
+            else:
+                reused += 1
+            on_chain[i] = chunk
+
+            if chunk.error is not None:
+                self.stats.update(reparsed=reparsed, reused=reused)
+                raise Exception(chunk.error)
+            # a AST guardada não é entregue nem alterada: a cópia pode ser
+            # modificada pelo chamador (lsi_opt.optimize) sem afetar as
+            # próximas chamadas, e as linhas das ASTs já devolvidas não
+            # mudam com as edições seguintes
+            functions.append(copy_tree(chunk.fdef, chunk.line_shift))
+            i = chunk.stop
+
+        self._chunks = on_chain
+        self.stats.update(reparsed=reparsed, reused=reused)
+        return Program(functions, line=1, col=1)
+
+    def parse(self):
+        """
+        Verifica a sintaxe do texto atual (como Parser().parse).
+
+        Retorno:
+          bool: True se o parsing foi bem-sucedido.
+        """
+
+        self.parse_ast()
+        return True
@@ -0,0 +1,587 @@
+import operator
+import sys
+from collections import OrderedDict
+
+from lsi_ast import Assign, BinOp, Block, Call, If, Num, Print, Return, Var, VarDecl, iter_children
+from lsi_lexer import RegexLexer
+from lsi_parser import Parser
+
+# =========================================
+# INTERPRETADOR DA LINGUAGEM LSI
+# =========================================
+#
+# Executa a AST produzida por Parser.parse_ast. Antes da execução, cada
+# função é resolvida uma única vez: parâmetros e variáveis locais recebem
+# um índice (slot) no quadro da função, chamadas são ligadas à função
+# chamada, e cada nó vira uma closure Python que opera diretamente sobre a
+# lista de slots do quadro, sem nenhuma busca por nome durante a execução.
+#
+# Semântica:
+#   * todos os valores são inteiros; variáveis declaradas começam em 0;
+#   * comparações valem 1 (verdadeiro) ou 0 (falso), e o `if` testa != 0;
+#   * a divisão é inteira, truncada em direção a zero (como em C);
+#   * `return;` e o fim de uma função sem `return` devolvem 0.
+
+DEFAULT_ENTRY = "principal"
+
+# Limite de recursão do Python durante a execução (cada chamada LSI usa
+# alguns quadros do Python)
+RECURSION_LIMIT = 20000
+
+# Capacidade padrão do cache de memoização (entradas)
+DEFAULT_MEMO_SIZE = 65536
+
+
+class InterpreterError(Exception):
+    """
+    Erro semântico (detectado na resolução) ou de execução de um programa LSI.
+
+    Atributos:
+      line (int): Linha do nó onde o erro ocorreu (None se desconhecida).
+      col (int): Coluna do nó onde o erro ocorreu (None se desconhecida).
+    """
+
+    def __init__(self, message, line=None, col=None):
+        if line is not None:
+            message = f"Erro em linha: {line} Coluna: {col} — {message}"
+        super().__init__(message)
+        self.line = line
+        self.col = col
+
+
+class BufferedOutput:
+    """
+    Saída do `print`, escrita em blocos.
+
+    Os valores impressos são acumulados e gravados em `stream` a cada
+    `buffer_lines` linhas (uma única chamada a write) e em flush().
+
+    Parâmetros:
+      stream (file): Destino da saída (ex: sys.stdout).
+      buffer_lines (int): Quantidade de linhas acumuladas antes de gravar.
+    """
+
+    def __init__(self, stream, buffer_lines=8192):
+        self.stream = stream
+        self.buffer_lines = buffer_lines
+        self._lines = []
+
+    def write(self, value):
+        lines = self._lines
+        lines.append(f"{value}\n")
+        if len(lines) >= self.buffer_lines:
+            self.flush()
+
+    def flush(self):
+        if self._lines:
+            self.stream.write("".join(self._lines))
+            self._lines.clear()
+        self.stream.flush()
+
+
+class Function:
+    """
+    Função LSI resolvida.
+
+    Atributos:
+      name (str): Nome da função.
+      n_params (int): Quantidade de parâmetros (slots 0..n_params-1).
+      n_slots (int): Tamanho do quadro (parâmetros + variáveis locais).
+      slots (dict): Nome -> índice do slot (para depuração).
+      body (callable): Closure que executa o corpo sobre um quadro (lista)
+        e devolve o valor de retorno, ou None se a função terminar sem
+        `return`.
+    """
+
+    __slots__ = ("name", "n_params", "n_slots", "slots", "body", "node", "pure")
+
+    def __init__(self, node):
+        self.node = node
+        self.name = node.name
+        self.n_params = len(node.params)
+        self.n_slots = 0
+        self.slots = {}
+        self.body = None
+        self.pure = False
+
+
+def function_slots(fdef):
+    """
+    Atribui um slot a cada parâmetro (0..n-1) e a cada variável declarada
+    no corpo de `fdef` (lsi_ast.FuncDef), na ordem em que aparecem. O escopo
+    de uma variável é a função inteira.
+
+    Retorno:
+      dict: Nome -> índice do slot.
+    """
+
+    slots = {}
+    for param in fdef.params:
+        slots.setdefault(param.name, len(slots))
+
+    def collect(stmts):
+        for stmt in stmts:
+            if isinstance(stmt, VarDecl):
+                for ident in stmt.names:
+                    slots.setdefault(ident.name, len(slots))
+            elif isinstance(stmt, If):
+                collect(stmt.body)
+                if stmt.orelse is not None:
+                    collect(stmt.orelse)
+            elif isinstance(stmt, Block):
+                collect(stmt.body)
+
+    collect(fdef.body)
+    return slots
+
+
+def resolve_slot(name, node, slots):
+    """
+    Retorna o slot da variável `name` usada em `node`.
+
+    Lança:
+      InterpreterError: Se a variável não foi declarada na função.
+    """
+
+    slot = slots.get(name)
+    if slot is None:
+        raise InterpreterError(f"variável '{name}' não declarada", node.line, node.col)
+    return slot
+
+
+def pure_functions(program):
+    """
+    Análise de pureza: retorna os nomes das funções de `program` cujo
+    resultado depende apenas dos argumentos. Uma função é pura se não
+    contém `print` e só chama funções puras (a recursão, inclusive mútua,
+    é permitida).
+
+    Começa supondo todas as funções puras e remove, até estabilizar, as que
+    imprimem ou chamam uma função impura (ou inexistente).
+    """
+
+    calls = {}
+    prints = set()
+
+    def visit(node, name):
+        if isinstance(node, Print):
+            prints.add(name)
+        elif isinstance(node, Call):
+            calls[name].add(node.name)
+        for child in iter_children(node):
+            visit(child, name)
+
+    for fdef in program.functions:
+        calls.setdefault(fdef.name, set())
+        for stmt in fdef.body:
+            visit(stmt, fdef.name)
+
+    pure = set(calls) - prints
+    changed = True
+    while changed:
+        changed = False
+        for name in list(pure):
+            if not calls[name] <= pure:
+                pure.discard(name)
+                changed = True
+    return pure
+
+
+class MemoCache:
+    """
+    Cache LRU de resultados de chamadas a funções puras.
+
+    As chaves são tuplas (função, argumentos...). Ao atingir `maxsize`
+    entradas, a usada há mais tempo é descartada.
+
+    Atributos:
+      maxsize (int): Capacidade do cache.
+      hits (int): Consultas encontradas no cache.
+      misses (int): Consultas não encontradas.
+    """
+
+    # Devolvido por lookup() quando a chave não está no cache
+    MISSING = object()
+
+    __slots__ = ("maxsize", "hits", "misses", "_data")
+
+    def __init__(self, maxsize=DEFAULT_MEMO_SIZE):
+        if maxsize < 1:
+            raise ValueError("maxsize deve ser >= 1")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def lookup(self, key):
+        """Retorna o valor de `key` (marcando-o como recente) ou MISSING."""
+
+        data = self._data
+        try:
+            value = data[key]
+        except KeyError:
+            self.misses += 1
+            return self.MISSING
+        data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def store(self, key, value):
+        data = self._data
+        data[key] = value
+        if len(data) > self.maxsize:
+            data.popitem(last=False)
+
+    def stats(self):
+        """Retorna a linha de estatísticas do cache."""
+
+        total = self.hits + self.misses
+        ratio = self.hits / total if total else 0.0
+        return (f"memo: {self.hits} acertos, {self.misses} falhas ({ratio:.1%}), "
+                f"{len(self._data)}/{self.maxsize} entradas")
+
+
+def _div(a, b):
+    q = abs(a) // abs(b)
+    return q if (a < 0) == (b < 0) else -q
+
+
+_ARITH = {
+    "PLUS": operator.add,
+    "MINUS": operator.sub,
+    "TIMES": operator.mul,
+}
+
+_COMPARE = {
+    "LT": operator.lt,
+    "LE": operator.le,
+    "GT": operator.gt,
+    "GE": operator.ge,
+    "EQ": operator.eq,
+    "NE": operator.ne,
+}
+
+
+class Interpreter:
+    """
+    Interpretador de programas LSI sobre a AST.
+
+    Parâmetros:
+      program (lsi_ast.Program): A AST do programa (Parser.parse_ast).
+      out (file): Destino do `print` (padrão: sys.stdout), escrito por um
+        BufferedOutput.
+      memo (MemoCache): Se informado, as chamadas a funções puras (ver
+        pure_functions) consultam e alimentam este cache.
+
+    Lança:
+      InterpreterError: Se o programa usar uma variável não declarada,
+        chamar uma função inexistente ou com o número errado de argumentos,
+        ou definir duas funções com o mesmo nome.
+    """
+
+    def __init__(self, program, out=None, memo=None):
+        self.output = BufferedOutput(out if out is not None else sys.stdout)
+        self.memo = memo
+        self.functions = {}
+
+        for node in program.functions:
+            if node.name in self.functions:
+                raise InterpreterError(f"função '{node.name}' já definida", node.line, node.col)
+            self.functions[node.name] = Function(node)
+
+        for name in pure_functions(program):
+            self.functions[name].pure = True
+
+        for fn in self.functions.values():
+            self._resolve_function(fn)
+
+    # -------------------------------------
+    # EXECUÇÃO
+    # -------------------------------------
+    def run(self, entry=DEFAULT_ENTRY, args=()):
+        """
+        Executa a função `entry` com os argumentos inteiros `args`.
+
+        Retorno:
+          int: O valor devolvido pela função.
+
+        Lança:
+          InterpreterError: Se `entry` não existir ou receber o número errado
+            de argumentos, ou em um erro de execução (ex: divisão por zero).
+        """
+
+        fn = self.functions.get(entry)
+        if fn is None:
+            raise InterpreterError(f"função de entrada '{entry}' não definida")
+        if len(args) != fn.n_params:
+            raise InterpreterError(
+                f"'{entry}' espera {fn.n_params} argumento(s), recebeu {len(args)}"
+            )
+
+        frame = [int(a) for a in args] + [0] * (fn.n_slots - fn.n_params)
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(limit, RECURSION_LIMIT))
+        try:
+            result = fn.body(frame)
+        except RecursionError:
+            raise InterpreterError("recursão muito profunda") from None
+        finally:
+            sys.setrecursionlimit(limit)
+            self.output.flush()
+        return 0 if result is None else result
+
+    # -------------------------------------
+    # RESOLUÇÃO (AST -> closures)
+    # -------------------------------------
+    def _resolve_function(self, fn):
+        """
+        Atribui slots aos parâmetros e a todas as variáveis declaradas no
+        corpo (o escopo de uma variável é a função inteira) e compila o corpo.
+        """
+
+        slots = fn.slots = function_slots(fn.node)
+        fn.n_slots = len(slots)
+        fn.body = self._block(fn.node.body, slots)
+
+    def _slot(self, name, node, slots):
+        return resolve_slot(name, node, slots)
+
+    def _block(self, stmts, slots):
+        """
+        Compila uma lista de comandos. A closure devolve o valor de um
+        `return` executado (que encerra a função) ou None.
+        """
+
+        compiled = [self._stmt(s, slots) for s in stmts]
+        compiled = [c for c in compiled if c is not None]
+
+        if not compiled:
+            return lambda f: None
+        if len(compiled) == 1:
+            return compiled[0]
+
+        def run_block(f):
+            for stmt in compiled:
+                r = stmt(f)
+                if r is not None:
+                    return r
+            return None
+
+        return run_block
+
+    def _stmt(self, node, slots):
+        if isinstance(node, Assign):
+            slot = self._slot(node.name, node, slots)
+            value = self._expr(node.value, slots)
+
+            def assign(f):
+                f[slot] = value(f)
+
+            return assign
+
+        if isinstance(node, Print):
+            value = self._expr(node.value, slots)
+            write = self.output.write
+            return lambda f: write(value(f))
+
+        if isinstance(node, Return):
+            if node.value is None:
+                return lambda f: 0
+            return self._expr(node.value, slots)
+
+        if isinstance(node, If):
+            cond = self._expr(node.cond, slots)
+            body = self._block(node.body, slots)
+            if node.orelse is None:
+                return lambda f: body(f) if cond(f) else None
+            orelse = self._block(node.orelse, slots)
+            return lambda f: body(f) if cond(f) else orelse(f)
+
+        if isinstance(node, Block):
+            return self._block(node.body, slots)
+
+        if isinstance(node, VarDecl):
+            declared = tuple(slots[ident.name] for ident in node.names)
+
+            def declare(f):
+                for slot in declared:
+                    f[slot] = 0
+
+            return declare
+
+        raise InterpreterError(f"comando não suportado: {type(node).__name__}", node.line, node.col)
+
+    def _expr(self, node, slots):
+        if isinstance(node, Num):
+            value = node.value
+            return lambda f: value
+
+        if isinstance(node, Var):
+            slot = self._slot(node.name, node, slots)
+            return lambda f: f[slot]
+
+        if isinstance(node, BinOp):
+            left = self._expr(node.left, slots)
+            right = self._expr(node.right, slots)
+
+            if node.op in _COMPARE:
+                cmp = _COMPARE[node.op]
+                return lambda f: 1 if cmp(left(f), right(f)) else 0
+
+            if node.op == "DIV":
+                line, col = node.line, node.col
+
+                def divide(f):
+                    # da esquerda para a direita, como na VM: os efeitos
+                    # (print) de `left` vêm antes dos de `right`
+                    a = left(f)
+                    b = right(f)
+                    if b == 0:
+                        raise InterpreterError("divisão por zero", line, col)
+                    return _div(a, b)
+
+                return divide
+
+            op = _ARITH[node.op]
+            return lambda f: op(left(f), right(f))
+
+        if isinstance(node, Call):
+            return self._call(node, slots)
+
+        raise InterpreterError(f"expressão não suportada: {type(node).__name__}", node.line, node.col)
+
+    def _call(self, node, slots):
+        fn = self.functions.get(node.name)
+        if fn is None:
+            raise InterpreterError(f"função '{node.name}' não definida", node.line, node.col)
+        if len(node.args) != fn.n_params:
+            raise InterpreterError(
+                f"'{node.name}' espera {fn.n_params} argumento(s), recebeu {len(node.args)}",
+                node.line, node.col,
+            )
+
+        args = tuple(self._expr(a, slots) for a in node.args)
+
+        if fn.pure and self.memo is not None:
+            return self._memo_call(fn, args)
+
+        # `fn.body` e `fn.n_slots` são lidos na chamada: a função chamada pode
+        # ainda não ter sido resolvida (chamadas antes da definição, recursão)
+        if len(args) == 1:
+            arg = args[0]
+
+            def call1(f):
+                frame = [arg(f)]
+                if fn.n_slots > 1:
+                    frame.extend([0] * (fn.n_slots - 1))
+                r = fn.body(frame)
+                return 0 if r is None else r
+
+            return call1
+
+        def call(f):
+            frame = [a(f) for a in args]
+            extra = fn.n_slots - len(frame)
+            if extra:
+                frame.extend([0] * extra)
+            r = fn.body(frame)
+            return 0 if r is None else r
+
+        return call
+
+    def _memo_call(self, fn, args):
+        """
+        Chamada a uma função pura via cache: a chave é (nome, argumentos...).
+        """
+
+        lookup, store, missing = self.memo.lookup, self.memo.store, MemoCache.MISSING
+        name = fn.name
+
+        def memo_call(f):
+            values = [a(f) for a in args]
+            key = (name, *values)
+            r = lookup(key)
+            if r is missing:
+                if fn.n_slots > len(values):
+                    values.extend([0] * (fn.n_slots - len(values)))
+                r = fn.body(values)
+                if r is None:
+                    r = 0
+                store(key, r)
+            return r
+
+        return memo_call
+
+
+def load_program(text):
+    """
+    Executa as análises léxica e sintática de `text` e devolve a AST.
+
+    Lança:
+      LexerError: Em caso de erro léxico.
+      Exception: Em caso de erro sintático.
+    """
+
+    tokens, _ = RegexLexer(text).tokenize_all(as_buffer=True)
+    return Parser().parse_ast(tokens)
+
+
+# =========================================
+# MAIN
+# =========================================
+if __name__ == "__main__":
+    import argparse
+    from lsi_lexer import LexerError
+    from lsi_opt import PASSES, format_stats, optimize
+
+    """
+    Executa um programa LSI a partir da função de entrada (padrão:
+    principal), imprimindo a saída dos comandos `print`.
+    """
+
+    ap = argparse.ArgumentParser(description="Interpretador da linguagem LSI.")
+    ap.add_argument("file", help="arquivo .lsi de entrada")
+    ap.add_argument("args", nargs="*", type=int, help="argumentos inteiros da função de entrada")
+    ap.add_argument("--entry", default=DEFAULT_ENTRY, help="função de entrada (padrão: principal)")
+    ap.add_argument("-O", "--optimize", action="store_true", help="aplica os passes do lsi_opt antes da execução")
+    ap.add_argument("--disable", action="append", default=[], choices=list(PASSES),
+                    metavar="PASS", help=f"com -O, desliga um pass ({', '.join(PASSES)}); pode repetir")
+    ap.add_argument("--opt-stats", action="store_true", help="com -O, exibe as estatísticas dos passes em stderr")
+    ap.add_argument("--memo", action="store_true", help="memoiza as chamadas a funções puras (cache LRU)")
+    ap.add_argument("--memo-size", type=int, default=DEFAULT_MEMO_SIZE, metavar="N",
+                    help=f"capacidade do cache de --memo (padrão: {DEFAULT_MEMO_SIZE})")
+    ap.add_argument("--memo-stats", action="store_true", help="com --memo, exibe acertos e falhas do cache em stderr")
+    args = ap.parse_args()
+
+    with open(args.file) as f:
+        text = f.read()
+
+    try:
+        program = load_program(text)
+    except LexerError as e:
+        print(f"\n=== ERRO LÉXICO ===")
+        print(e)
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n=== ERRO SINTÁTICO ===")
+        print(e)
+        sys.exit(1)
+
+    if args.optimize:
+        stats = optimize(program, disabled=args.disable)
+        if args.opt_stats:
+            print(format_stats(stats), file=sys.stderr)
+
+    memo = MemoCache(args.memo_size) if args.memo else None
+    try:
+        Interpreter(program, memo=memo).run(args.entry, args.args)
+    except InterpreterError as e:
+        print(f"\n=== ERRO DE EXECUÇÃO ===")
+        print(e)
+        sys.exit(1)
+    finally:
+        if memo is not None and args.memo_stats:
+            print(memo.stats(), file=sys.stderr)
@@ -1,4 +1,15 @@
+import gc
+import io
+import mmap
+import os
+import re
+import stat
+from array import array
+from bisect import bisect_right
+from contextlib import contextmanager
 from dataclasses import dataclass
+from itertools import accumulate, chain, compress, repeat
+from operator import ne, sub
 
 KEYWORDS = {"int", "if", "else", "def", "print", "return"}
 
@@ -11,6 +22,17 @@ SINGLE_CHAR_TOKENS = {
 MULTI_CHAR = {'<=': 'LE', '>=': 'GE', '==': 'EQ', '!=': 'NE'}
 SIMPLE_OPS = {'<': 'LT', '>': 'GT'}
 
+# Tipos de token na ordem dos códigos inteiros usados pelo TokenBuffer
+TOKEN_TYPES = (
+    ("EOF", "ID", "NUM")
+    + tuple(sorted(kw.upper() for kw in KEYWORDS))
+    + tuple(SINGLE_CHAR_TOKENS.values())
+    + tuple(MULTI_CHAR.values())
+    + tuple(SIMPLE_OPS.values())
+)
+TOKEN_CODES = {typ: code for code, typ in enumerate(TOKEN_TYPES)}
+EOF_CODE = TOKEN_CODES["EOF"]
+
 
 @dataclass
 class Token:
@@ -29,12 +51,139 @@ class Token:
     col: int
 
 
+class TokenBuffer:
+    """
+    Sequência compacta de tokens no formato "struct of arrays".
+
+    Em vez de um objeto Token por token, cada campo é guardado em um array
+    nativo:
+      kinds (array 'B'): código do tipo do token (índice em TOKEN_TYPES).
+      starts / ends (array 'I'): deslocamentos do lexema no código-fonte.
+      lines / cols (array 'I'): linha e coluna onde o token começa
+        (calculados só no primeiro acesso, se o lexer os adiou; ver
+        defer_positions).
+
+    Os lexemas não são armazenados: são fatias de `text` obtidas sob demanda.
+    Indexar ou iterar o buffer produz objetos Token equivalentes aos do
+    tokenize_all tradicional, criados apenas no momento do acesso.
+    """
+
+    __slots__ = ("text", "kinds", "starts", "ends", "_lines", "_cols", "_origin")
+
+    def __init__(self, text):
+        """
+        Cria um buffer vazio associado ao código-fonte `text`.
+        """
+        self.text = text
+        self.kinds = array("B")
+        self.starts = array("I")
+        self.ends = array("I")
+        self._lines = array("I")
+        self._cols = array("I")
+        self._origin = None
+
+    @property
+    def lines(self):
+        if self._lines is None:
+            self._fill_positions()
+        return self._lines
+
+    @lines.setter
+    def lines(self, value):
+        self._lines = value
+
+    @property
+    def cols(self):
+        if self._cols is None:
+            self._fill_positions()
+        return self._cols
+
+    @cols.setter
+    def cols(self, value):
+        self._cols = value
+
+    def defer_positions(self, pos=0, line=1):
+        """
+        Descarta `lines` e `cols`: eles passam a ser calculados, todos de uma
+        vez, no primeiro acesso, a partir de `starts` e das quebras de linha
+        de `text` (ver line_cols). Quem só precisa dos tipos dos tokens (ex:
+        Parser.parse) não paga por esse cálculo.
+
+        Parâmetros:
+          pos (int): Deslocamento a partir do qual os tokens foram lidos.
+          line (int): Linha de `pos`.
+        """
+        self._lines = self._cols = None
+        self._origin = (pos, line)
+
+    def _fill_positions(self):
+        pos, line = self._origin
+        self._lines, self._cols = line_cols(self.text, self.starts, pos, line)
+
+    def append(self, typ, start, end, line, col):
+        """
+        Acrescenta um token ao final do buffer.
+
+        Parâmetros:
+          typ (str): O tipo do token (ex: 'ID', 'EOF').
+          start, end (int): Deslocamentos do lexema no código-fonte.
+          line, col (int): Posição onde o token começa.
+        """
+        self.kinds.append(TOKEN_CODES[typ])
+        self.starts.append(start)
+        self.ends.append(end)
+        self.lines.append(line)
+        self.cols.append(col)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def typ(self, i):
+        """
+        Retorna o tipo (str) do i-ésimo token.
+        """
+        return TOKEN_TYPES[self.kinds[i]]
+
+    def lexeme(self, i):
+        """
+        Retorna o lexema do i-ésimo token ('$' para o EOF).
+        """
+        if self.kinds[i] == EOF_CODE:
+            return "$"
+        return self.text[self.starts[i]:self.ends[i]]
+
+    def __getitem__(self, i):
+        """
+        Retorna uma visão do i-ésimo token como objeto Token.
+        """
+        return Token(self.typ(i), self.lexeme(i), self.lines[i], self.cols[i])
+
+    def __iter__(self):
+        return map(self.__getitem__, range(len(self)))
+
+    def nbytes(self):
+        """
+        Retorna o número de bytes ocupados pelos arrays do buffer
+        (sem contar o código-fonte, que é compartilhado).
+        """
+        return sum(a.itemsize * len(a) for a in
+                   (self.kinds, self.starts, self.ends, self.lines, self.cols))
+
+
 class LexerError(Exception):
     """
-    Exceção customizada para erros léxicos, utilizada para sinalizar
-    a ocorrência de caracteres inválidos.
-    """
-    pass
+    Exceção customizada para erros léxicos, utilizada para sinalizar
+    a ocorrência de caracteres inválidos.
+
+    Atributos:
+      line (int): Linha do caractere inválido (None se desconhecida).
+      col (int): Coluna do caractere inválido (None se desconhecida).
+    """
+
+    def __init__(self, message, line=None, col=None):
+        super().__init__(message)
+        self.line = line
+        self.col = col
 
 
 class Lexer:
@@ -45,12 +194,16 @@ class Lexer:
     Mantém o controle da posição atual (índice, linha e coluna) e gerencia uma Tabela de Símbolos.
     """
 
-    def __init__(self, text: str):
+    def __init__(self, text: str, profile=None):
         """
         Inicializa o Lexer.
 
         Parâmetros:
           text (str): A string contendo o código-fonte completo.
+          profile (lsi_profile.Profile): Opcional. Se informado, next_token é
+            substituído, nesta instância, por uma versão que conta os tokens
+            por tipo e os caracteres ignorados; sem profile (padrão), o
+            next_token da classe é usado sem nenhuma alteração.
         """
         self.text = text
         self.i = 0  # Índice de leitura atual
@@ -62,6 +215,10 @@ class Lexer:
         for kw in KEYWORDS:
             self.symbol_table[kw] = {"kind": "keyword"}
 
+        self.profile = profile
+        if profile is not None:
+            self.next_token = self._next_token_profiled
+
     def peek(self):
         """
         Retorna o próximo caractere sem avançar o ponteiro (lookahead).
@@ -171,15 +328,44 @@ class Lexer:
             return self.make_token(SINGLE_CHAR_TOKENS[self.advance()], c, line, col)
 
         # caso contrário → erro léxico
-        raise LexerError(f"Erro léxico em linha: {line} Coluna: {col} — caractere inválido '{c}'")
+        raise LexerError(f"Erro léxico em linha: {line} Coluna: {col} — caractere inválido '{c}'", line, col)
 
-    def tokenize_all(self):
+    def _next_token_profiled(self):
+        """
+        next_token instrumentado (ver __init__). Os caracteres consumidos
+        além do lexema são os ignorados por skip_space_and_comments.
+        """
+        start = self.i
+        t = type(self).next_token(self)
+        profile = self.profile
+        if t is None:
+            profile.skipped += self.i - start
+        else:
+            profile.tokens[t.typ] += 1
+            profile.skipped += self.i - start - len(t.lexeme)
+        return t
+
+    def tokenize_all(self, as_buffer=False):
         """
         Executa o Lexer para produzir todos os tokens do código-fonte.
 
+        Parâmetros:
+          as_buffer (bool): Se True, os tokens são devolvidos em um TokenBuffer
+            compacto em vez de uma lista de objetos Token.
+
         Retorno:
-          tuple: (list de Tokens, dict Tabela de Símbolos)
+          tuple: (list de Tokens ou TokenBuffer, dict Tabela de Símbolos)
         """
+        if as_buffer:
+            buf = TokenBuffer(self.text)
+            while True:
+                t = self.next_token()
+                if t is None:
+                    break
+                buf.append(t.typ, self.i - len(t.lexeme), self.i, t.line, t.col)
+            buf.append("EOF", self.i, self.i, self.line, self.col)
+            return buf, self.symbol_table
+
         tokens = []
         while True:
             t = self.next_token()
@@ -189,3 +375,545 @@ class Lexer:
 
         tokens.append(Token("EOF", "$", self.line, self.col))
         return tokens, self.symbol_table
+
+    def iter_tokens(self):
+        """
+        Gera os tokens do código-fonte sob demanda, um de cada vez.
+
+        Ao contrário de tokenize_all, nenhuma lista é construída: cada token é
+        reconhecido apenas quando o consumidor (ex: Parser.parse_stream) pede o
+        próximo, e um erro léxico só é lançado quando a análise chega até ele.
+        A tabela de símbolos (self.symbol_table) é preenchida à medida que os
+        identificadores são encontrados.
+
+        Retorno:
+          generator: Tokens, terminando sempre com o token EOF.
+
+        Lança:
+          LexerError: Se um caractere inválido for encontrado.
+        """
+        while True:
+            t = self.next_token()
+            if t is None:
+                break
+            yield t
+
+        yield Token("EOF", "$", self.line, self.col)
+
+
+# =========================================
+# MOTOR DE VARREDURA POR EXPRESSÃO REGULAR
+# =========================================
+_KEYWORD_TYPES = {kw: kw.upper() for kw in KEYWORDS}
+_OP_TYPES = {**SINGLE_CHAR_TOKENS, **SIMPLE_OPS, **MULTI_CHAR}
+_SKIP_PATTERN = r"(?:\s+|//[^\n]*)*+"
+
+
+def _build_master_pattern():
+    """
+    Monta o padrão mestre usado pelo RegexLexer a partir das tabelas de tokens.
+
+    Cada casamento consome os espaços/comentários que antecedem um token e o
+    próprio token:
+      - grupo 1: um lexema válido (identificador, número ou operador);
+      - grupo 2: qualquer outro caractere (candidato a erro léxico);
+      - nenhum grupo: só restam espaços/comentários até o fim da entrada.
+
+    Os operadores são ordenados do mais longo para o mais curto para preservar o
+    maximal munch ('<=' antes de '<'). Identificadores e números só casam quando
+    não são seguidos de um caractere não-ASCII; nesse caso o grupo 2 casa e o
+    lexema é delegado ao Lexer original, garantindo tokens e mensagens de erro
+    idênticos.
+    """
+    ops = sorted(_OP_TYPES, key=len, reverse=True)
+    return re.compile(
+        _SKIP_PATTERN
+        + r"(?:("
+        + r"[A-Za-z_][A-Za-z0-9_]*+(?![^\x00-\x7f])"
+        + r"|[0-9]++(?![^\x00-\x7f])"
+        + "|" + "|".join(re.escape(op) for op in ops)
+        + r")|(.)|\Z)",
+        re.S,
+    )
+
+
+MASTER_PATTERN = _build_master_pattern()
+NEWLINE_PATTERN = re.compile("\n")
+BYTES_NEWLINE_PATTERN = re.compile(b"\n")
+
+_ERR_GROUP = 2
+_match_start = re.Match.start
+
+
+def _build_split_pattern(binary=False):
+    """
+    Monta o padrão usado pela varredura em lote (tokenize_all) do RegexLexer e
+    do BytesLexer com re.split.
+
+    O padrão tem um único grupo, que captura um lexema ASCII (identificador,
+    número ou operador, com o mesmo maximal munch do MASTER_PATTERN) ou um
+    comentário inteiro. re.split devolve então, em uma única chamada nativa,
+    a lista [separador, lexema, separador, lexema, ..., separador]: os
+    deslocamentos saem da soma acumulada dos tamanhos das partes, e a entrada
+    é válida se todos os separadores forem espaços. Um separador com outro
+    caractere contém um erro léxico ou um lexema não-ASCII.
+    """
+    # operadores de um caractere que não começam nenhum outro vão em uma
+    # classe de caracteres, testada primeiro (são os tokens mais comuns); os
+    # demais depois dos operadores mais longos e do comentário
+    longer = sorted((op for op in _OP_TYPES if len(op) > 1), key=len, reverse=True)
+    prefixes = {op[0] for op in longer} | {"/"}
+    single = [op for op in _OP_TYPES if len(op) == 1]
+    plain = [op for op in single if op not in prefixes]
+    pattern = (
+        "([" + "".join(re.escape(op) for op in plain) + "]"
+        + r"|[A-Za-z_][A-Za-z0-9_]*"
+        + r"|[0-9]+"
+        + "|" + "|".join(re.escape(op) for op in longer)
+        + r"|//[^\n]*"
+        + "|[" + "".join(re.escape(op) for op in single if op in prefixes) + "])"
+    )
+    return re.compile(pattern.encode() if binary else pattern)
+
+
+SPLIT_PATTERN = _build_split_pattern()
+BYTES_SPLIT_PATTERN = _build_split_pattern(binary=True)
+
+_SPLIT_CHUNK = 1 << 14  # caracteres por chamada a re.split (cortados em uma quebra de linha)
+_POSITIONS_CHUNK = 1 << 14
+_COMMENT_CODE = 0xFF  # código provisório dos comentários, descartados em _split_scan
+
+
+class _TokenCodes(dict):
+    """
+    Tabela lexema -> código do tipo de token usada por _split_scan.
+
+    Vem pré-carregada com palavras-chave e operadores; identificadores e números
+    são classificados na primeira ocorrência e memorizados, e os identificadores
+    novos são registrados na tabela de símbolos `symtab`, na ordem em que
+    aparecem. Com `binary`, os lexemas são bytes (e são decodificados só para
+    a tabela de símbolos).
+    """
+
+    def __init__(self, symtab, binary=False):
+        encode = str.encode if binary else str
+        super().__init__((encode(kw), TOKEN_CODES[typ]) for kw, typ in _KEYWORD_TYPES.items())
+        self.update((encode(op), TOKEN_CODES[typ]) for op, typ in _OP_TYPES.items())
+        self.symtab = symtab
+        self.binary = binary
+
+    def __missing__(self, lex):
+        first = lex[:1]
+        if first.isdigit():
+            code = TOKEN_CODES["NUM"]
+        elif first in ("/", b"/"):
+            code = _COMMENT_CODE
+        else:
+            code = TOKEN_CODES["ID"]
+            self.symtab.setdefault(lex.decode("ascii") if self.binary else lex, {"kind": "id"})
+        self[lex] = code
+        return code
+
+
+@contextmanager
+def gc_paused():
+    """
+    Suspende o coletor de lixo cíclico durante a criação de muitos objetos.
+
+    Tokens não formam ciclos, mas cada alocação conta para os limiares do
+    coletor; em entradas grandes as coletas repetidas custam tanto quanto a
+    própria varredura.
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def newline_offsets(text):
+    """
+    Retorna a lista (ordenada) dos deslocamentos de todas as quebras de linha.
+
+    A partir dela, a linha de um deslocamento `off` é `bisect_right(nls, off) + 1`
+    e a coluna é `off - nls[linha - 2]` (ou `off + 1` na primeira linha).
+    """
+    return list(map(_match_start, NEWLINE_PATTERN.finditer(text)))
+
+
+def line_cols(text, starts, pos=0, line=1):
+    """
+    Calcula a linha e a coluna de cada deslocamento de `starts`.
+
+    Em vez de uma busca binária por token, cada quebra de linha é localizada
+    entre os deslocamentos (uma busca por linha): daí sai quantos tokens há
+    em cada linha, e linhas e colunas são montadas repetindo o número e o
+    início de cada linha. As quebras de linha são procuradas bloco a bloco,
+    sem uma lista com todas elas.
+
+    Parâmetros:
+      text (str, bytes ou mmap): O código-fonte.
+      starts (array 'I'): Deslocamentos em ordem crescente, a partir de `pos`.
+      pos (int): Deslocamento cuja linha é `line`.
+      line (int): Linha de `pos`.
+
+    Retorno:
+      tuple: (array 'I' linhas, array 'I' colunas)
+    """
+    if isinstance(text, str):
+        newline, pattern = "\n", NEWLINE_PATTERN
+    else:
+        newline, pattern = b"\n", BYTES_NEWLINE_PATTERN
+    lines, cols = array("I"), array("I")
+    last_nl = text.rfind(newline, 0, pos)
+    for k in range(0, len(starts), _POSITIONS_CHUNK):
+        block = starts[k:k + _POSITIONS_CHUNK]
+        nls = list(map(_match_start, pattern.finditer(text, pos, block[-1])))
+        # tokens de cada linha do bloco: entre os primeiros após cada quebra
+        firsts = [0]
+        firsts += map(bisect_right, repeat(block), nls)
+        firsts.append(len(block))
+        counts = list(map(sub, firsts[1:], firsts))
+        line_base = [last_nl]
+        line_base += nls
+        lines.extend(chain.from_iterable(map(repeat, range(line, line + len(counts)), counts)))
+        cols.extend(map(sub, block, chain.from_iterable(map(repeat, line_base, counts))))
+        line += len(nls)
+        last_nl = line_base[-1]
+        pos = block[-1]
+    return lines, cols
+
+
+def _ascii_space(s):
+    # bytes.isspace() não aceita \x1c-\x1f, que str.isspace() aceita
+    return s.isascii() and s.decode("ascii").isspace()
+
+
+def _split_scan(text, pos, line, codes, out, lexemes=None):
+    """
+    Varre text[pos:] em lote com SPLIT_PATTERN (ou BYTES_SPLIT_PATTERN) e
+    acrescenta os tipos e deslocamentos dos tokens a `out`, sem o EOF e sem
+    linhas/colunas.
+
+    A entrada é percorrida em blocos de cerca de _SPLIT_CHUNK caracteres,
+    cortados logo após uma quebra de linha (nenhum token ou comentário
+    atravessa uma). Em cada bloco, só os separadores distintos são
+    verificados; tipos vêm de `codes` e os deslocamentos da soma acumulada
+    dos tamanhos das partes.
+
+    Parâmetros:
+      text (str, bytes ou mmap): O código-fonte.
+      pos (int): Onde começar; `line` é a linha de `pos` (para os erros).
+      codes (_TokenCodes): Tabela de tipos (do mesmo tipo de `text`).
+      out (TokenBuffer): Recebe kinds, starts e ends.
+      lexemes (list): Se informado, recebe também os lexemas.
+
+    Retorno:
+      bool: False se a entrada tem um caractere não-ASCII fora de um
+        comentário (a varredura deve ser refeita pelo caminho original).
+
+    Lança:
+      LexerError: No primeiro caractere inválido (ASCII), com a mesma
+        mensagem do Lexer.
+    """
+    binary = not isinstance(text, str)
+    if binary:
+        pattern, newline, empty, is_space = BYTES_SPLIT_PATTERN, b"\n", b"", _ascii_space
+    else:
+        pattern, newline, empty, is_space = SPLIT_PATTERN, "\n", "", str.isspace
+    split = pattern.split
+    origin, origin_line = pos, line
+    end = len(text)
+
+    while pos < end:
+        stop = text.find(newline, pos + _SPLIT_CHUNK) + 1 or end
+        parts = split(text[pos:stop])
+        bounds = list(accumulate(map(len, parts), initial=pos))
+
+        seps = parts[0::2]
+        spaces = set(seps)
+        spaces.discard(empty)
+        if not all(map(is_space, spaces)):
+            # primeiro caractere que não é espaço fora dos lexemas
+            k = next(k for k, s in enumerate(seps) if s and not is_space(s))
+            if binary:
+                sep = seps[k].decode("latin-1")
+                j = next(j for j, c in enumerate(sep) if not (c.isascii() and c.isspace()))
+            else:
+                sep = seps[k]
+                j = next(j for j, c in enumerate(sep) if not c.isspace())
+            c = sep[j]
+            if not c.isascii():
+                return False
+            at = bounds[2 * k] + j
+            err_lines, err_cols = line_cols(text, array("I", [at]), origin, origin_line)
+            raise LexerError(
+                f"Erro léxico em linha: {err_lines[0]} Coluna: {err_cols[0]} — caractere inválido '{c}'",
+                err_lines[0], err_cols[0])
+
+        lexs = parts[1::2]
+        kinds = bytes(map(codes.__getitem__, lexs))
+        starts = bounds[1:-1:2]
+        ends = bounds[2::2]
+        if _COMMENT_CODE in kinds:
+            keep = list(map(ne, kinds, repeat(_COMMENT_CODE)))
+            kinds = bytes(compress(kinds, keep))
+            starts = list(compress(starts, keep))
+            ends = list(compress(ends, keep))
+            lexs = list(compress(lexs, keep))
+
+        out.kinds.frombytes(kinds)
+        out.starts.extend(starts)
+        out.ends.extend(ends)
+        if lexemes is not None:
+            lexemes += lexs
+        pos = stop
+    return True
+
+
+class RegexLexer(Lexer):
+    """
+    Motor alternativo de análise léxica com a mesma API do Lexer.
+
+    Em vez de consumir um caractere por vez com peek()/advance(), cada token é
+    reconhecido de uma só vez pelo MASTER_PATTERN. Em tokenize_all, linha e
+    coluna não são contadas durante a varredura: são calculadas no final, em
+    lote, a partir dos deslocamentos das quebras de linha (newline_offsets).
+    """
+
+    def next_token(self):
+        """
+        Analisa e retorna o próximo token usando o padrão mestre.
+
+        Retorno:
+          Token: O próximo token válido, ou None se o EOF for alcançado.
+
+        Lança:
+          LexerError: Se um caractere inválido for encontrado.
+        """
+        text = self.text
+        pos = self.i
+        m = MASTER_PATTERN.match(text, pos)
+        kind = m.lastindex
+
+        if kind is None:
+            # só restam espaços/comentários
+            end = len(text)
+        else:
+            end = m.start(kind)
+
+        nl = text.count("\n", pos, end)
+        if nl:
+            self.line += nl
+            self.col = end - text.rindex("\n", pos, end)
+        else:
+            self.col += end - pos
+        self.i = end
+
+        if kind is None:
+            return None
+        if kind == _ERR_GROUP:
+            return Lexer.next_token(self)
+
+        lex = m.group(1)
+        line, col = self.line, self.col
+        self.i = m.end()
+        self.col += len(lex)
+
+        if lex in _KEYWORD_TYPES:
+            return Token(_KEYWORD_TYPES[lex], lex, line, col)
+        if lex in _OP_TYPES:
+            return Token(_OP_TYPES[lex], lex, line, col)
+        typ = "NUM" if lex[0].isdigit() else "ID"
+        return self.make_token(typ, lex, line, col)
+
+    def tokenize_all(self, as_buffer=False):
+        """
+        Executa o RegexLexer para produzir todos os tokens do código-fonte.
+
+        A entrada é dividida em lexemas e separadores por re.split (ver
+        _split_scan), sem trabalho em Python por token: tipos vêm de uma
+        tabela, deslocamentos de uma soma acumulada, e linhas/colunas só são
+        calculadas quando pedidas (TokenBuffer.defer_positions) ou, para a
+        lista de Tokens, em lote no final. Um caractere inválido produz o
+        mesmo erro do Lexer original; se a entrada contém um caractere
+        não-ASCII fora de um comentário, a análise é refeita token a token
+        pelo Lexer.
+
+        Parâmetros:
+          as_buffer (bool): Se True, os tokens são devolvidos em um TokenBuffer
+            compacto, sem criar nenhum objeto Token.
+
+        Retorno:
+          tuple: (list de Tokens ou TokenBuffer, dict Tabela de Símbolos)
+
+        Lança:
+          LexerError: Se um caractere inválido for encontrado.
+        """
+        with gc_paused():
+            tokens = self._scan_all(as_buffer)
+        if tokens is None:
+            return Lexer.tokenize_all(self, as_buffer)
+        return tokens, self.symbol_table
+
+    def _scan_all(self, as_buffer):
+        """
+        Varre toda a entrada restante em lote (ver tokenize_all).
+
+        Retorno:
+          list ou TokenBuffer: Os tokens (incluindo EOF), ou None se algum
+            caractere exige o processamento token a token.
+        """
+        text = self.text
+        out = TokenBuffer(text)
+        lexemes = None if as_buffer else []
+        if not _split_scan(text, self.i, self.line, _TokenCodes(self.symbol_table), out, lexemes):
+            return None
+
+        end = len(text)
+        out.kinds.append(EOF_CODE)
+        out.starts.append(end)
+        out.ends.append(end)
+        out.defer_positions(self.i, self.line)
+
+        self.line += text.count("\n", self.i)
+        self.col = end - text.rfind("\n")
+        self.i = end
+        if as_buffer:
+            return out
+        lexemes.append("$")
+        return list(map(Token, map(TOKEN_TYPES.__getitem__, out.kinds), lexemes, out.lines, out.cols))
+
+
+# =========================================
+# ENTRADA EM BYTES (mmap)
+# =========================================
+#
+# O alfabeto da LSI é ASCII: a varredura pode ser feita diretamente sobre os
+# bytes do arquivo (um mmap), sem decodificá-lo para str; os lexemas só são
+# decodificados quando pedidos. Fora dos comentários (que vão até o fim da
+# linha e não são decodificados), um byte é um caractere, e as colunas
+# contadas em bytes são as mesmas. Entradas com um caractere não-ASCII fora
+# de um comentário ou com '\r' (que a leitura em modo texto converteria) são
+# decodificadas e entregues ao RegexLexer, com o mesmo resultado de antes.
+
+
+class ByteTokenBuffer(TokenBuffer):
+    """
+    TokenBuffer cujo código-fonte (`text`) é um objeto de bytes (bytes ou
+    mmap) em ASCII; os lexemas são decodificados apenas no acesso.
+    """
+
+    __slots__ = ()
+
+    def lexeme(self, i):
+        """
+        Retorna o lexema (str) do i-ésimo token ('$' para o EOF).
+        """
+        if self.kinds[i] == EOF_CODE:
+            return "$"
+        return self.text[self.starts[i]:self.ends[i]].decode("ascii")
+
+
+def open_source(path):
+    """
+    Abre um arquivo .lsi para análise sem lê-lo para a memória.
+
+    Parâmetros:
+      path (str): Caminho do arquivo.
+
+    Retorno:
+      mmap ou bytes: Um mapeamento somente leitura do arquivo, ou o seu
+        conteúdo se ele não puder ser mapeado (arquivo vazio, pipe, ...).
+    """
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        if not stat.S_ISREG(st.st_mode) or st.st_size == 0:
+            return f.read()
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def decode_source(data):
+    """
+    Decodifica `data` exatamente como open(path).read() (codificação
+    padrão e conversão de quebras de linha).
+    """
+    return io.TextIOWrapper(io.BytesIO(data)).read()
+
+
+class BytesLexer:
+    """
+    Motor de análise léxica sobre bytes (ver ENTRADA EM BYTES), com o
+    tokenize_all do RegexLexer.
+
+    A memória usada é a dos tokens produzidos: a entrada é percorrida em
+    blocos, e as quebras de linha são localizadas bloco a bloco, sem uma
+    lista com todas elas.
+
+    Parâmetros:
+      data (bytes, mmap ou memoryview): O código-fonte.
+    """
+
+    def __init__(self, data):
+        self.text = data
+        self.symbol_table = {kw: {"kind": "keyword"} for kw in KEYWORDS}
+
+    def tokenize_all(self, as_buffer=False):
+        """
+        Produz todos os tokens do código-fonte.
+
+        Parâmetros:
+          as_buffer (bool): Se True, os tokens são devolvidos em um
+            ByteTokenBuffer, sem criar nenhum objeto Token nem decodificar
+            nenhum lexema.
+
+        Retorno:
+          tuple: (list de Tokens ou TokenBuffer, dict Tabela de Símbolos)
+
+        Lança:
+          LexerError: Se um caractere inválido for encontrado.
+        """
+        data = self.text
+        if data.find(b"\r") < 0:
+            with gc_paused():
+                tokens = self._scan_all(as_buffer)
+            if tokens is not None:
+                return tokens, self.symbol_table
+        lexer = RegexLexer(decode_source(data))
+        return lexer.tokenize_all(as_buffer)
+
+    def _scan_all(self, as_buffer):
+        """
+        Varre toda a entrada em lote (ver RegexLexer.tokenize_all).
+
+        Retorno:
+          list ou ByteTokenBuffer: Os tokens (incluindo EOF), ou None se a
+            entrada tem um caractere não-ASCII fora de um comentário.
+
+        Lança:
+          LexerError: Se um caractere inválido for encontrado.
+        """
+        data = self.text
+        out = ByteTokenBuffer(data)
+        lexemes = None if as_buffer else []
+        if not _split_scan(data, 0, 1, _TokenCodes(self.symbol_table, binary=True), out, lexemes):
+            return None
+
+        end = len(data)
+        out.kinds.append(EOF_CODE)
+        out.starts.append(end)
+        out.ends.append(end)
+        out.defer_positions()
+
+        # a última linha pode terminar em um comentário não-ASCII: a coluna do
+        # EOF é contada em caracteres
+        last_line = data[data.rfind(b"\n") + 1:]
+        if not last_line.isascii():
+            out.cols[-1] = len(last_line.decode()) + 1
+        if as_buffer:
+            return out
+        lexemes.append(b"$")
+        return list(map(Token, map(TOKEN_TYPES.__getitem__, out.kinds), map(bytes.decode, lexemes),
+                        out.lines, out.cols))
\ No newline at end of file
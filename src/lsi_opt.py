@@ -0,0 +1,492 @@
+import sys
+
+from lsi_ast import Assign, BinOp, Block, Call, Ident, If, Num, Print, Return, Var, VarDecl
+from lsi_interp import _div
+
+# =========================================
+# OTIMIZADOR DA AST DA LINGUAGEM LSI
+# =========================================
+#
+# Passes de otimização aplicados entre a análise sintática (Parser.parse_ast)
+# e a execução (lsi_interp) ou a geração de bytecode (lsi_vm). Cada pass
+# transforma a AST no próprio lugar, uma função por vez, e registra contadores
+# em um dicionário de estatísticas. Os passes podem ser ligados e desligados
+# individualmente (ver PASSES e optimize).
+#
+# Os passes preservam a saída e o valor de retorno do programa, inclusive os
+# erros de execução (divisão por zero). Uma variável declarada apenas em
+# código removido continua declarada: a declaração é movida para o início da
+# função, onde não tem efeito (os slots locais começam em 0).
+
+_FOLD = {
+    "PLUS": lambda a, b: a + b,
+    "MINUS": lambda a, b: a - b,
+    "TIMES": lambda a, b: a * b,
+    "DIV": _div,
+    "LT": lambda a, b: int(a < b),
+    "LE": lambda a, b: int(a <= b),
+    "GT": lambda a, b: int(a > b),
+    "GE": lambda a, b: int(a >= b),
+    "EQ": lambda a, b: int(a == b),
+    "NE": lambda a, b: int(a != b),
+}
+
+# Prefixo das variáveis temporárias criadas pela CSE. `$` não é aceito pelo
+# lexer em identificadores, então não há conflito com nomes do programa.
+TEMP_PREFIX = "$t"
+
+
+def _declared_names(stmts):
+    """Retorna os nomes declarados (int A, B;) em `stmts`, recursivamente."""
+
+    names = []
+    for stmt in stmts:
+        if isinstance(stmt, VarDecl):
+            names.extend(ident.name for ident in stmt.names)
+        elif isinstance(stmt, If):
+            names.extend(_declared_names(stmt.body))
+            if stmt.orelse is not None:
+                names.extend(_declared_names(stmt.orelse))
+        elif isinstance(stmt, Block):
+            names.extend(_declared_names(stmt.body))
+    return names
+
+
+def _hoist_declarations(fdef, names):
+    """
+    Declara `names` no início de `fdef` (parâmetros e nomes repetidos são
+    ignorados). Usado quando o código que os declarava é removido.
+    """
+
+    params = {p.name for p in fdef.params}
+    idents, seen = [], set()
+    for name in names:
+        if name not in params and name not in seen:
+            seen.add(name)
+            idents.append(Ident(name, line=fdef.line, col=fdef.col))
+    if idents:
+        fdef.body.insert(0, VarDecl(idents, line=fdef.line, col=fdef.col))
+
+
+# =========================================
+# DOBRAMENTO DE CONSTANTES
+# =========================================
+def fold_constants(fdef, stats):
+    """
+    Substitui operações entre constantes pelo resultado (ex: 1 + 2 * 3 - 4 / 2
+    vira 5; 1 < 2 vira 1). Uma divisão por zero constante não é dobrada, para
+    que o erro continue ocorrendo na execução.
+
+    Estatísticas: "folded" (operações substituídas).
+    """
+
+    stats.setdefault("folded", 0)
+
+    def expr(node):
+        if isinstance(node, BinOp):
+            node.left = expr(node.left)
+            node.right = expr(node.right)
+            if (isinstance(node.left, Num) and isinstance(node.right, Num)
+                    and not (node.op == "DIV" and node.right.value == 0)):
+                stats["folded"] += 1
+                value = _FOLD[node.op](node.left.value, node.right.value)
+                return Num(value, line=node.line, col=node.col)
+        elif isinstance(node, Call):
+            node.args = [expr(a) for a in node.args]
+        return node
+
+    def block(stmts):
+        for stmt in stmts:
+            if isinstance(stmt, (Assign, Print)):
+                stmt.value = expr(stmt.value)
+            elif isinstance(stmt, Return):
+                if stmt.value is not None:
+                    stmt.value = expr(stmt.value)
+            elif isinstance(stmt, If):
+                stmt.cond = expr(stmt.cond)
+                block(stmt.body)
+                if stmt.orelse is not None:
+                    block(stmt.orelse)
+            elif isinstance(stmt, Block):
+                block(stmt.body)
+
+    block(fdef.body)
+
+
+# =========================================
+# REMOÇÃO DE RAMOS MORTOS
+# =========================================
+def remove_dead_branches(fdef, stats):
+    """
+    Substitui um `if` de condição constante pelo ramo que sempre executa (ou
+    por nada, se a condição é falsa e não há else). Depende do dobramento de
+    constantes para condições como 1 < 2.
+
+    Estatísticas: "removed" (ifs eliminados).
+    """
+
+    stats.setdefault("removed", 0)
+    dead = []
+
+    def block(stmts):
+        result = []
+        for stmt in stmts:
+            if isinstance(stmt, If):
+                block_in_place(stmt)
+                if isinstance(stmt.cond, Num):
+                    stats["removed"] += 1
+                    taken, other = stmt.body, stmt.orelse
+                    if stmt.cond.value == 0:
+                        taken, other = other, taken
+                    if other is not None:
+                        dead.extend(_declared_names(other))
+                    result.extend(taken or ())
+                    continue
+            elif isinstance(stmt, Block):
+                stmt.body = block(stmt.body)
+            result.append(stmt)
+        return result
+
+    def block_in_place(stmt):
+        stmt.body = block(stmt.body)
+        if stmt.orelse is not None:
+            stmt.orelse = block(stmt.orelse)
+
+    fdef.body = block(fdef.body)
+    _hoist_declarations(fdef, dead)
+
+
+# =========================================
+# REMOÇÃO DE CÓDIGO INALCANÇÁVEL
+# =========================================
+def _terminates(stmt):
+    """True se `stmt` sempre encerra a função (return em todos os caminhos)."""
+
+    if isinstance(stmt, Return):
+        return True
+    if isinstance(stmt, If):
+        return (stmt.orelse is not None and any(map(_terminates, stmt.body))
+                and any(map(_terminates, stmt.orelse)))
+    if isinstance(stmt, Block):
+        return any(map(_terminates, stmt.body))
+    return False
+
+
+def remove_unreachable(fdef, stats):
+    """
+    Remove os comandos que seguem um `return` no mesmo bloco (ou um `if` cujos
+    dois ramos terminam em `return`).
+
+    Estatísticas: "removed" (comandos removidos).
+    """
+
+    stats.setdefault("removed", 0)
+    dead = []
+
+    def block(stmts):
+        for i, stmt in enumerate(stmts):
+            if isinstance(stmt, If):
+                stmt.body = block(stmt.body)
+                if stmt.orelse is not None:
+                    stmt.orelse = block(stmt.orelse)
+            elif isinstance(stmt, Block):
+                stmt.body = block(stmt.body)
+            if _terminates(stmt) and i + 1 < len(stmts):
+                stats["removed"] += len(stmts) - i - 1
+                dead.extend(_declared_names(stmts[i + 1:]))
+                return stmts[:i + 1]
+        return stmts
+
+    fdef.body = block(fdef.body)
+    _hoist_declarations(fdef, dead)
+
+
+# =========================================
+# ELIMINAÇÃO DE SUBEXPRESSÕES COMUNS (LOCAL)
+# =========================================
+class _Candidate:
+    """Uma subexpressão (BinOp sem chamadas) candidata à CSE."""
+
+    __slots__ = ("node", "stmt", "names", "size", "can_fail")
+
+    def __init__(self, node, stmt, names, size, can_fail):
+        self.node = node
+        self.stmt = stmt
+        self.names = names
+        self.size = size
+        self.can_fail = can_fail
+
+
+def _candidates(node, stmt, out):
+    """
+    Percorre a expressão `node` do comando de índice `stmt` e acrescenta a
+    `out` uma lista (chave, _Candidate) para cada BinOp sem chamadas.
+
+    Retorno:
+      tuple: (chave estrutural ou None se há chamada, nomes usados, tamanho
+        em nós, se pode falhar por divisão por zero).
+    """
+
+    if isinstance(node, Num):
+        return ("n", node.value), frozenset(), 1, False
+    if isinstance(node, Var):
+        return ("v", node.name), frozenset((node.name,)), 1, False
+    if isinstance(node, Call):
+        for arg in node.args:
+            _candidates(arg, stmt, out)
+        return None, frozenset(), 1, False
+
+    lkey, lnames, lsize, lfail = _candidates(node.left, stmt, out)
+    rkey, rnames, rsize, rfail = _candidates(node.right, stmt, out)
+    if lkey is None or rkey is None:
+        return None, frozenset(), 1, False
+
+    key = (node.op, lkey, rkey)
+    names = lnames | rnames
+    size = lsize + rsize + 1
+    can_fail = lfail or rfail or (
+        node.op == "DIV" and not (isinstance(node.right, Num) and node.right.value != 0))
+    out.append((key, _Candidate(node, stmt, names, size, can_fail)))
+    return key, names, size, can_fail
+
+
+def _has_call(node):
+    if isinstance(node, Call):
+        return True
+    if isinstance(node, BinOp):
+        return _has_call(node.left) or _has_call(node.right)
+    return False
+
+
+def _subtree_ids(node, ids):
+    ids.add(id(node))
+    if isinstance(node, BinOp):
+        _subtree_ids(node.left, ids)
+        _subtree_ids(node.right, ids)
+    elif isinstance(node, Call):
+        for arg in node.args:
+            _subtree_ids(arg, ids)
+
+
+def _substitute(node, replace):
+    """Troca em `node` as subexpressões de `replace` (id -> nome)."""
+
+    name = replace.get(id(node))
+    if name is not None:
+        return Var(name, line=node.line, col=node.col)
+    if isinstance(node, BinOp):
+        node.left = _substitute(node.left, replace)
+        node.right = _substitute(node.right, replace)
+    elif isinstance(node, Call):
+        node.args = [_substitute(a, replace) for a in node.args]
+    return node
+
+
+def _expression(stmt):
+    """A expressão avaliada por `stmt` em um bloco básico, ou None."""
+
+    if isinstance(stmt, (Assign, Print, Return)):
+        return stmt.value
+    if isinstance(stmt, If):
+        return stmt.cond
+    return None
+
+
+def eliminate_common_subexpressions(fdef, stats):
+    """
+    CSE local: em cada trecho de comandos em sequência (até um `if`, que
+    tem a condição incluída no trecho), uma subexpressão sem chamadas que se
+    repete sem que nenhuma das suas variáveis seja alterada entre as
+    ocorrências é calculada uma vez em uma variável temporária ($t0, $t1, ...)
+    antes do comando da primeira ocorrência.
+
+    Só compensa quando a expressão é grande ou muito repetida: a temporária
+    custa uma atribuição e uma leitura por uso. Uma subexpressão que pode
+    falhar (divisão por zero) não é antecipada para antes de uma chamada do
+    mesmo comando, preservando a ordem entre saída e erro.
+
+    Estatísticas: "temporaries" (temporárias criadas) e "eliminated"
+    (avaliações economizadas).
+    """
+
+    stats.setdefault("temporaries", 0)
+    stats.setdefault("eliminated", 0)
+    temps = []
+
+    def run(stmts, start, end):
+        """Processa o bloco básico stmts[start:end]; devolve as inserções."""
+
+        open_groups = {}
+        groups = []
+        for i in range(start, end):
+            stmt = stmts[i]
+            value = _expression(stmt)
+            found = []
+            if value is not None:
+                _candidates(value, i, found)
+            for key, cand in found:
+                open_groups.setdefault(key, []).append(cand)
+
+            killed = set()
+            if isinstance(stmt, Assign):
+                killed.add(stmt.name)
+            elif isinstance(stmt, VarDecl):
+                killed.update(ident.name for ident in stmt.names)
+            if killed:
+                for key in [k for k, g in open_groups.items() if g[0].names & killed]:
+                    groups.append(open_groups.pop(key))
+        groups.extend(open_groups.values())
+
+        # Expressões maiores primeiro: as ocorrências contidas em uma
+        # expressão já substituída não contam mais
+        groups.sort(key=lambda g: -g[0].size)
+        covered = set()
+        replace = {}
+        inserts = {}
+        for group in groups:
+            occurrences = [c for c in group if id(c.node) not in covered]
+            count, size = len(occurrences), group[0].size
+            if count < 2 or (count - 1) * size <= count + 1:
+                continue
+            first = occurrences[0]
+            if first.can_fail and _has_call(_expression(stmts[first.stmt])):
+                continue
+
+            name = f"{TEMP_PREFIX}{len(temps)}"
+            temps.append(name)
+            stats["temporaries"] += 1
+            stats["eliminated"] += count - 1
+            for cand in occurrences:
+                _subtree_ids(cand.node, covered)
+                replace[id(cand.node)] = name
+            inserts.setdefault(first.stmt, []).append(
+                Assign(name, first.node, line=first.node.line, col=first.node.col))
+
+        for i in range(start, end):
+            stmt = stmts[i]
+            if isinstance(stmt, (Assign, Print, Return)) and stmt.value is not None:
+                stmt.value = _substitute(stmt.value, replace)
+            elif isinstance(stmt, If):
+                stmt.cond = _substitute(stmt.cond, replace)
+        return inserts
+
+    def block(stmts):
+        inserts = {}
+        start = 0
+        for i, stmt in enumerate(stmts):
+            if isinstance(stmt, If):
+                inserts.update(run(stmts, start, i + 1))
+                stmt.body = block(stmt.body)
+                if stmt.orelse is not None:
+                    stmt.orelse = block(stmt.orelse)
+                start = i + 1
+            elif isinstance(stmt, Block):
+                inserts.update(run(stmts, start, i))
+                stmt.body = block(stmt.body)
+                start = i + 1
+        inserts.update(run(stmts, start, len(stmts)))
+
+        if not inserts:
+            return stmts
+        result = []
+        for i, stmt in enumerate(stmts):
+            result.extend(inserts.get(i, ()))
+            result.append(stmt)
+        return result
+
+    fdef.body = block(fdef.body)
+    _hoist_declarations(fdef, temps)
+
+
+# =========================================
+# PIPELINE
+# =========================================
+# Nome -> pass, na ordem de execução
+PASSES = {
+    "fold": fold_constants,
+    "dead_branches": remove_dead_branches,
+    "unreachable": remove_unreachable,
+    "cse": eliminate_common_subexpressions,
+}
+
+
+def optimize(program, passes=None, disabled=()):
+    """
+    Aplica os passes de otimização a `program` (modificado no próprio lugar).
+
+    Parâmetros:
+      program (lsi_ast.Program): A AST do programa.
+      passes (iterable): Nomes dos passes a aplicar (padrão: todos de PASSES).
+        A ordem de execução é sempre a de PASSES.
+      disabled (iterable): Nomes dos passes a não aplicar.
+
+    Retorno:
+      dict: Estatísticas por pass ({nome: {contador: valor}}), apenas dos
+        passes aplicados.
+
+    Lança:
+      ValueError: Se algum nome não for um pass conhecido.
+    """
+
+    selected = set(PASSES if passes is None else passes)
+    disabled = set(disabled)
+    unknown = (selected | disabled) - set(PASSES)
+    if unknown:
+        raise ValueError(f"pass(es) desconhecido(s): {', '.join(sorted(unknown))}")
+
+    stats = {}
+    for name, run in PASSES.items():
+        if name in selected and name not in disabled:
+            stats[name] = pass_stats = {}
+            for fdef in program.functions:
+                run(fdef, pass_stats)
+    return stats
+
+
+def format_stats(stats):
+    """Retorna as estatísticas de optimize() em texto, um pass por linha."""
+
+    return "\n".join(
+        f"{name:14} " + ", ".join(f"{k}={v}" for k, v in counters.items())
+        for name, counters in stats.items()
+    )
+
+
+# =========================================
+# MAIN
+# =========================================
+if __name__ == "__main__":
+    import argparse
+    from lsi_ast import dump
+    from lsi_interp import load_program
+    from lsi_lexer import LexerError
+
+    """
+    Otimiza um programa LSI e imprime a AST resultante e as estatísticas de
+    cada pass.
+    """
+
+    ap = argparse.ArgumentParser(description="Otimizador da AST da linguagem LSI.")
+    ap.add_argument("file", help="arquivo .lsi de entrada")
+    ap.add_argument("--disable", action="append", default=[], choices=list(PASSES),
+                    metavar="PASS", help=f"desliga um pass ({', '.join(PASSES)}); pode repetir")
+    args = ap.parse_args()
+
+    with open(args.file) as f:
+        text = f.read()
+
+    try:
+        program = load_program(text)
+    except LexerError as e:
+        print(f"\n=== ERRO LÉXICO ===")
+        print(e)
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n=== ERRO SINTÁTICO ===")
+        print(e)
+        sys.exit(1)
+
+    stats = optimize(program, disabled=args.disable)
+    print(dump(program))
+    print("\n=== ESTATÍSTICAS ===")
+    print(format_stats(stats))
@@ -1,4 +1,16 @@
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+from array import array
+from contextlib import nullcontext
+from dataclasses import dataclass
+
+from lsi_ast import SEMANTIC_ACTIONS, dump
 from lsi_lexer import *
+from lsi_profile import RECOMPUTE_PREFIX, Profile
+from lsi_xref import DEFINITION_KINDS, USE, XrefIndex
 
 EPS = "epsilon"
 
@@ -203,65 +215,182 @@ def token_to_terminal(tok):
         return "$"
     return LEX_TO_GR.get(tok.typ, tok.lexeme)
 
+# Terminal correspondente a cada código de tipo do TokenBuffer
+KIND_TO_TERMINAL = tuple("$" if typ == "EOF" else LEX_TO_GR[typ] for typ in TOKEN_TYPES)
+
 # =========================================
 # FIRST
 # =========================================
-def compute_first():
+def compute_nullable(grammar=GRAMMAR):
     """
-    Calcula o conjunto FIRST para todos os Não-Terminais da GRAMMAR.
+    Calcula o conjunto dos Não-Terminais anuláveis (que derivam EPS).
 
-    O algoritmo é iterativo (fixed-point iteration), repetindo o cálculo até que
-    nenhum novo terminal possa ser adicionado a nenhum conjunto FIRST, garantindo a convergência.
+    Algoritmo de worklist em tempo linear no tamanho da gramática: cada
+    produção guarda quantos símbolos seus ainda não são sabidamente
+    anuláveis; quando um Não-Terminal se torna anulável, apenas as produções
+    em que ele aparece são atualizadas.
 
-    Regras:
-    1. Se A -> X..., onde X é terminal, então X está em FIRST(A).
-    2. Se A -> X1 X2..., onde X1 é Não-Terminal:
-        - FIRST(X1) (exceto EPS) é adicionado a FIRST(A).
-        - Se EPS está em FIRST(X1), o processo continua para X2.
-    3. Se A pode derivar a string vazia (A -> EPS ou todos os símbolos derivam EPS),
-        então EPS está em FIRST(A).
+    Parâmetros:
+      grammar (dict): A gramática ({Não-Terminal: [produções]}).
 
-    Retorno:
-      dict: Um dicionário onde as chaves são os Não-Terminais e os valores são os
-        conjuntos de seus FIRST (set de str).
-    """
+    Retorno:
+      set: Os Não-Terminais anuláveis.
+    """
 
-    FIRST = {A: set() for A in GRAMMAR}
+    nullable = set()
+    work = []
+    pending = []   # (cabeça, símbolos ainda não anuláveis) por produção
+    uses = {A: [] for A in grammar}   # Não-Terminal -> produções que o contêm
 
-    changed = True
-    while changed:
-        changed = False
+    for A, prods in grammar.items():
+        for prod in prods:
+            body = [X for X in prod if X != EPS]
+            if any(X not in grammar for X in body):
+                continue  # contém terminal: nunca anulável
+            if not body:
+                if A not in nullable:
+                    nullable.add(A)
+                    work.append(A)
+                continue
+            p = len(pending)
+            pending.append([A, len(body)])
+            for X in body:
+                uses[X].append(p)
+
+    while work:
+        X = work.pop()
+        for p in uses[X]:
+            entry = pending[p]
+            entry[1] -= 1
+            if entry[1] == 0 and entry[0] not in nullable:
+                nullable.add(entry[0])
+                work.append(entry[0])
+
+    return nullable
+
+
+def _propagate(init, deps):
+    """
+    Resolve o sistema de inclusões S(A) = init(A) ∪ ⋃ S(B), B em deps(A).
 
-        for A, prods in GRAMMAR.items():
-            for prod in prods:
+    O grafo de dependências é condensado em componentes fortemente conexas
+    (Tarjan, iterativo): todos os Não-Terminais de uma componente têm o mesmo
+    conjunto, e as componentes são resolvidas em ordem topológica, de modo
+    que cada aresta é percorrida uma única vez (sem varreduras até o ponto
+    fixo).
 
-                if prod == [EPS]:
-                    if EPS not in FIRST[A]:
-                        FIRST[A].add(EPS)
-                        changed = True
-                    continue
+    Parâmetros:
+      init (dict): {A: set} com os conjuntos iniciais.
+      deps (dict): {A: iterável de B} com as inclusões S(B) ⊆ S(A).
 
-                for X in prod:
+    Retorno:
+      dict: {A: set} com a solução (um conjunto novo por Não-Terminal).
+    """
 
-                    if X in TERMINALS:
-                        if X not in FIRST[A]:
-                            FIRST[A].add(X)
-                            changed = True
-                        break
+    index = {}
+    low = {}
+    on_stack = set()
+    stack = []
+    result = {}
+    counter = 0
+
+    for root in init:
+        if root in index:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        frames = [(root, iter(deps[root]))]
+
+        while frames:
+            v, it = frames[-1]
+            for w in it:
+                if w not in index:
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack.add(w)
+                    frames.append((w, iter(deps[w])))
+                    break
+                if w in on_stack and index[w] < low[v]:
+                    low[v] = index[w]
+            else:
+                frames.pop()
+                if frames:
+                    u = frames[-1][0]
+                    if low[v] < low[u]:
+                        low[u] = low[v]
+                if low[v] == index[v]:
+                    # v é raiz de uma componente: as dependências externas
+                    # já foram resolvidas (Tarjan emite em ordem topológica)
+                    members = []
+                    while True:
+                        w = stack.pop()
+                        on_stack.discard(w)
+                        members.append(w)
+                        if w == v:
+                            break
+                    value = set()
+                    for w in members:
+                        value |= init[w]
+                        for B in deps[w]:
+                            if B in result:
+                                value |= result[B]
+                    for w in members:
+                        result[w] = value
+
+    return {A: set(result[A]) for A in init}
+
+
+def compute_first(grammar=GRAMMAR):
+    """
+    Calcula o conjunto FIRST para todos os Não-Terminais da GRAMMAR.
+
+    Em vez de repetir varreduras sobre todas as produções até o ponto fixo,
+    o cálculo é feito em duas etapas:
+    1. Os Não-Terminais anuláveis são calculados por worklist
+       (compute_nullable).
+    2. Para A -> X1 X2 ..., percorrem-se os símbolos até o primeiro não
+       anulável: terminais entram diretamente em FIRST(A) e cada
+       Não-Terminal Xi gera a inclusão FIRST(Xi) ⊆ FIRST(A). O sistema de
+       inclusões é resolvido por componentes fortemente conexas (_propagate).
+
+    Regras:
+    1. Se A -> X..., onde X é terminal, então X está em FIRST(A).
+    2. Se A -> X1 X2..., onde X1 é Não-Terminal:
+        - FIRST(X1) (exceto EPS) é adicionado a FIRST(A).
+        - Se EPS está em FIRST(X1), o processo continua para X2.
+    3. Se A pode derivar a string vazia (A -> EPS ou todos os símbolos derivam EPS),
+        então EPS está em FIRST(A).
+
+    Parâmetros:
+      grammar (dict): A gramática (padrão: GRAMMAR).
+
+    Retorno:
+      dict: Um dicionário onde as chaves são os Não-Terminais e os valores são os
+        conjuntos de seus FIRST (set de str).
+    """
 
-                    if X in GRAMMAR:
-                        before = len(FIRST[A])
-                        FIRST[A].update(a for a in FIRST[X] if a != EPS)
-                        if len(FIRST[A]) != before:
-                            changed = True
-                        if EPS in FIRST[X]:
-                            continue
-                        break
+    nullable = compute_nullable(grammar)
+    init = {A: set() for A in grammar}
+    deps = {A: set() for A in grammar}
 
-                else:
-                    if EPS not in FIRST[A]:
-                        FIRST[A].add(EPS)
-                        changed = True
+    for A, prods in grammar.items():
+        for prod in prods:
+            for X in prod:
+                if X == EPS:
+                    continue
+                if X not in grammar:
+                    init[A].add(X)
+                    break
+                deps[A].add(X)
+                if X not in nullable:
+                    break
+
+    FIRST = _propagate(init, deps)
+    for A in nullable:
+        FIRST[A].add(EPS)
     return FIRST
 
 
@@ -320,110 +449,642 @@ def first_sequence(seq, FIRST):
 
 
 
-# =========================================
-# FOLLOW
-# =========================================
-def compute_follow(FIRST):
+def suffix_firsts(prod, FIRST, grammar=GRAMMAR):
     """
-    Calcula o conjunto FOLLOW para todos os Não-Terminais da GRAMMAR.
+    Calcula, de uma só vez, o FIRST de todos os sufixos de uma produção.
 
-    O algoritmo é iterativo, repetindo o cálculo até que nenhum novo terminal
-    possa ser adicionado a nenhum conjunto FOLLOW (convergência).
+    Os sufixos são processados da direita para a esquerda, reaproveitando o
+    resultado do sufixo seguinte, de modo que cada símbolo é visitado uma
+    única vez (em vez de uma chamada a first_sequence por sufixo).
 
-    Regras:
-    1. FOLLOW(MAIN) contém '$' (fim de arquivo).
-    2. Se A -> alpha X beta:
-        - FOLLOW(X) inclui FIRST(beta) (exceto EPS).
-    3. Se A -> alpha X beta e beta pode derivar EPS (ou beta é vazio):
-        - FOLLOW(X) inclui FOLLOW(A). (Regra de propagação que exige a iteração).
+    Parâmetros:
+      prod (list): A produção (lado direito).
+      FIRST (dict): Os conjuntos FIRST dos Não-Terminais.
+      grammar (dict): A gramática (padrão: GRAMMAR).
 
-    Parâmetros:
-      FIRST (dict): Os conjuntos FIRST pré-calculados.
-
-    Retorno:
-      dict: Um dicionário onde as chaves são os Não-Terminais e os valores são os
-        conjuntos de seus FOLLOW (set de str).
-    """
-
-    FOLLOW = {A: set() for A in GRAMMAR}
+    Retorno:
+      list: `result[i]` é o FIRST de `prod[i:]` (com EPS se o sufixo é
+        anulável), para i de 0 a len(prod). Os conjuntos podem ser
+        compartilhados entre sufixos (e com FIRST) e não devem ser alterados.
+    """
 
-    FOLLOW["MAIN"].add("$")
+    result = [None] * (len(prod) + 1)
+    current = {EPS}
+    result[len(prod)] = current
+    for i in range(len(prod) - 1, -1, -1):
+        X = prod[i]
+        if X == EPS:
+            pass
+        elif X not in grammar:
+            current = {X}
+        elif EPS in FIRST[X]:
+            current = (FIRST[X] - {EPS}) | current
+        else:
+            current = FIRST[X]
+        result[i] = current
+    return result
 
-    changed = True
-    while changed:
-        changed = False
 
-        for A, prods in GRAMMAR.items():
-            for prod in prods:
+def compute_follow(FIRST, grammar=GRAMMAR, start="MAIN"):
+    """
+    Calcula o conjunto FOLLOW para todos os Não-Terminais da GRAMMAR.
+
+    O FIRST de cada sufixo de produção é calculado uma única vez
+    (suffix_firsts). As regras abaixo geram os conjuntos iniciais (Regras 1 e
+    2) e as inclusões FOLLOW(A) ⊆ FOLLOW(X) (Regra 3), resolvidas por
+    componentes fortemente conexas (_propagate), sem varreduras repetidas
+    da gramática.
+
+    Regras:
+    1. FOLLOW(MAIN) contém '$' (fim de arquivo).
+    2. Se A -> alpha X beta:
+        - FOLLOW(X) inclui FIRST(beta) (exceto EPS).
+    3. Se A -> alpha X beta e beta pode derivar EPS (ou beta é vazio):
+        - FOLLOW(X) inclui FOLLOW(A).
+
+    Parâmetros:
+      FIRST (dict): Os conjuntos FIRST pré-calculados.
+      grammar (dict): A gramática (padrão: GRAMMAR).
+      start (str): O símbolo inicial (padrão: MAIN).
+
+    Retorno:
+      dict: Um dicionário onde as chaves são os Não-Terminais e os valores são os
+        conjuntos de seus FOLLOW (set de str).
+    """
 
-                for i, X in enumerate(prod):
+    init = {A: set() for A in grammar}
+    deps = {A: set() for A in grammar}
 
-                    if X not in GRAMMAR:
-                        continue
+    init[start].add("$")
 
-                    beta = prod[i+1:]
-                    fs = first_sequence(beta, FIRST)
+    for A, prods in grammar.items():
+        for prod in prods:
+            firsts = suffix_firsts(prod, FIRST, grammar)
+            for i, X in enumerate(prod):
 
-                    before = len(FOLLOW[X])
+                if X not in grammar:
+                    continue
 
-                    # Regra 2: FOLLOW(X) inclui FIRST(beta) - {EPS}
-                    FOLLOW[X].update(a for a in fs if a != EPS)
+                fs = firsts[i + 1]
 
-                    # Regra 3: Se beta -> EPS, FOLLOW(X) inclui FOLLOW(A)
-                    if EPS in fs or not beta:
-                        FOLLOW[X].update(FOLLOW[A])
+                # Regra 2: FOLLOW(X) inclui FIRST(beta) - {EPS}
+                init[X].update(a for a in fs if a != EPS)
 
-                    if len(FOLLOW[X]) != before:
-                        changed = True
+                # Regra 3: Se beta -> EPS, FOLLOW(X) inclui FOLLOW(A)
+                if EPS in fs and X != A:
+                    deps[X].add(A)
 
-    return FOLLOW
+    return _propagate(init, deps)
 
 
 # =========================================
 # TABELA LL(1)
 # =========================================
-def build_table(FIRST, FOLLOW):
+def format_production(A, prod):
+    """
+    Retorna a produção como texto, ex: "IF_TAIL -> else LBRACE STMTLIST RBRACE".
     """
-    Constrói a Tabela de Análise Preditiva LL(1) a partir dos conjuntos FIRST e FOLLOW.
 
-    O resultado é um dicionário que mapeia o par (Não-Terminal, Terminal) para a Regra de Produção.
-    - Chave: (str Não-Terminal, str Terminal)
-    - Valor: list Regra de Produção (ex: ['def', 'id', 'LPAREN', ...])
+    return f"{A} -> {' '.join(prod)}"
 
-    Regras de Preenchimento:
-    1. Para toda produção A -> alpha e para todo terminal t em FIRST(alpha) (t != EPS),
-       adiciona-se a regra A -> alpha na célula [A, t].
-    2. Se EPS está em FIRST(alpha), para todo terminal b em FOLLOW(A), adiciona-se
-       a regra A -> alpha na célula [A, b].
 
-    Parâmetros:
-      FIRST (dict): Os conjuntos FIRST.
-      FOLLOW (dict): Os conjuntos FOLLOW.
+@dataclass
+class TableConflict:
+    """
+    Um conflito LL(1): mais de uma produção disputa a célula (A, t).
+
+    Atributos:
+      nonterminal (str): O Não-Terminal A.
+      terminal (str): O terminal t.
+      kind (str): "FIRST/FIRST" (t está no FIRST de duas produções),
+        "FIRST/FOLLOW" (t está no FIRST de uma e no FOLLOW(A) de uma produção
+        anulável) ou "FOLLOW/FOLLOW" (duas produções anuláveis).
+      productions (list): As produções concorrentes, na ordem da GRAMMAR. A
+        tabela fica com a última delas.
+    """
+    nonterminal: str
+    terminal: str
+    kind: str
+    productions: list
 
-    Retorno:
-      dict: A Tabela LL(1) de análise.
-    """
+    def __str__(self):
+        prods = " | ".join(format_production(self.nonterminal, p) for p in self.productions)
+        return f"Conflito {self.kind} em ({self.nonterminal}, {self.terminal}): {prods}"
+
+
+class LL1ConflictError(Exception):
+    """
+    Lançada por build_table(strict=True) quando a gramática não é LL(1).
+
+    Atributos:
+      conflicts (list): Todos os TableConflict encontrados.
+    """
+
+    def __init__(self, conflicts):
+        super().__init__("A gramática não é LL(1):\n" + "\n".join(map(str, conflicts)))
+        self.conflicts = conflicts
+
+
+def build_table(FIRST, FOLLOW, grammar=GRAMMAR, conflicts=None, strict=False):
+    """
+    Constrói a Tabela de Análise Preditiva LL(1) a partir dos conjuntos FIRST e FOLLOW.
+
+    O resultado é um dicionário que mapeia o par (Não-Terminal, Terminal) para a Regra de Produção.
+    - Chave: (str Não-Terminal, str Terminal)
+    - Valor: list Regra de Produção (ex: ['def', 'id', 'LPAREN', ...])
+
+    Regras de Preenchimento:
+    1. Para toda produção A -> alpha e para todo terminal t em FIRST(alpha) (t != EPS),
+       adiciona-se a regra A -> alpha na célula [A, t].
+    2. Se EPS está em FIRST(alpha), para todo terminal b em FOLLOW(A), adiciona-se
+       a regra A -> alpha na célula [A, b].
+
+    Quando duas produções disputam a mesma célula, a tabela fica com a última
+    (na ordem da GRAMMAR) e o conflito é registrado como TableConflict.
+
+    Parâmetros:
+      FIRST (dict): Os conjuntos FIRST.
+      FOLLOW (dict): Os conjuntos FOLLOW.
+      grammar (dict): A gramática (padrão: GRAMMAR).
+      conflicts (list): Opcional. Recebe todos os TableConflict encontrados.
+      strict (bool): Se True, lança LL1ConflictError se houver conflitos.
+
+    Retorno:
+      dict: A Tabela LL(1) de análise.
+
+    Lança:
+      LL1ConflictError: Se strict=True e a gramática não for LL(1).
+    """
 
     table = {}
+    origins = {}    # (A, t) -> origem ("FIRST" ou "FOLLOW") da produção atual
+    contested = {}  # (A, t) -> [(produção, origem)], só células disputadas
 
-    for A, prods in GRAMMAR.items():
+    for A, prods in grammar.items():
         for prod in prods:
 
-            fs = first_sequence(prod, FIRST)
+            fs = suffix_firsts(prod, FIRST, grammar)[0]
 
-            # Regra 1: Para cada terminal em FIRST(alpha), insere na tabela
-            for t in fs:
-                if t != EPS:
-                    table[(A, t)] = prod
+            cells = [(t, "FIRST") for t in fs if t != EPS]
 
             # Regra 2: Se EPS está em FIRST(alpha), usa FOLLOW(A)
             if EPS in fs:
-                for b in FOLLOW[A]:
-                    table[(A, b)] = prod
+                cells.extend((b, "FOLLOW") for b in FOLLOW[A])
+
+            # Regra 1 e 2: insere a produção em cada célula
+            for t, origin in cells:
+                key = (A, t)
+                previous = table.get(key)
+                if previous is None:
+                    origins[key] = origin
+                elif previous is not prod:
+                    contested.setdefault(key, [(previous, origins[key])]).append((prod, origin))
+                    origins[key] = origin
+                table[key] = prod
+
+    found = []
+    for (A, t), entries in contested.items():
+        kinds = sorted({origin for _, origin in entries})
+        if len(kinds) == 2:
+            kind = "FIRST/FOLLOW"
+        else:
+            kind = f"{kinds[0]}/{kinds[0]}"
+        found.append(TableConflict(A, t, kind, [prod for prod, _ in entries]))
+
+    if conflicts is not None:
+        conflicts.extend(found)
+    if strict and found:
+        raise LL1ConflictError(found)
 
     return table
 
 
+# =========================================
+# CACHE DA TABELA LL(1)
+# =========================================
+# Incrementar quando o formato do cache ou o cálculo dos conjuntos mudar.
+TABLE_CACHE_VERSION = 1
+
+# Caminho padrão do cache; a variável de ambiente LSI_TABLE_CACHE permite
+# trocá-lo (ou desativar o cache em disco, se definida como string vazia).
+DEFAULT_TABLE_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                   "__pycache__", "lsi_ll1_table.json")
+
+
+def table_cache_path():
+    """
+    Retorna o caminho do arquivo de cache da tabela LL(1), ou None se o cache
+    em disco estiver desativado (LSI_TABLE_CACHE="").
+    """
+
+    return os.environ.get("LSI_TABLE_CACHE", DEFAULT_TABLE_CACHE) or None
+
+
+def grammar_hash():
+    """
+    Calcula um hash estável de GRAMMAR e TERMINALS.
+
+    O hash muda sempre que uma produção, um terminal ou a versão do formato do
+    cache mudam, invalidando automaticamente um cache salvo anteriormente.
+
+    Retorno:
+      str: O digest SHA-256 em hexadecimal.
+    """
+
+    payload = json.dumps(
+        {
+            "version": TABLE_CACHE_VERSION,
+            "eps": EPS,
+            "grammar": GRAMMAR,
+            "terminals": sorted(TERMINALS),
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def save_tables(path, FIRST, FOLLOW, table):
+    """
+    Serializa FIRST, FOLLOW e a Tabela LL(1) em `path` (JSON).
+
+    Cada célula da tabela é gravada como o índice da produção em GRAMMAR[A].
+    A escrita é atômica (arquivo temporário + rename); falhas de E/S são
+    ignoradas, pois o cache é apenas uma otimização.
+    """
+
+    cells = []
+    for (A, t), prod in table.items():
+        idx = next(i for i, p in enumerate(GRAMMAR[A]) if p is prod)
+        cells.append([A, t, idx])
+
+    data = {
+        "hash": grammar_hash(),
+        "first": {A: sorted(v) for A, v in FIRST.items()},
+        "follow": {A: sorted(v) for A, v in FOLLOW.items()},
+        "table": cells,
+    }
+
+    directory = os.path.dirname(path) or "."
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def load_tables(path):
+    """
+    Carrega FIRST, FOLLOW e a Tabela LL(1) de um cache salvo por save_tables.
+
+    Retorno:
+      tuple: (FIRST, FOLLOW, table), ou None se o arquivo não existir, estiver
+        corrompido ou tiver sido gerado para outra versão da gramática.
+    """
+
+    try:
+        with open(path) as f:
+            data = json.load(f)
+        if data.get("hash") != grammar_hash():
+            return None
+        FIRST = {A: set(v) for A, v in data["first"].items()}
+        FOLLOW = {A: set(v) for A, v in data["follow"].items()}
+        table = {(A, t): GRAMMAR[A][idx] for A, t, idx in data["table"]}
+    except (OSError, ValueError, KeyError, IndexError, TypeError, AttributeError):
+        return None
+    return FIRST, FOLLOW, table
+
+
+def _load_cached_tables():
+    path = table_cache_path()
+    return load_tables(path) if path else None
+
+
+# Tabelas compartilhadas por todas as instâncias de Parser do processo,
+# carregadas do cache em disco já na importação (quando válido).
+_SHARED_TABLES = _load_cached_tables()
+
+
+def get_tables():
+    """
+    Retorna as tabelas (FIRST, FOLLOW, table) compartilhadas do processo.
+
+    Na primeira chamada sem cache válido, os conjuntos e a tabela são
+    calculados e o cache em disco é regravado; as chamadas seguintes devolvem
+    sempre os mesmos objetos, sem recálculo.
+
+    Retorno:
+      tuple: (FIRST, FOLLOW, table)
+    """
+
+    global _SHARED_TABLES
+    if _SHARED_TABLES is None:
+        FIRST = compute_first()
+        FOLLOW = compute_follow(FIRST)
+        table = build_table(FIRST, FOLLOW)
+        path = table_cache_path()
+        if path:
+            save_tables(path, FIRST, FOLLOW, table)
+        _SHARED_TABLES = (FIRST, FOLLOW, table)
+    return _SHARED_TABLES
+
+
+def profile_tables(profile, grammar=GRAMMAR):
+    """
+    Calcula FIRST, FOLLOW e a Tabela LL(1) de `grammar` de novo, sem o
+    cache, medindo cada etapa em `profile` (lsi_profile.Profile) com o
+    prefixo RECOMPUTE_PREFIX. O Parser não usa estas tabelas, e sim as de
+    get_tables (em geral, lidas do cache na importação).
+
+    Retorno:
+      tuple: (FIRST, FOLLOW, table)
+    """
+
+    with profile.timed(RECOMPUTE_PREFIX + "compute_first"):
+        FIRST = compute_first(grammar)
+    with profile.timed(RECOMPUTE_PREFIX + "compute_follow"):
+        FOLLOW = compute_follow(FIRST, grammar)
+    with profile.timed(RECOMPUTE_PREFIX + "build_table"):
+        table = build_table(FIRST, FOLLOW, grammar)
+    return FIRST, FOLLOW, table
+
+
+# =========================================
+# TABELA COMPILADA (IDs INTEIROS)
+# =========================================
+class CompiledTable:
+    """
+    Forma compilada da Tabela LL(1), usada no laço principal do Parser.
+
+    Cada símbolo da gramática recebe um ID inteiro denso: os terminais ocupam
+    0..n_terms-1 e os não-terminais vêm em seguida, de modo que `sym < n_terms`
+    basta para saber se um símbolo é terminal. O ID `unknown` (= n_terms)
+    representa um terminal fora de TERMINALS e nunca possui regra.
+
+    A tabela é uma lista plana `cells`, indexada por
+    `(nt - width) * width + t` (os IDs de não-terminais começam em `width`).
+    Cada célula guarda a produção como uma tupla de IDs já invertida e sem
+    epsilon, pronta para `stack.extend(...)`, ou None para uma célula de erro.
+    """
+
+    def __init__(self, table):
+        """
+        Compila a Tabela LL(1) `table` ({(A, t): produção}).
+        """
+
+        terminals = sorted(TERMINALS)
+        nonterminals = list(GRAMMAR)
+
+        self.n_terms = len(terminals)
+        self.unknown = self.n_terms
+        self.width = self.n_terms + 1
+        self.names = terminals + ["?"] + nonterminals
+        self.ids = {name: i for i, name in enumerate(self.names)}
+        del self.ids["?"]
+
+        self.cells = [None] * (len(nonterminals) * self.width)
+        for (A, t), prod in table.items():
+            self.cells[self.cell_index(self.ids[A], self.ids[t])] = tuple(
+                self.ids[s] for s in reversed(prod) if s != EPS
+            )
+
+        self.start = self.ids["MAIN"]
+        self.end = self.ids["$"]
+
+        # tipo do Lexer -> ID do terminal, e código do TokenBuffer -> ID
+        self.type_ids = {typ: self.ids[term] for typ, term in LEX_TO_GR.items()}
+        self.type_ids["EOF"] = self.end
+        self.kind_ids = tuple(self.ids[term] for term in KIND_TO_TERMINAL)
+
+        self._table = table
+        self._ast_form = None
+        self._stop_sets = None
+        self._id_roles = None
+
+    def ast_form(self):
+        """
+        Retorna a forma da tabela usada na construção da AST (Parser.parse_ast).
+
+        Cada produção recebe um ID de ação (a partir de `action_base`, acima de
+        todos os símbolos). As células de `ast_cells` são as de `cells` com o
+        ID da ação empilhado antes dos símbolos da produção: quando ele chega
+        ao topo da pilha, a produção foi reconhecida por completo e sua ação
+        semântica (SEMANTIC_ACTIONS) é aplicada aos valores dos `arity[p]`
+        símbolos do lado direito.
+
+        Retorno:
+          tuple: (ast_cells, actions, arity, action_base)
+
+        Lança:
+          ValueError: Se SEMANTIC_ACTIONS não tiver uma ação por produção.
+        """
+
+        if self._ast_form is None:
+            action_base = len(self.names)
+            actions = []
+            arity = []
+            prod_ids = {}
+            for A, prods in GRAMMAR.items():
+                acts = SEMANTIC_ACTIONS.get(A, [])
+                if len(acts) != len(prods):
+                    raise ValueError(f"SEMANTIC_ACTIONS['{A}'] deve ter uma ação por produção")
+                for prod, action in zip(prods, acts):
+                    prod_ids[id(prod)] = len(actions)
+                    actions.append(action)
+                    arity.append(sum(1 for s in prod if s != EPS))
+
+            ast_cells = [None] * len(self.cells)
+            for (A, t), prod in self._table.items():
+                i = self.cell_index(self.ids[A], self.ids[t])
+                ast_cells[i] = (action_base + prod_ids[id(prod)],) + self.cells[i]
+
+            self._ast_form = (ast_cells, actions, arity, action_base)
+        return self._ast_form
+
+    def stop_sets(self, FIRST, FOLLOW):
+        """
+        Retorna os conjuntos de sincronização da recuperação de erros
+        (Parser.parse_recover), um por não-terminal, indexados por `nt - width`.
+
+        O conjunto de A contém os IDs de FIRST(A) (sem epsilon), FOLLOW(A),
+        SYNC_TERMINALS e '$': em modo pânico, a entrada é descartada até um
+        desses terminais.
+        """
+
+        if self._stop_sets is None:
+            sync = {self.ids[t] for t in SYNC_TERMINALS} | {self.end}
+            self._stop_sets = tuple(
+                frozenset(self.ids[t] for t in (FIRST[A] | FOLLOW[A]) if t != EPS) | sync
+                for A in GRAMMAR
+            )
+        return self._stop_sets
+
+    def id_roles(self):
+        """
+        Retorna o papel do `id` de cada célula (Parser.parse_xref), em uma
+        lista paralela a `cells`.
+
+        Em toda produção que contém `id`, os símbolos anteriores a ele são
+        terminais (ex: FDEF -> def id ...). Assim, ao expandir a célula, o
+        `id` é o token `offset` posições adiante do atual. A célula guarda
+        (tipo, offset), com tipo lsi_xref.FUNCTION, PARAM, VAR ou USE
+        (DEFINITION_KINDS), ou None se a produção não contém `id`.
+        """
+
+        if self._id_roles is None:
+            roles = [None] * len(self.cells)
+            for (A, t), prod in self._table.items():
+                symbols = [s for s in prod if s != EPS]
+                if "id" in symbols:
+                    offset = symbols.index("id")
+                    assert all(s in TERMINALS for s in symbols[:offset])
+                    roles[self.cell_index(self.ids[A], self.ids[t])] = (
+                        DEFINITION_KINDS.get(A, USE), offset)
+            self._id_roles = roles
+        return self._id_roles
+
+    def cell_index(self, nt, t):
+        """
+        Retorna o índice em `cells` da célula (não-terminal `nt`, terminal `t`).
+        """
+
+        return (nt - self.width) * self.width + t
+
+    def cell_names(self, index):
+        """
+        Retorna (Não-Terminal, terminal), pelos nomes, da célula `index` de
+        `cells` (inversa de cell_index).
+        """
+
+        nt, t = divmod(index, self.width)
+        return self.names[nt + self.width], self.names[t]
+
+    def terminal_ids(self, tokens, last):
+        """
+        Gera o ID de terminal de cada Token de `tokens`.
+
+        O último Token lido é guardado em `last[0]`, para que mensagens de erro
+        possam mostrar o terminal original quando ele for desconhecido.
+        """
+
+        type_ids = self.type_ids
+        for tok in tokens:
+            last[0] = tok
+            t = type_ids.get(tok.typ)
+            if t is None:
+                t = self.ids.get(token_to_terminal(tok), self.unknown)
+            yield t
+
+
+# Tabela compilada compartilhada pelo processo (ver get_tables)
+_SHARED_COMPILED = None
+
+
+def get_compiled_table():
+    """
+    Retorna a CompiledTable compartilhada do processo, construída uma única
+    vez a partir de get_tables().
+    """
+
+    global _SHARED_COMPILED
+    if _SHARED_COMPILED is None:
+        _SHARED_COMPILED = CompiledTable(get_tables()[2])
+    return _SHARED_COMPILED
+
+
+# =========================================
+# TRACE DA ANÁLISE
+# =========================================
+def format_trace(top, cur):
+    """
+    Formata um passo da análise no formato do trace de depuração.
+    """
+
+    return f"STACK TOP:{top:10} | CURRENT TOKEN:{cur}"
+
+
+def print_trace(top, cur):
+    """
+    Sink de trace que imprime cada passo imediatamente (sem buffer).
+    """
+
+    print(format_trace(top, cur))
+
+
+class TraceWriter:
+    """
+    Sink de trace com buffer para o Parser.
+
+    Cada passo `(top, cur)` é formatado e acumulado em memória; as linhas são
+    escritas em `stream` em blocos de `buffer_lines`, evitando uma operação de
+    E/S por passo da análise. Deve ser fechado (ou usado como gerenciador de
+    contexto) para descarregar as últimas linhas.
+    """
+
+    def __init__(self, stream, buffer_lines=8192):
+        """
+        Parâmetros:
+          stream: Objeto com método write(str) (ex: sys.stdout, arquivo aberto).
+          buffer_lines (int): Quantidade de linhas acumuladas antes de escrever.
+        """
+
+        self.stream = stream
+        self.buffer_lines = buffer_lines
+        self.lines = []
+
+    def __call__(self, top, cur):
+        self.lines.append(format_trace(top, cur) + "\n")
+        if len(self.lines) >= self.buffer_lines:
+            self.flush()
+
+    def flush(self):
+        """
+        Escreve as linhas acumuladas no stream.
+        """
+
+        if self.lines:
+            self.stream.write("".join(self.lines))
+            self.lines.clear()
+        if hasattr(self.stream, "flush"):
+            self.stream.flush()
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# =========================================
+# RECUPERAÇÃO DE ERROS (MODO PÂNICO)
+# =========================================
+# Terminais de sincronização: fim de comando, fim de bloco e início de função.
+SYNC_TERMINALS = ("SEMI", "RBRACE", "def")
+
+
+@dataclass
+class SyntaxDiagnostic:
+    """
+    Um erro sintático reportado por Parser.parse_recover.
+
+    Atributos:
+      line (int): Linha do token onde o erro foi detectado.
+      col (int): Coluna do token onde o erro foi detectado.
+      message (str): A mesma mensagem que Parser.parse lançaria nesse ponto.
+    """
+    line: int
+    col: int
+    message: str
+
+    def __str__(self):
+        return f"Linha {self.line}, coluna {self.col}: {self.message}"
+
+
 # =========================================
 # PARSER
 # =========================================
@@ -435,94 +1096,743 @@ class Parser:
     dos tokens de entrada.
     """
 
-    def __init__(self):
+    def __init__(self, trace=None, profile=None):
+        """
+        Inicializa o Parser com os conjuntos FIRST, FOLLOW e a Tabela LL(1).
+
+        As estruturas vêm de get_tables(): são calculadas (ou lidas do cache em
+        disco) uma única vez por processo e compartilhadas entre as instâncias.
+
+        Parâmetros:
+          trace (callable): Opcional. Função chamada a cada passo da análise
+            com (topo da pilha, token atual), ex: print_trace ou um
+            TraceWriter. Sem trace (padrão), o laço usado não contém nenhuma
+            verificação ou chamada de trace.
+          profile (lsi_profile.Profile): Opcional. Se informado, parse e
+            parse_stream usam um laço que conta as expansões por célula da
+            tabela e a profundidade máxima da pilha (além de chamar o trace,
+            se houver). Sem profile (padrão), o laço não tem contadores.
         """
-        Inicializa o Parser calculando os conjuntos FIRST, FOLLOW e a Tabela LL(1).
-        """
 
-        self.FIRST = compute_first()
-        self.FOLLOW = compute_follow(self.FIRST)
-        self.table = build_table(self.FIRST, self.FOLLOW)
+        self.FIRST, self.FOLLOW, self.table = get_tables()
+        self.compiled = get_compiled_table()
+        self.trace = trace
+        self.profile = profile
+        if profile is not None:
+            self._loop = self._loop_profiled
+        else:
+            self._loop = self._loop_fast if trace is None else self._loop_traced
 
     def parse(self, tokens):
         """
-        Executa o algoritmo de Parsing LL(1) não-recursivo.
+        Executa o algoritmo de Parsing LL(1) não-recursivo.
+
+        O parser usa uma pilha e a Tabela de Análise para determinar a próxima
+        ação (match de terminal ou expansão de Não-Terminal).
+
+        Parâmetros:
+          tokens (list): Lista de objetos Token (ou TokenBuffer) fornecida pelo Lexer.
+
+        Retorno:
+          bool: True se o parsing foi bem-sucedido.
+
+        Lança:
+          Exception: Em caso de Erro Sintático (Terminal Mismatch ou No Rule).
+        """
+
+        return self.parse_stream(tokens)
+
+    def parse_stream(self, tokens):
+        """
+        Executa o Parsing LL(1) consumindo os tokens sob demanda.
+
+        Aceita qualquer iterável de Tokens, em particular o gerador
+        Lexer.iter_tokens(), ou um TokenBuffer (lido diretamente pelos códigos
+        de tipo, sem criar objetos Token). Apenas o token atual (lookahead de
+        um símbolo) é mantido em memória, de modo que o consumo de memória
+        depende só da profundidade da pilha, e não do tamanho do arquivo. O
+        primeiro erro (léxico ou sintático) é lançado assim que é alcançado.
+        Se o iterável terminar sem um token EOF, o fim da entrada é tratado
+        como '$'.
+
+        O laço opera sobre a CompiledTable: a pilha contém IDs inteiros e cada
+        expansão é uma consulta a uma lista plana, sem tuplas de chave nem
+        comparações de produções.
+
+        Parâmetros:
+          tokens (iterable ou TokenBuffer): Iterável de objetos Token.
+
+        Retorno:
+          bool: True se o parsing foi bem-sucedido.
+
+        Lança:
+          Exception: Em caso de Erro Sintático (Terminal Mismatch ou No Rule).
+          LexerError: Se o iterável for um gerador do Lexer e encontrar um
+            caractere inválido.
+        """
+
+        terminals, name, _ = self._input(tokens)
+        return self._loop(terminals, name)
+
+    def parse_ast(self, tokens):
+        """
+        Executa o Parsing LL(1) construindo a AST na mesma passada.
+
+        A cada expansão, o ID da ação semântica da produção é empilhado abaixo
+        dos seus símbolos. Terminais reconhecidos empilham o seu Token em uma
+        pilha de valores; quando o ID da ação chega ao topo, os valores do lado
+        direito são substituídos pelo resultado da ação (ver lsi_ast). As
+        caudas *_TAIL são achatadas em listas e em BinOps associativos à
+        esquerda.
+
+        Parâmetros:
+          tokens (iterable ou TokenBuffer): Os tokens produzidos pelo Lexer.
+
+        Retorno:
+          lsi_ast.Program: A raiz da AST.
+
+        Lança:
+          Exception: Em caso de Erro Sintático (mesmas mensagens de parse()).
+        """
+
+        ct = self.compiled
+        ast_cells, actions, arity, action_base = ct.ast_form()
+        terminals, name, last = self._input(tokens, need_tokens=True)
+
+        n_terms = ct.n_terms
+        width = ct.width
+        end = ct.end
+
+        stack = [end, ct.start]
+        values = []
+        cur = next(terminals, end)
+
+        while True:
+
+            top = stack.pop()
+
+            if top < n_terms:
+                if top == cur:
+                    if top == end:
+                        return values.pop()
+                    values.append(last[0])
+                    cur = next(terminals, end)
+                    continue
+                raise self._error(top, cur, name)
+
+            if top >= action_base:
+                p = top - action_base
+                k = arity[p]
+                if k:
+                    args = values[-k:]
+                    del values[-k:]
+                else:
+                    args = []
+                values.append(actions[p](args))
+                continue
+
+            rule = ast_cells[(top - width) * width + cur]
+            if rule is None:
+                raise self._error(top, cur, name)
+
+            stack.extend(rule)
+
+    def parse_ast_symbol(self, tokens, symbol, start=0):
+        """
+        Reconhece um único Não-Terminal `symbol` (ex: "FDEF") a partir do
+        token `start` de `tokens` e constrói a sua AST, sem exigir o EOF
+        depois dele.
+
+        Os passos são exatamente os que parse_ast executa ao expandir
+        `symbol` naquele ponto da entrada: os erros (e as mensagens) são os
+        mesmos, desde que ocorram antes de `symbol` ser concluído. Usado na
+        análise incremental (lsi_incremental), que reanalisa apenas as
+        funções alteradas.
+
+        Parâmetros:
+          tokens (TokenBuffer): Os tokens produzidos pelo Lexer.
+          symbol (str): O Não-Terminal a reconhecer.
+          start (int): Índice do primeiro token.
+
+        Retorno:
+          tuple: (valor da ação semântica de `symbol`, índice do token
+            seguinte ao último reconhecido)
+
+        Lança:
+          Exception: Em caso de Erro Sintático; o atributo `token_index` da
+            exceção é o índice do token onde o erro ocorreu.
+        """
+
+        ct = self.compiled
+        ast_cells, actions, arity, action_base = ct.ast_form()
+        terminals, name, last = self._input(
+            map(tokens.__getitem__, range(start, len(tokens))), need_tokens=True)
+
+        n_terms = ct.n_terms
+        width = ct.width
+        end = ct.end
+
+        stack = [ct.ids[symbol]]
+        values = []
+        i = start
+        cur = next(terminals, end)
+
+        while stack:
+
+            top = stack.pop()
+
+            if top < n_terms:
+                if top == cur:
+                    values.append(last[0])
+                    i += 1
+                    cur = next(terminals, end)
+                    continue
+                error = self._error(top, cur, name)
+                error.token_index = i
+                raise error
+
+            if top >= action_base:
+                p = top - action_base
+                k = arity[p]
+                if k:
+                    args = values[-k:]
+                    del values[-k:]
+                else:
+                    args = []
+                values.append(actions[p](args))
+                continue
+
+            rule = ast_cells[(top - width) * width + cur]
+            if rule is None:
+                error = self._error(top, cur, name)
+                error.token_index = i
+                raise error
+
+            stack.extend(rule)
+
+        return values.pop(), i
+
+    def parse_xref(self, tokens):
+        """
+        Executa o Parsing LL(1) registrando as definições e os usos de cada
+        identificador (lsi_xref.XrefIndex).
+
+        É o laço de parse() com um contador da posição do token atual: cada
+        expansão de uma célula que contém `id` (CompiledTable.id_roles)
+        registra o índice do token do nome e o seu papel, sem outra passada
+        sobre os tokens nem criação de objetos Token.
+
+        Parâmetros:
+          tokens (TokenBuffer): Os tokens produzidos pelo Lexer.
+
+        Retorno:
+          lsi_xref.XrefIndex: O índice do programa.
+
+        Lança:
+          Exception: Em caso de Erro Sintático (mesmas mensagens de parse()).
+        """
+
+        ct = self.compiled
+        cells = ct.cells
+        roles = ct.id_roles()
+        terminals, name, _ = self._input(tokens)
+
+        n_terms = ct.n_terms
+        width = ct.width
+        end = ct.end
+
+        positions = array("I")
+        kinds = array("B")
+        add_position = positions.append
+        add_kind = kinds.append
+
+        stack = [end, ct.start]
+        pos = 0
+        cur = next(terminals, end)
+
+        while True:
+
+            top = stack.pop()
+
+            if top < n_terms:
+                if top == cur:
+                    if top == end:
+                        return XrefIndex.from_occurrences(tokens, positions, kinds)
+                    pos += 1
+                    cur = next(terminals, end)
+                    continue
+                raise self._error(top, cur, name)
+
+            cell = (top - width) * width + cur
+            rule = cells[cell]
+            if rule is None:
+                raise self._error(top, cur, name)
+
+            role = roles[cell]
+            if role is not None:
+                add_position(pos + role[1])
+                add_kind(role[0])
+
+            stack.extend(rule)
+
+    def parse_recover(self, tokens):
+        """
+        Executa o Parsing LL(1) com recuperação de erros em modo pânico,
+        reportando todos os erros sintáticos em uma única passada.
+
+        Em vez de parar no primeiro erro:
+          * Terminal Mismatch: o terminal do topo é desempilhado (como se
+            tivesse sido inserido) e a análise continua.
+          * No Rule (A, t): tokens são descartados até um terminal do
+            conjunto de sincronização de A (FIRST(A), FOLLOW(A),
+            SYNC_TERMINALS ou '$'). Se houver regra para o novo token, A é
+            expandido; senão, A é desempilhado.
+          * Sobra de entrada após o fim do programa: tokens são descartados
+            até o próximo 'def', e a análise recomeça por MAIN.
+
+        Para evitar erros em cascata, um novo erro só é reportado depois que
+        algum terminal foi reconhecido desde o erro anterior.
+
+        Parâmetros:
+          tokens (iterable ou TokenBuffer): Os tokens produzidos pelo Lexer.
+
+        Retorno:
+          list: Lista de SyntaxDiagnostic, em ordem; vazia se não há erros.
+        """
+
+        ct = self.compiled
+        stop_sets = ct.stop_sets(self.FIRST, self.FOLLOW)
+        terminals, name, last = self._input(tokens, need_tokens=True)
+
+        cells = ct.cells
+        n_terms = ct.n_terms
+        width = ct.width
+        end = ct.end
+        start = ct.start
+
+        diagnostics = []
+        reporting = True  # False até reconhecer um terminal após um erro
+
+        def report(top):
+            nonlocal reporting
+            if reporting:
+                tok = last[0]
+                line, col = (tok.line, tok.col) if tok is not None else (1, 1)
+                diagnostics.append(SyntaxDiagnostic(line, col, str(self._error(top, cur, name))))
+                reporting = False
+
+        stack = [end, start]
+        cur = next(terminals, end)
+
+        while True:
+
+            top = stack.pop()
+
+            if top < n_terms:
+                if top == cur:
+                    if top == end:
+                        return diagnostics
+                    reporting = True
+                    cur = next(terminals, end)
+                    continue
+
+                report(top)
+                if top == end:
+                    # entrada após o fim do programa: recomeça no próximo 'def'
+                    stack.append(end)
+                    cur = next(terminals, end)
+                    while cur != end and cells[(start - width) * width + cur] is None:
+                        cur = next(terminals, end)
+                    stack.append(start)
+                continue
+
+            rule = cells[(top - width) * width + cur]
+            if rule is None:
+                report(top)
+                stop = stop_sets[top - width]
+                while cur not in stop:
+                    cur = next(terminals, end)
+                rule = cells[(top - width) * width + cur]
+                if rule is None:
+                    continue
+
+            stack.extend(rule)
+
+    def _input(self, tokens, need_tokens=False):
+        """
+        Prepara a entrada do laço de análise.
+
+        Parâmetros:
+          tokens (iterable ou TokenBuffer): Os tokens produzidos pelo Lexer.
+          need_tokens (bool): Se True, o Token de cada terminal fica disponível
+            em `last[0]` mesmo para um TokenBuffer (visões criadas sob demanda).
+
+        Retorno:
+          tuple: (iterador de IDs de terminais, função ID -> nome para
+            mensagens, lista `last` com o Token atual)
+        """
+
+        ct = self.compiled
+        last = [None]
+        if isinstance(tokens, TokenBuffer) and not need_tokens:
+            terminals = map(ct.kind_ids.__getitem__, tokens.kinds)
+        else:
+            terminals = ct.terminal_ids(tokens, last)
+
+        def name(t):
+            if t == ct.unknown:
+                return token_to_terminal(last[0])
+            return ct.names[t]
+
+        return terminals, name, last
+
+    def _error(self, top, cur, name):
+        """
+        Cria a exceção de erro sintático para o topo `top` e o terminal `cur`:
+        Terminal Mismatch se `top` é terminal, No Rule caso contrário.
+        """
 
-        O parser usa uma pilha e a Tabela de Análise para determinar a próxima
-        ação (match de terminal ou expansão de Não-Terminal).
+        top_name = self.compiled.names[top]
+        if top < self.compiled.n_terms:
+            return Exception(f"Esperado '{top_name}', encontrado '{name(cur)}'.")
+        return Exception(f"Erro sintático: não há regra ({top_name}, {name(cur)})")
 
-        Parâmetros:
-          tokens (list): Lista de objetos Token fornecida pelo Lexer.
+    def _loop_fast(self, terminals, name):
+        """
+        Laço de análise sem trace (caminho padrão).
 
-        Retorno:
-          bool: True se o parsing foi bem-sucedido.
+        Parâmetros:
+          terminals (iterator): IDs dos terminais de entrada.
+          name (callable): Converte um ID de terminal no nome usado nas mensagens.
+        """
 
-        Lança:
-          Exception: Em caso de Erro Sintático (Terminal Mismatch ou No Rule).
-        """
+        ct = self.compiled
+        cells = ct.cells
+        n_terms = ct.n_terms
+        width = ct.width
+        end = ct.end
 
-        stream = [token_to_terminal(t) for t in tokens]
-        stack = ["$", "MAIN"]
-        ip = 0
+        stack = [end, ct.start]
+        cur = next(terminals, end)
 
         while True:
 
             top = stack.pop()
-            cur = stream[ip]
-            print(f"STACK TOP:{top:10} | CURRENT TOKEN:{cur}")
 
+            if top < n_terms:
+                if top == cur:
+                    if top == end:
+                        return True
+                    cur = next(terminals, end)
+                    continue
+                raise self._error(top, cur, name)
+
+            rule = cells[(top - width) * width + cur]
+            if rule is None:
+                raise self._error(top, cur, name)
+
+            stack.extend(rule)
 
-            if top == "$" and cur == "$":
-                print("Parse OK.")
-                return True
+    def _loop_traced(self, terminals, name):
+        """
+        Laço de análise que envia cada passo (topo, token atual) a self.trace.
+
+        Mesmos parâmetros de _loop_fast.
+        """
 
-            if top in TERMINALS:
+        ct = self.compiled
+        names = ct.names
+        cells = ct.cells
+        n_terms = ct.n_terms
+        width = ct.width
+        end = ct.end
+        trace = self.trace
+
+        stack = [end, ct.start]
+        cur = next(terminals, end)
+
+        while True:
+
+            top = stack.pop()
+            trace(names[top], name(cur))
+
+            if top < n_terms:
                 if top == cur:
-                    ip += 1
+                    if top == end:
+                        return True
+                    cur = next(terminals, end)
                     continue
-                raise Exception(f"Esperado '{top}', encontrado '{cur}'.")
+                raise self._error(top, cur, name)
 
-            rule = self.table.get((top, cur))
+            rule = cells[(top - width) * width + cur]
             if rule is None:
-                raise Exception(f"Erro sintático: não há regra ({top}, {cur})")
+                raise self._error(top, cur, name)
+
+            stack.extend(rule)
+
+    def _loop_profiled(self, terminals, name):
+        """
+        Laço de análise instrumentado: conta as expansões de cada célula e a
+        profundidade máxima da pilha, acumuladas em self.profile ao final
+        (também em caso de erro), e envia os passos a self.trace, se houver.
+
+        Mesmos parâmetros de _loop_fast.
+        """
+
+        ct = self.compiled
+        names = ct.names
+        cells = ct.cells
+        n_terms = ct.n_terms
+        width = ct.width
+        end = ct.end
+        trace = self.trace
+
+        # contadores indexados como `cells`; convertidos em nomes só no final
+        counts = [0] * len(cells)
+        depth = 2
+
+        stack = [end, ct.start]
+        cur = next(terminals, end)
+
+        try:
+            while True:
+
+                top = stack.pop()
+                if trace is not None:
+                    trace(names[top], name(cur))
+
+                if top < n_terms:
+                    if top == cur:
+                        if top == end:
+                            return True
+                        cur = next(terminals, end)
+                        continue
+                    raise self._error(top, cur, name)
+
+                cell = (top - width) * width + cur
+                rule = cells[cell]
+                if rule is None:
+                    raise self._error(top, cur, name)
 
-            if rule != [EPS]:
-                for s in reversed(rule):
-                    stack.append(s)
+                counts[cell] += 1
+                stack.extend(rule)
+                if len(stack) > depth:
+                    depth = len(stack)
+        finally:
+            profile = self.profile
+            for cell, n in enumerate(counts):
+                if n:
+                    profile.expansions[ct.cell_names(cell)] += n
+            profile.max_stack_depth = max(profile.max_stack_depth, depth)
 
 
 # =========================================
-# MAIN
+# LINHA DE COMANDO
 # =========================================
-if __name__ == "__main__":
-    import sys
-    from lsi_lexer import LexerError
+def cli_arg_parser(parser_class=argparse.ArgumentParser):
+    """
+    Cria o ArgumentParser da linha de comando (também usado por lsi_server,
+    que repassa os argumentos do cliente).
+
+    Parâmetros:
+      parser_class (type): A classe do ArgumentParser.
 
+    Retorno:
+      argparse.ArgumentParser: O parser de argumentos.
+    """
+
+    ap = parser_class(description="Analisador léxico e sintático LL(1) da linguagem LSI.")
+    ap.add_argument("file", help="arquivo .lsi de entrada")
+    mode = ap.add_mutually_exclusive_group()
+    mode.add_argument("--trace", action="store_true",
+                      help="exibe a lista de tokens e o log da pilha")
+    mode.add_argument("--quiet", action="store_true",
+                      help="não imprime nada em caso de sucesso")
+    mode.add_argument("--ast", action="store_true",
+                      help="exibe a AST do programa em caso de sucesso")
+    ap.add_argument("--trace-file", metavar="ARQUIVO",
+                    help="grava a lista de tokens e o log da pilha em ARQUIVO")
+    ap.add_argument("--recover", action="store_true",
+                    help="continua após erros sintáticos e reporta todos eles")
+    ap.add_argument("--profile", action="store_true",
+                    help="exibe o perfil plano (tokens, expansões, pilha e tempo das tabelas)")
+    ap.add_argument("--profile-json", metavar="ARQUIVO",
+                    help="grava o perfil em ARQUIVO, em JSON")
+    ap.add_argument("--artifact", action="store_true",
+                    help="reaproveita o resultado gravado em <arquivo>.lsia, se o arquivo não mudou "
+                         "(senão, analisa e grava)")
+    return ap
+
+
+def parse_cli_args(ap, argv=None):
+    """
+    Lê os argumentos com `ap` (ver cli_arg_parser) e rejeita as combinações
+    de opções inválidas com ap.error.
+    """
+
+    args = ap.parse_args(argv)
+    if args.ast and args.trace_file:
+        ap.error("--ast não pode ser combinado com --trace-file")
+    if args.recover and (args.ast or args.trace or args.trace_file):
+        ap.error("--recover não pode ser combinado com --ast, --trace ou --trace-file")
+    if (args.profile or args.profile_json) and (args.ast or args.recover):
+        ap.error("--profile/--profile-json não podem ser combinados com --ast ou --recover")
+    if args.artifact and (args.trace or args.trace_file or args.profile or args.profile_json):
+        ap.error("--artifact não pode ser combinado com --trace, --trace-file, --profile ou --profile-json")
+    return args
+
+
+def run_cli(args, text, out):
+    """
+    Executa a análise de `text` como a linha de comando e escreve o
+    resultado em `out`.
+
+    Parâmetros:
+      args (argparse.Namespace): As opções (ver parse_cli_args).
+      text (str ou bytes): O código-fonte, decodificado ou em bytes (ex: o
+        mmap de open_source, analisado pelo BytesLexer).
+      out (file): Onde escrever a saída (e o trace, sem --trace-file).
+
+    Retorno:
+      int: O código de saída (0 em caso de sucesso, 1 em caso de erro).
     """
-    Ponto de entrada do programa.
-    1. Lê o arquivo de entrada.
-    2. Executa o Lexer para obter tokens e a tabela de símbolos (com tratamento de erro léxico).
-    3. Instancia e executa o Parser (com tratamento de erro sintático).
-    """
 
-    fname = sys.argv[1]
-    text = open(fname).read()
+    if args.artifact:
+        return _run_artifact(args, text, out)
 
-    lexer = Lexer(text)
+    profile = None
+    if args.profile or args.profile_json:
+        profile = Profile()
+        # as tabelas que o Parser usa (calculadas aqui só se não havia cache
+        # válido na importação) e, à parte, o custo de recalculá-las
+        with profile.timed("get_tables"):
+            get_tables()
+        profile_tables(profile)
+
+    def timed(name):
+        return profile.timed(name) if profile is not None else nullcontext()
+
+    lexer = RegexLexer(text) if isinstance(text, str) else BytesLexer(text)
 
     try:
-        tokens, symtab = lexer.tokenize_all()
+        with timed("tokenize"):
+            tokens, symtab = lexer.tokenize_all(as_buffer=True)
     except LexerError as e:
-        print(f"\n=== ERRO LÉXICO ===")
-        print(e)
-        sys.exit(1)
-
-    print("TOKENS:", [f"{t.typ}:{t.lexeme}" for t in tokens])
+        print(f"\n=== ERRO LÉXICO ===", file=out)
+        print(e, file=out)
+        return 1
+
+    if profile is not None:
+        profile.record_tokens(tokens, len(text))
+
+    if args.recover:
+        diagnostics = Parser().parse_recover(tokens)
+        if diagnostics:
+            print(f"\n=== ERROS SINTÁTICOS ({len(diagnostics)}) ===", file=out)
+            for d in diagnostics:
+                print(d, file=out)
+            return 1
+        if not args.quiet:
+            print("Parse OK.", file=out)
+        return 0
+
+    trace = None
+    if args.trace or args.trace_file:
+        trace_stream = open(args.trace_file, "w") if args.trace_file else out
+        trace_stream.write("TOKENS: " + str([f"{t.typ}:{t.lexeme}" for t in tokens]) + "\n")
+        trace = TraceWriter(trace_stream)
 
     try:
-        parser = Parser()
-        parser.parse(tokens)
+        parser = Parser(trace=trace, profile=profile)
+        with timed("parse"):
+            if args.ast:
+                tree = parser.parse_ast(tokens)
+            else:
+                parser.parse(tokens)
     except Exception as e:
-        print(f"\n=== ERRO SINTÁTICO ===")
-        print(e)
-        sys.exit(1)
+        syntax_error = e
+    else:
+        syntax_error = None
+    finally:
+        if trace is not None:
+            trace.close()
+            if args.trace_file:
+                trace_stream.close()
+
+    if syntax_error is not None:
+        print(f"\n=== ERRO SINTÁTICO ===", file=out)
+        print(syntax_error, file=out)
+    else:
+        if args.ast:
+            print(dump(tree), file=out)
+        if not args.quiet:
+            print("Parse OK.", file=out)
+
+    if profile is not None:
+        if args.profile:
+            print(f"\n=== PERFIL ===", file=out)
+            print(profile.format_flat(), file=out)
+        if args.profile_json:
+            with open(args.profile_json, "w") as f:
+                f.write(profile.to_json() + "\n")
+
+    return 0 if syntax_error is None else 1
+
+
+def _run_artifact(args, text, out):
+    """
+    run_cli com --artifact: o resultado vem do artefato de `args.file`
+    (lsi_artifact), construído apenas se o arquivo mudou. A saída é a mesma
+    da análise completa.
+    """
+
+    from lsi_artifact import load_or_build
+
+    artifact, _ = load_or_build(args.file, text)
+    if artifact.lexical_error is not None:
+        print(f"\n=== ERRO LÉXICO ===", file=out)
+        print(artifact.lexical_error, file=out)
+        return 1
+
+    if args.recover and artifact.diagnostics:
+        print(f"\n=== ERROS SINTÁTICOS ({len(artifact.diagnostics)}) ===", file=out)
+        for d in artifact.diagnostics:
+            print(d, file=out)
+        return 1
+    if artifact.syntax_error is not None and not args.recover:
+        print(f"\n=== ERRO SINTÁTICO ===", file=out)
+        print(artifact.syntax_error, file=out)
+        return 1
+
+    if args.ast:
+        print(dump(artifact.ast()), file=out)
+    if not args.quiet:
+        print("Parse OK.", file=out)
+    return 0
+
+
+# =========================================
+# MAIN
+# =========================================
+if __name__ == "__main__":
+    import sys
+
+    """
+    Ponto de entrada do programa.
+    1. Mapeia o arquivo de entrada na memória (open_source), sem decodificá-lo.
+    2. Executa o Lexer para obter tokens e a tabela de símbolos (com tratamento de erro léxico).
+    3. Instancia e executa o Parser (com tratamento de erro sintático).
+
+    Por padrão apenas o resultado é exibido. --trace mostra a lista de tokens
+    e o log da pilha (modo de depuração), e --trace-file ARQUIVO grava o mesmo
+    log em um arquivo; --quiet não imprime nada em caso de sucesso (o
+    resultado fica no código de saída); --ast exibe a AST construída;
+    --recover continua após cada erro sintático e reporta todos de uma vez.
+    """
+
+    args = parse_cli_args(cli_arg_parser())
+
+    fname = args.file
+    text = open_source(fname)
+
+    sys.exit(run_cli(args, text, sys.stdout))
@@ -0,0 +1,144 @@
+import json
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from lsi_lexer import EOF_CODE, TOKEN_TYPES
+
+# =========================================
+# INSTRUMENTAÇÃO DO LEXER E DO PARSER
+# =========================================
+#
+# Um Profile acumula contadores dos caminhos críticos da análise:
+#   * tokens por tipo (Lexer.next_token, ou record_tokens para os buffers
+#     do RegexLexer/BytesLexer);
+#   * caracteres ignorados por skip_space_and_comments (espaços e
+#     comentários; em fontes ASCII, o mesmo que bytes);
+#   * expansões por célula (Não-Terminal, terminal) da Tabela LL(1) e a
+#     profundidade máxima da pilha (Parser.parse / parse_stream);
+#   * tempos de etapas (Profile.timed): na linha de comando, get_tables (as
+#     tabelas que o Parser usa), tokenize e parse, e o recálculo de
+#     compute_first, compute_follow e build_table sem o cache
+#     (lsi_parser.profile_tables, etapas com o prefixo RECOMPUTE_PREFIX).
+#
+# A instrumentação é opcional e não custa nada quando desligada: o Lexer e o
+# Parser escolhem a implementação instrumentada na construção (profile=...),
+# como o Parser já faz com o trace, e os laços padrão não são alterados.
+
+# Prefixo das etapas de lsi_parser.profile_tables, que recalculam as tabelas
+# à parte (o Parser não as usa)
+RECOMPUTE_PREFIX = "recálculo sem cache: "
+
+
+class Profile:
+    """
+    Contadores e tempos de uma ou mais análises.
+
+    Atributos:
+      tokens (Counter): Tipo do token -> quantidade.
+      skipped (int): Caracteres ignorados entre os tokens.
+      expansions (Counter): (Não-Terminal, terminal) -> expansões.
+      max_stack_depth (int): Maior tamanho da pilha do parser.
+      timings (dict): Etapa -> [chamadas, segundos].
+    """
+
+    def __init__(self):
+        self.tokens = Counter()
+        self.skipped = 0
+        self.expansions = Counter()
+        self.max_stack_depth = 0
+        self.timings = {}
+
+    @contextmanager
+    def timed(self, name):
+        """
+        Mede o tempo do bloco `with` e o acumula na etapa `name`.
+        """
+
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry = self.timings.setdefault(name, [0, 0.0])
+            entry[0] += 1
+            entry[1] += time.perf_counter() - t0
+
+    def record_tokens(self, tokens, size):
+        """
+        Conta os tokens de uma análise já concluída (ex: o TokenBuffer do
+        RegexLexer.tokenize_all, que não passa por next_token). Como em
+        next_token, o EOF não é contado.
+
+        Parâmetros:
+          tokens (TokenBuffer ou list): Os tokens, terminando com o EOF.
+          size (int): Tamanho do código-fonte (caracteres ou bytes, na mesma
+            unidade dos deslocamentos do buffer).
+        """
+
+        if hasattr(tokens, "kinds"):
+            counts = Counter(tokens.kinds)
+            counts.pop(EOF_CODE, None)
+            for code, n in counts.items():
+                self.tokens[TOKEN_TYPES[code]] += n
+            used = sum(tokens.ends) - sum(tokens.starts)
+        else:
+            used = 0
+            for t in tokens:
+                if t.typ != "EOF":
+                    self.tokens[t.typ] += 1
+                    used += len(t.lexeme)
+        self.skipped += size - used
+
+    def to_dict(self):
+        """
+        Retorna os contadores em uma estrutura serializável em JSON.
+        """
+
+        return {
+            "tokens": dict(self.tokens.most_common()),
+            "skipped": self.skipped,
+            "expansions": [
+                {"nonterminal": A, "terminal": t, "count": n}
+                for (A, t), n in self.expansions.most_common()
+            ],
+            "max_stack_depth": self.max_stack_depth,
+            "timings": {
+                name: {"calls": calls, "seconds": seconds}
+                for name, (calls, seconds) in self.timings.items()
+            },
+        }
+
+    def to_json(self, indent=1):
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def format_flat(self):
+        """
+        Retorna o perfil plano: uma linha por contador, agrupadas por
+        categoria e ordenadas pela contagem (com o percentual da categoria).
+        """
+
+        lines = []
+        if self.timings:
+            lines.append(f"{'tempo (ms)':>12} {'chamadas':>9}  etapa")
+            for name, (calls, seconds) in self.timings.items():
+                lines.append(f"{seconds * 1000:12.3f} {calls:9}  {name}")
+            if any(name.startswith(RECOMPUTE_PREFIX) for name in self.timings):
+                lines.append(f"({RECOMPUTE_PREFIX.rstrip(': ')}: medido à parte; "
+                             "o Parser usa as tabelas de get_tables)")
+            lines.append("")
+
+        for title, counter in (("tipo do token", self.tokens),
+                               ("expansão (Não-Terminal, terminal)", self.expansions)):
+            if not counter:
+                continue
+            total = sum(counter.values())
+            lines.append(f"{'contagem':>12} {'%':>9}  {title}")
+            for key, n in counter.most_common():
+                label = f"{key[0]}, {key[1]}" if isinstance(key, tuple) else key
+                lines.append(f"{n:12} {100 * n / total:8.2f}%  {label}")
+            lines.append(f"{total:12} {'':9}  total")
+            lines.append("")
+
+        lines.append(f"caracteres ignorados (espaços e comentários): {self.skipped}")
+        lines.append(f"profundidade máxima da pilha: {self.max_stack_depth}")
+        return "\n".join(lines)
@@ -0,0 +1,628 @@
+# =========================================
+# PARSER DESCENDENTE RECURSIVO DA LINGUAGEM LSI
+# =========================================
+#
+# GERADO AUTOMATICAMENTE por lsi_codegen.py a partir da GRAMMAR do lsi_parser.
+# Não edite: altere a gramática e execute
+#   python3 src/lsi_codegen.py
+#
+# Módulo independente (sem importações, exceto em _deep_fallback). Os tokens
+# são códigos inteiros na ordem de TOKEN_TYPES do lsi_lexer (os mesmos de
+# TokenBuffer.kinds).
+
+# Hash da gramática usada na geração (lsi_parser.grammar_hash)
+GRAMMAR_HASH = '574c774af47c8b31adbbbeb7784cf513fd291d0d7b0ed205caaae73ea55a0286'
+
+# Código do token -> nome do terminal (para mensagens de erro)
+_NAMES = ('$', 'id', 'NUM', 'def', 'else', 'if', 'int', 'print', 'return', 'PLUS', 'MINUS', 'TIMES', 'DIV', 'EQUAL', 'LPAREN', 'RPAREN', 'LBRACE', 'RBRACE', 'COMMA', 'SEMI', 'LE', 'GE', 'EQ', 'NE', 'LT', 'GT')
+
+# Tipo de token do Lexer -> código
+_TYPE_CODES = {'EOF': 0, 'ID': 1, 'NUM': 2, 'DEF': 3, 'ELSE': 4, 'IF': 5, 'INT': 6, 'PRINT': 7, 'RETURN': 8, 'PLUS': 9, 'MINUS': 10, 'TIMES': 11, 'DIV': 12, 'EQUAL': 13, 'LPAREN': 14, 'RPAREN': 15, 'LBRACE': 16, 'RBRACE': 17, 'COMMA': 18, 'SEMI': 19, 'LE': 20, 'GE': 21, 'EQ': 22, 'NE': 23, 'LT': 24, 'GT': 25}
+
+_EOF = 0
+
+
+def _expected(term, c):
+    return Exception(f"Esperado '{term}', encontrado '{_NAMES[c]}'.")
+
+
+def _no_rule(nt, c):
+    return Exception(f"Erro sintático: não há regra ({nt}, {_NAMES[c]})")
+
+
+def parse(tokens):
+    """
+    Executa a análise sintática descendente recursiva.
+
+    Parâmetros:
+      tokens: Um TokenBuffer (lido pelos códigos em `kinds`), uma lista de
+        Tokens ou uma sequência de códigos inteiros.
+
+    Retorno:
+      bool: True se o parsing foi bem-sucedido.
+
+    Lança:
+      Exception: Em caso de Erro Sintático (mesmas mensagens de
+        lsi_parser.Parser).
+    """
+
+    k = getattr(tokens, "kinds", tokens)
+    if len(k) and not isinstance(k[0], int):
+        k = [_TYPE_CODES[tok.typ] for tok in k]
+    if not len(k) or k[-1] != _EOF:
+        k = list(k) + [_EOF]
+    return parse_codes(k)
+
+
+def parse_codes(k):
+    """
+    Analisa a sequência de códigos `k`, que deve terminar com o código de EOF.
+    """
+
+    try:
+        i = _MAIN(k, 0)
+    except RecursionError:
+        return _deep_fallback(k)
+    if k[i] != _EOF:
+        raise _expected("$", k[i])
+    return True
+
+
+def _deep_fallback(k):
+    """
+    Aninhamento mais profundo que o limite de recursão do Python: a mesma
+    análise (mesmo resultado e mesmas mensagens) pelo lsi_parser.Parser.
+    """
+
+    from array import array
+    from lsi_lexer import TokenBuffer
+    from lsi_parser import Parser
+
+    tokens = TokenBuffer("")
+    tokens.kinds = array("B", k)
+    return Parser().parse(tokens)
+
+
+_S0 = frozenset((1, 5, 6, 7, 8, 16, 19))
+_S1 = frozenset((1, 2, 14))
+_S2 = frozenset((1, 5, 6, 7, 8, 16, 17, 19))
+_S3 = frozenset((9, 10, 11, 12, 15, 18, 19, 20, 21, 22, 23, 24, 25))
+_S4 = frozenset((11, 12))
+_S5 = frozenset((9, 10, 15, 18, 19, 20, 21, 22, 23, 24, 25))
+_S6 = frozenset((9, 10))
+_S7 = frozenset((15, 18, 19, 20, 21, 22, 23, 24, 25))
+_S8 = frozenset((20, 21, 22, 23, 24, 25))
+_S9 = frozenset((15, 18, 19))
+
+
+def _MAIN(k, i):
+    """MAIN -> FLIST | epsilon"""
+    c = k[i]
+    if c == 3:
+        while True:
+            c = k[i]
+            if c == 3:
+                if k[i + 1] != 1:
+                    raise _expected('id', k[i + 1])
+                if k[i + 2] != 14:
+                    raise _expected('LPAREN', k[i + 2])
+                i += 3
+                c = k[i]
+                if c == 6:
+                    if k[i + 1] != 1:
+                        raise _expected('id', k[i + 1])
+                    i += 2
+                    while True:
+                        c = k[i]
+                        if c == 18:
+                            i += 1
+                            c = k[i]
+                            if c == 6:
+                                if k[i + 1] != 1:
+                                    raise _expected('id', k[i + 1])
+                                i += 2
+                            else:
+                                raise _no_rule('PARAM', c)
+                            continue
+                        elif c == 15:
+                            break
+                        raise _no_rule('PARLIST_TAIL', c)
+                elif c == 15:
+                    pass
+                else:
+                    raise _no_rule('PARLIST', c)
+                if k[i] != 15:
+                    raise _expected('RPAREN', k[i])
+                if k[i + 1] != 16:
+                    raise _expected('LBRACE', k[i + 1])
+                i += 2
+                i = _STMTLIST(k, i)
+                if k[i] != 17:
+                    raise _expected('RBRACE', k[i])
+                i += 1
+                continue
+            elif c == 0:
+                break
+            raise _no_rule('FLIST', c)
+        return i
+    elif c == 0:
+        return i
+    raise _no_rule('MAIN', c)
+
+
+def _STMTLIST(k, i):
+    """STMTLIST -> STMT STMTLIST | epsilon"""
+    while True:
+        c = k[i]
+        if c in _S0:
+            if c == 6:
+                i += 1
+                c = k[i]
+                if c == 1:
+                    i += 1
+                    while True:
+                        c = k[i]
+                        if c == 18:
+                            if k[i + 1] != 1:
+                                raise _expected('id', k[i + 1])
+                            i += 2
+                            continue
+                        elif c == 19:
+                            break
+                        raise _no_rule('VARLIST_TAIL', c)
+                else:
+                    raise _no_rule('VARLIST', c)
+                if k[i] != 19:
+                    raise _expected('SEMI', k[i])
+                i += 1
+            elif c == 1:
+                if k[i + 1] != 13:
+                    raise _expected('EQUAL', k[i + 1])
+                i += 2
+                i = _EXPR(k, i)
+                if k[i] != 19:
+                    raise _expected('SEMI', k[i])
+                i += 1
+            elif c == 7:
+                i += 1
+                i = _EXPR(k, i)
+                if k[i] != 19:
+                    raise _expected('SEMI', k[i])
+                i += 1
+            elif c == 8:
+                i += 1
+                c = k[i]
+                if c in _S1:
+                    i = _EXPR(k, i)
+                elif c == 19:
+                    pass
+                else:
+                    raise _no_rule('RETURN_TAIL', c)
+                if k[i] != 19:
+                    raise _expected('SEMI', k[i])
+                i += 1
+            elif c == 5:
+                if k[i + 1] != 14:
+                    raise _expected('LPAREN', k[i + 1])
+                i += 2
+                i = _EXPR(k, i)
+                if k[i] != 15:
+                    raise _expected('RPAREN', k[i])
+                if k[i + 1] != 16:
+                    raise _expected('LBRACE', k[i + 1])
+                i += 2
+                i = _STMTLIST(k, i)
+                if k[i] != 17:
+                    raise _expected('RBRACE', k[i])
+                i += 1
+                c = k[i]
+                if c == 4:
+                    if k[i + 1] != 16:
+                        raise _expected('LBRACE', k[i + 1])
+                    i += 2
+                    i = _STMTLIST(k, i)
+                    if k[i] != 17:
+                        raise _expected('RBRACE', k[i])
+                    i += 1
+                elif c in _S2:
+                    pass
+                else:
+                    raise _no_rule('IF_TAIL', c)
+            elif c == 16:
+                i += 1
+                i = _STMTLIST(k, i)
+                if k[i] != 17:
+                    raise _expected('RBRACE', k[i])
+                i += 1
+            elif c == 19:
+                i += 1
+            else:
+                raise _no_rule('STMT', c)
+            continue
+        elif c == 17:
+            return i
+        raise _no_rule('STMTLIST', c)
+
+
+def _EXPR(k, i):
+    """EXPR -> NUMEXPR EXPR_TAIL"""
+    c = k[i]
+    if c in _S1:
+        if c == 2:
+            i += 1
+        elif c == 1:
+            i += 1
+            c = k[i]
+            if c == 14:
+                i += 1
+                c = k[i]
+                if c in _S1:
+                    i = _EXPR(k, i)
+                    while True:
+                        c = k[i]
+                        if c == 18:
+                            i += 1
+                            i = _EXPR(k, i)
+                            continue
+                        elif c == 15:
+                            break
+                        raise _no_rule('PARLISTCALL_TAIL', c)
+                elif c == 15:
+                    pass
+                else:
+                    raise _no_rule('PARLISTCALL', c)
+                if k[i] != 15:
+                    raise _expected('RPAREN', k[i])
+                i += 1
+            elif c in _S3:
+                pass
+            else:
+                raise _no_rule('FACTOR_TAIL', c)
+        elif c == 14:
+            i += 1
+            i = _EXPR(k, i)
+            if k[i] != 15:
+                raise _expected('RPAREN', k[i])
+            i += 1
+        else:
+            raise _no_rule('FACTOR', c)
+        while True:
+            c = k[i]
+            if c in _S4:
+                i += 1
+                c = k[i]
+                if c == 2:
+                    i += 1
+                elif c == 1:
+                    i += 1
+                    c = k[i]
+                    if c == 14:
+                        i += 1
+                        c = k[i]
+                        if c in _S1:
+                            i = _EXPR(k, i)
+                            while True:
+                                c = k[i]
+                                if c == 18:
+                                    i += 1
+                                    i = _EXPR(k, i)
+                                    continue
+                                elif c == 15:
+                                    break
+                                raise _no_rule('PARLISTCALL_TAIL', c)
+                        elif c == 15:
+                            pass
+                        else:
+                            raise _no_rule('PARLISTCALL', c)
+                        if k[i] != 15:
+                            raise _expected('RPAREN', k[i])
+                        i += 1
+                    elif c in _S3:
+                        pass
+                    else:
+                        raise _no_rule('FACTOR_TAIL', c)
+                elif c == 14:
+                    i += 1
+                    i = _EXPR(k, i)
+                    if k[i] != 15:
+                        raise _expected('RPAREN', k[i])
+                    i += 1
+                else:
+                    raise _no_rule('FACTOR', c)
+                continue
+            elif c in _S5:
+                break
+            raise _no_rule('TERM_TAIL', c)
+        while True:
+            c = k[i]
+            if c in _S6:
+                i += 1
+                c = k[i]
+                if c in _S1:
+                    if c == 2:
+                        i += 1
+                    elif c == 1:
+                        i += 1
+                        c = k[i]
+                        if c == 14:
+                            i += 1
+                            c = k[i]
+                            if c in _S1:
+                                i = _EXPR(k, i)
+                                while True:
+                                    c = k[i]
+                                    if c == 18:
+                                        i += 1
+                                        i = _EXPR(k, i)
+                                        continue
+                                    elif c == 15:
+                                        break
+                                    raise _no_rule('PARLISTCALL_TAIL', c)
+                            elif c == 15:
+                                pass
+                            else:
+                                raise _no_rule('PARLISTCALL', c)
+                            if k[i] != 15:
+                                raise _expected('RPAREN', k[i])
+                            i += 1
+                        elif c in _S3:
+                            pass
+                        else:
+                            raise _no_rule('FACTOR_TAIL', c)
+                    elif c == 14:
+                        i += 1
+                        i = _EXPR(k, i)
+                        if k[i] != 15:
+                            raise _expected('RPAREN', k[i])
+                        i += 1
+                    else:
+                        raise _no_rule('FACTOR', c)
+                    while True:
+                        c = k[i]
+                        if c in _S4:
+                            i += 1
+                            c = k[i]
+                            if c == 2:
+                                i += 1
+                            elif c == 1:
+                                i += 1
+                                c = k[i]
+                                if c == 14:
+                                    i += 1
+                                    c = k[i]
+                                    if c in _S1:
+                                        i = _EXPR(k, i)
+                                        while True:
+                                            c = k[i]
+                                            if c == 18:
+                                                i += 1
+                                                i = _EXPR(k, i)
+                                                continue
+                                            elif c == 15:
+                                                break
+                                            raise _no_rule('PARLISTCALL_TAIL', c)
+                                    elif c == 15:
+                                        pass
+                                    else:
+                                        raise _no_rule('PARLISTCALL', c)
+                                    if k[i] != 15:
+                                        raise _expected('RPAREN', k[i])
+                                    i += 1
+                                elif c in _S3:
+                                    pass
+                                else:
+                                    raise _no_rule('FACTOR_TAIL', c)
+                            elif c == 14:
+                                i += 1
+                                i = _EXPR(k, i)
+                                if k[i] != 15:
+                                    raise _expected('RPAREN', k[i])
+                                i += 1
+                            else:
+                                raise _no_rule('FACTOR', c)
+                            continue
+                        elif c in _S5:
+                            break
+                        raise _no_rule('TERM_TAIL', c)
+                else:
+                    raise _no_rule('TERM', c)
+                continue
+            elif c in _S7:
+                break
+            raise _no_rule('NUMEXPR_TAIL', c)
+        while True:
+            c = k[i]
+            if c in _S8:
+                i += 1
+                c = k[i]
+                if c in _S1:
+                    if c == 2:
+                        i += 1
+                    elif c == 1:
+                        i += 1
+                        c = k[i]
+                        if c == 14:
+                            i += 1
+                            c = k[i]
+                            if c in _S1:
+                                i = _EXPR(k, i)
+                                while True:
+                                    c = k[i]
+                                    if c == 18:
+                                        i += 1
+                                        i = _EXPR(k, i)
+                                        continue
+                                    elif c == 15:
+                                        break
+                                    raise _no_rule('PARLISTCALL_TAIL', c)
+                            elif c == 15:
+                                pass
+                            else:
+                                raise _no_rule('PARLISTCALL', c)
+                            if k[i] != 15:
+                                raise _expected('RPAREN', k[i])
+                            i += 1
+                        elif c in _S3:
+                            pass
+                        else:
+                            raise _no_rule('FACTOR_TAIL', c)
+                    elif c == 14:
+                        i += 1
+                        i = _EXPR(k, i)
+                        if k[i] != 15:
+                            raise _expected('RPAREN', k[i])
+                        i += 1
+                    else:
+                        raise _no_rule('FACTOR', c)
+                    while True:
+                        c = k[i]
+                        if c in _S4:
+                            i += 1
+                            c = k[i]
+                            if c == 2:
+                                i += 1
+                            elif c == 1:
+                                i += 1
+                                c = k[i]
+                                if c == 14:
+                                    i += 1
+                                    c = k[i]
+                                    if c in _S1:
+                                        i = _EXPR(k, i)
+                                        while True:
+                                            c = k[i]
+                                            if c == 18:
+                                                i += 1
+                                                i = _EXPR(k, i)
+                                                continue
+                                            elif c == 15:
+                                                break
+                                            raise _no_rule('PARLISTCALL_TAIL', c)
+                                    elif c == 15:
+                                        pass
+                                    else:
+                                        raise _no_rule('PARLISTCALL', c)
+                                    if k[i] != 15:
+                                        raise _expected('RPAREN', k[i])
+                                    i += 1
+                                elif c in _S3:
+                                    pass
+                                else:
+                                    raise _no_rule('FACTOR_TAIL', c)
+                            elif c == 14:
+                                i += 1
+                                i = _EXPR(k, i)
+                                if k[i] != 15:
+                                    raise _expected('RPAREN', k[i])
+                                i += 1
+                            else:
+                                raise _no_rule('FACTOR', c)
+                            continue
+                        elif c in _S5:
+                            break
+                        raise _no_rule('TERM_TAIL', c)
+                    while True:
+                        c = k[i]
+                        if c in _S6:
+                            i += 1
+                            c = k[i]
+                            if c in _S1:
+                                if c == 2:
+                                    i += 1
+                                elif c == 1:
+                                    i += 1
+                                    c = k[i]
+                                    if c == 14:
+                                        i += 1
+                                        c = k[i]
+                                        if c in _S1:
+                                            i = _EXPR(k, i)
+                                            while True:
+                                                c = k[i]
+                                                if c == 18:
+                                                    i += 1
+                                                    i = _EXPR(k, i)
+                                                    continue
+                                                elif c == 15:
+                                                    break
+                                                raise _no_rule('PARLISTCALL_TAIL', c)
+                                        elif c == 15:
+                                            pass
+                                        else:
+                                            raise _no_rule('PARLISTCALL', c)
+                                        if k[i] != 15:
+                                            raise _expected('RPAREN', k[i])
+                                        i += 1
+                                    elif c in _S3:
+                                        pass
+                                    else:
+                                        raise _no_rule('FACTOR_TAIL', c)
+                                elif c == 14:
+                                    i += 1
+                                    i = _EXPR(k, i)
+                                    if k[i] != 15:
+                                        raise _expected('RPAREN', k[i])
+                                    i += 1
+                                else:
+                                    raise _no_rule('FACTOR', c)
+                                while True:
+                                    c = k[i]
+                                    if c in _S4:
+                                        i += 1
+                                        c = k[i]
+                                        if c == 2:
+                                            i += 1
+                                        elif c == 1:
+                                            i += 1
+                                            c = k[i]
+                                            if c == 14:
+                                                i += 1
+                                                c = k[i]
+                                                if c in _S1:
+                                                    i = _EXPR(k, i)
+                                                    while True:
+                                                        c = k[i]
+                                                        if c == 18:
+                                                            i += 1
+                                                            i = _EXPR(k, i)
+                                                            continue
+                                                        elif c == 15:
+                                                            break
+                                                        raise _no_rule('PARLISTCALL_TAIL', c)
+                                                elif c == 15:
+                                                    pass
+                                                else:
+                                                    raise _no_rule('PARLISTCALL', c)
+                                                if k[i] != 15:
+                                                    raise _expected('RPAREN', k[i])
+                                                i += 1
+                                            elif c in _S3:
+                                                pass
+                                            else:
+                                                raise _no_rule('FACTOR_TAIL', c)
+                                        elif c == 14:
+                                            i += 1
+                                            i = _EXPR(k, i)
+                                            if k[i] != 15:
+                                                raise _expected('RPAREN', k[i])
+                                            i += 1
+                                        else:
+                                            raise _no_rule('FACTOR', c)
+                                        continue
+                                    elif c in _S5:
+                                        break
+                                    raise _no_rule('TERM_TAIL', c)
+                            else:
+                                raise _no_rule('TERM', c)
+                            continue
+                        elif c in _S7:
+                            break
+                        raise _no_rule('NUMEXPR_TAIL', c)
+                else:
+                    raise _no_rule('NUMEXPR', c)
+                continue
+            elif c in _S9:
+                break
+            raise _no_rule('EXPR_TAIL', c)
+        return i
+    raise _no_rule('EXPR', c)
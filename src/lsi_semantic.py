@@ -0,0 +1,358 @@
+import sys
+from dataclasses import dataclass, field
+
+from lsi_ast import Assign, BinOp, Block, Call, If, Num, Print, Return, Var, VarDecl
+from lsi_lexer import gc_paused
+
+# =========================================
+# ANÁLISE SEMÂNTICA DA LINGUAGEM LSI
+# =========================================
+#
+# Verifica a AST produzida por Parser.parse_ast em uma única passada linear,
+# reportando todos os erros encontrados (e não apenas o primeiro):
+#   * variável usada ou atribuída sem declaração visível;
+#   * nome declarado duas vezes no mesmo escopo;
+#   * função definida duas vezes, chamada a função inexistente e chamada com
+#     número de argumentos diferente do tamanho da PARLIST da função.
+#
+# Escopos: o corpo de uma função (com os parâmetros), o corpo do `if`, o do
+# `else` e cada bloco `{}` abrem um escopo novo; uma declaração vale do ponto
+# em que aparece até o fim do seu bloco e pode sombrear a de um escopo
+# externo. (O interpretador é mais permissivo: lá o escopo de uma variável é
+# a função inteira.) Funções têm um espaço de nomes próprio e podem ser
+# chamadas antes da sua definição.
+#
+# Resolução de nomes em O(1): além da tabela hash de cada escopo (usada para
+# detectar redeclarações), um único dicionário guarda, para cada nome, a
+# pilha das suas declarações visíveis; o topo é a declaração mais interna.
+# Ao fechar um escopo, são desempilhados apenas os nomes declarados nele.
+# Assim cada nó é visitado uma vez e cada busca custa uma consulta ao
+# dicionário, independentemente da profundidade dos escopos e do número de
+# funções do programa. O percurso usa uma pilha explícita (sem recursão),
+# para suportar aninhamentos e expressões profundas, e o coletor cíclico
+# fica suspenso (gc_paused): as declarações e os diagnósticos não formam
+# ciclos, e as coletas sobre uma AST grande tornariam a análise quadrática.
+
+# Marcadores da pilha de percurso
+_ENTER = object()  # abre um escopo
+_EXIT = object()   # fecha o escopo mais interno
+
+
+@dataclass
+class SemanticDiagnostic:
+    """
+    Um erro semântico reportado por analyze.
+
+    Atributos:
+      line (int): Linha do nó onde o erro foi detectado.
+      col (int): Coluna do nó onde o erro foi detectado.
+      message (str): Descrição do erro.
+    """
+    line: int
+    col: int
+    message: str
+
+    def __str__(self):
+        return f"Linha {self.line}, coluna {self.col}: {self.message}"
+
+
+@dataclass
+class Symbol:
+    """
+    Uma declaração de variável ou parâmetro.
+
+    Atributos:
+      name (str): O nome declarado.
+      kind (str): "param" ou "var".
+      slot (int): Índice da declaração no quadro da função (0..n-1; os
+        parâmetros vêm primeiro). Declarações distintas com o mesmo nome
+        (sombreamento) recebem slots distintos.
+      line (int): Linha da declaração.
+      col (int): Coluna da declaração.
+      depth (int): Profundidade do escopo (0 = corpo da função).
+    """
+    name: str
+    kind: str
+    slot: int
+    line: int
+    col: int
+    depth: int
+
+
+@dataclass
+class FunctionInfo:
+    """
+    Resultado da análise de uma função.
+
+    Atributos:
+      name (str): O nome da função.
+      node (lsi_ast.FuncDef): O nó da definição.
+      n_params (int): Tamanho da PARLIST (aridade).
+      symbols (list): As declarações da função (Symbol), na ordem dos slots.
+    """
+    name: str
+    node: object
+    n_params: int
+    symbols: list = field(default_factory=list)
+
+
+@dataclass
+class SemanticResult:
+    """
+    Resultado de analyze.
+
+    Atributos:
+      functions (dict): Nome -> FunctionInfo (a primeira definição de cada
+        nome).
+      diagnostics (list): Os erros (SemanticDiagnostic), em ordem de posição.
+      bindings (dict): id(nó) -> Symbol, para cada Var e Assign resolvido.
+      calls (dict): id(nó) -> FunctionInfo, para cada Call resolvido.
+    """
+    functions: dict
+    diagnostics: list
+    bindings: dict
+    calls: dict
+
+    @property
+    def ok(self):
+        return not self.diagnostics
+
+
+class SemanticAnalyzer:
+    """
+    Analisador semântico com pilha de escopos (ver o comentário do módulo).
+
+    Parâmetros:
+      symbol_table (dict): Tabela de símbolos do lexer (opcional). Se
+        informada, a entrada de cada identificador recebe "decls" (lista de
+        (tipo, linha, coluna), com tipo "function", "param" ou "var") e
+        "refs" (quantidade de usos resolvidos).
+    """
+
+    def __init__(self, symbol_table=None):
+        self.symbol_table = symbol_table
+
+    def analyze(self, program):
+        """
+        Analisa `program` (lsi_ast.Program).
+
+        Retorno:
+          SemanticResult: Funções, erros e resolução dos nomes.
+        """
+
+        self.diagnostics = []
+        self.bindings = {}
+        self.calls = {}
+        self.functions = {}
+
+        for fdef in program.functions:
+            first = self.functions.get(fdef.name)
+            if first is not None:
+                self._error(fdef, f"função '{fdef.name}' já definida "
+                                  f"(linha {first.node.line}, coluna {first.node.col})")
+                continue
+            self.functions[fdef.name] = FunctionInfo(fdef.name, fdef, len(fdef.params))
+
+        with gc_paused():
+            for fdef in program.functions:
+                info = self.functions[fdef.name]
+                # uma redefinição é verificada com um FunctionInfo próprio,
+                # que não é chamável
+                if info.node is not fdef:
+                    info = FunctionInfo(fdef.name, fdef, len(fdef.params))
+                self._function(info)
+
+        self.diagnostics.sort(key=lambda d: (d.line, d.col))
+        if self.symbol_table is not None:
+            self._annotate()
+        return SemanticResult(self.functions, self.diagnostics, self.bindings, self.calls)
+
+    # -----------------------------------------
+    # Escopos
+    # -----------------------------------------
+    def _enter(self):
+        self._scopes.append({})
+
+    def _exit(self):
+        visible = self._visible
+        for name in self._scopes.pop():
+            stack = visible[name]
+            stack.pop()
+            if not stack:
+                del visible[name]
+
+    def _declare(self, ident, kind):
+        scope = self._scopes[-1]
+        name = ident.name
+        prev = scope.get(name)
+        if prev is not None:
+            self._error(ident, f"'{name}' já declarada neste escopo (linha {prev.line}, coluna {prev.col})")
+            return
+        symbols = self._info.symbols
+        sym = Symbol(name, kind, len(symbols), ident.line, ident.col, len(self._scopes) - 1)
+        symbols.append(sym)
+        scope[name] = sym
+        self._visible.setdefault(name, []).append(sym)
+
+    def _resolve(self, node):
+        stack = self._visible.get(node.name)
+        if stack is None:
+            self._error(node, f"variável '{node.name}' não declarada")
+            return
+        self.bindings[id(node)] = stack[-1]
+
+    def _error(self, node, message):
+        self.diagnostics.append(SemanticDiagnostic(node.line, node.col, message))
+
+    # -----------------------------------------
+    # Percurso
+    # -----------------------------------------
+    def _function(self, info):
+        self._info = info
+        self._scopes = []
+        self._visible = {}
+
+        self._enter()
+        for param in info.node.params:
+            self._declare(param, "param")
+
+        # pilha de percurso: nós e marcadores, visitados na ordem do código
+        work = list(reversed(info.node.body))
+        push = work.append
+        extend = work.extend
+        while work:
+            node = work.pop()
+            if node is _EXIT:
+                self._exit()
+            elif node is _ENTER:
+                self._enter()
+            elif isinstance(node, BinOp):
+                push(node.right)
+                push(node.left)
+            elif isinstance(node, Var):
+                self._resolve(node)
+            elif isinstance(node, Num):
+                pass
+            elif isinstance(node, Call):
+                self._call(node)
+                extend(reversed(node.args))
+            elif isinstance(node, VarDecl):
+                for ident in node.names:
+                    self._declare(ident, "var")
+            elif isinstance(node, Assign):
+                self._resolve(node)
+                push(node.value)
+            elif isinstance(node, (Print, Return)):
+                if node.value is not None:
+                    push(node.value)
+            elif isinstance(node, If):
+                if node.orelse is not None:
+                    push(_EXIT)
+                    extend(reversed(node.orelse))
+                    push(_ENTER)
+                push(_EXIT)
+                extend(reversed(node.body))
+                push(_ENTER)
+                push(node.cond)
+            elif isinstance(node, Block):
+                push(_EXIT)
+                extend(reversed(node.body))
+                push(_ENTER)
+            else:
+                self._error(node, f"nó não suportado: {type(node).__name__}")
+        self._exit()
+
+    def _call(self, node):
+        fn = self.functions.get(node.name)
+        if fn is None:
+            self._error(node, f"função '{node.name}' não definida")
+            return
+        self.calls[id(node)] = fn
+        if len(node.args) != fn.n_params:
+            self._error(node, f"'{node.name}' espera {fn.n_params} argumento(s), recebeu {len(node.args)}")
+
+    def _annotate(self):
+        symtab = self.symbol_table
+        for fn in self.functions.values():
+            symtab.setdefault(fn.name, {"kind": "id"}).setdefault("decls", []).append(
+                ("function", fn.node.line, fn.node.col))
+            for sym in fn.symbols:
+                symtab.setdefault(sym.name, {"kind": "id"}).setdefault("decls", []).append(
+                    (sym.kind, sym.line, sym.col))
+        for sym in self.bindings.values():
+            entry = symtab[sym.name]
+            entry["refs"] = entry.get("refs", 0) + 1
+        for fn in self.calls.values():
+            entry = symtab[fn.name]
+            entry["refs"] = entry.get("refs", 0) + 1
+
+
+def analyze(program, symbol_table=None):
+    """
+    Executa a análise semântica de `program` (ver SemanticAnalyzer).
+
+    Retorno:
+      SemanticResult: Funções, erros e resolução dos nomes.
+    """
+
+    return SemanticAnalyzer(symbol_table).analyze(program)
+
+
+def format_symbols(result):
+    """
+    Retorna a tabela de slots de cada função, uma declaração por linha.
+    """
+
+    lines = []
+    for fn in result.functions.values():
+        lines.append(f"{fn.name}/{fn.n_params}:")
+        for sym in fn.symbols:
+            lines.append(f"  [{sym.slot}] {sym.name:12} {sym.kind:5} "
+                         f"escopo {sym.depth}  linha {sym.line}, coluna {sym.col}")
+    return "\n".join(lines)
+
+
+# =========================================
+# MAIN
+# =========================================
+if __name__ == "__main__":
+    import argparse
+    from lsi_lexer import LexerError, RegexLexer
+    from lsi_parser import Parser
+
+    """
+    Analisa um programa LSI e imprime todos os erros semânticos encontrados.
+    """
+
+    ap = argparse.ArgumentParser(description="Análise semântica da linguagem LSI.")
+    ap.add_argument("file", help="arquivo .lsi de entrada")
+    ap.add_argument("--symbols", action="store_true", help="imprime a tabela de slots de cada função")
+    args = ap.parse_args()
+
+    with open(args.file) as f:
+        text = f.read()
+
+    try:
+        tokens, symtab = RegexLexer(text).tokenize_all(as_buffer=True)
+        program = Parser().parse_ast(tokens)
+    except LexerError as e:
+        print(f"\n=== ERRO LÉXICO ===")
+        print(e)
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n=== ERRO SINTÁTICO ===")
+        print(e)
+        sys.exit(1)
+
+    result = analyze(program, symtab)
+    if args.symbols:
+        print(format_symbols(result))
+        print()
+    if result.ok:
+        print(f"Nenhum erro semântico ({len(result.functions)} função(ões), "
+              f"{len(result.bindings) + len(result.calls)} referência(s) resolvida(s)).")
+        sys.exit(0)
+    print(f"=== ERROS SEMÂNTICOS ({len(result.diagnostics)}) ===")
+    for d in result.diagnostics:
+        print(d)
+    sys.exit(1)
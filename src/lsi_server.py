@@ -0,0 +1,305 @@
+import argparse
+import asyncio
+import errno
+import hashlib
+import io
+import json
+import os
+import signal
+import socket
+import sys
+from collections import OrderedDict
+
+from lsi_client import default_socket_path, request
+from lsi_parser import Parser, cli_arg_parser, parse_cli_args, run_cli
+
+# =========================================
+# SERVIDOR RESIDENTE DE ANÁLISE
+# =========================================
+#
+# Cada execução de run.sh inicia um interpretador, importa os módulos e
+# carrega as tabelas LL(1). O servidor faz isso uma única vez e atende os
+# clientes (lsi_client.py) por um socket Unix local, com o protocolo JSON
+# descrito em lsi_client. Os resultados são guardados em um cache LRU,
+# limitado em bytes, pela chave (hash do conteúdo do arquivo, opções).
+#
+# As requisições são atendidas pelo asyncio; a análise de cada arquivo roda
+# em uma thread do executor padrão, para que o laço de eventos continue
+# aceitando conexões durante uma análise longa.
+
+DEFAULT_CACHE_BYTES = 64 * 2**20
+
+
+class ResultCache:
+    """
+    Cache LRU de resultados da linha de comando, limitado pelo tamanho total
+    das saídas guardadas.
+
+    Parâmetros:
+      max_bytes (int): Tamanho máximo (soma das saídas guardadas).
+    """
+
+    MISSING = object()
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lookup(self, key):
+        """
+        Retorna o valor guardado para `key` (tornando-o o mais recente) ou
+        ResultCache.MISSING.
+        """
+
+        value = self._entries.get(key, self.MISSING)
+        if value is self.MISSING:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return value
+
+    def store(self, key, status, output):
+        """
+        Guarda o resultado (código de saída, saída) de `key`, descartando os
+        menos usados recentemente até respeitar o limite. Uma saída maior que
+        o limite não é guardada.
+        """
+
+        size = len(output)
+        if size > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes -= len(old[1])
+        self._entries[key] = (status, output)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.bytes -= len(evicted)
+
+    def stats(self):
+        """Retorna os contadores do cache (resposta de {"op": "stats"})."""
+        return {"hits": self.hits, "misses": self.misses,
+                "entries": len(self._entries), "bytes": self.bytes}
+
+
+class _ArgvExit(Exception):
+    def __init__(self, status):
+        super().__init__(status)
+        self.status = status
+
+
+class _CapturingArgumentParser(argparse.ArgumentParser):
+    """
+    ArgumentParser que guarda as mensagens (ajuda, uso e erros) em vez de
+    escrevê-las, e lança _ArgvExit em vez de encerrar o processo.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, prog="lsi_parser.py", **kwargs)
+        self.stdout = io.StringIO()
+        self.stderr = io.StringIO()
+
+    def _print_message(self, message, file=None):
+        if message:
+            (self.stderr if file is sys.stderr else self.stdout).write(message)
+
+    def exit(self, status=0, message=None):
+        if message:
+            self.stderr.write(message)
+        raise _ArgvExit(status)
+
+
+def _read_source(path):
+    # analisado em bytes pelo BytesLexer, como na linha de comando
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _socket_in_use(path):
+    # há um processo aceitando conexões em `path`?
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(path)
+        except OSError:
+            return False
+    return True
+
+
+def _run(args, data):
+    out = io.StringIO()
+    status = run_cli(args, data, out)
+    return status, out.getvalue()
+
+
+class ParseServer:
+    """
+    Servidor de análise léxica e sintática em um socket Unix.
+
+    Parâmetros:
+      path (str): O caminho do socket.
+      cache_bytes (int): O limite do cache de resultados.
+    """
+
+    def __init__(self, path, cache_bytes=DEFAULT_CACHE_BYTES):
+        self.path = path
+        self.cache = ResultCache(cache_bytes)
+        self._server = None
+        self._stopped = None
+
+    async def handle_run(self, argv, cwd):
+        """
+        Executa a linha de comando de lsi_parser.py para `argv` (relativo ao
+        diretório `cwd` do cliente).
+
+        A leitura do arquivo e a análise rodam no executor; o cache só é
+        acessado pela thread do laço de eventos.
+
+        Retorno:
+          dict: {"status", "stdout", "stderr", "cached"}
+        """
+
+        ap = cli_arg_parser(_CapturingArgumentParser)
+        try:
+            args = parse_cli_args(ap, argv)
+        except _ArgvExit as e:
+            return {"status": e.status, "stdout": ap.stdout.getvalue(),
+                    "stderr": ap.stderr.getvalue(), "cached": False}
+
+        loop = asyncio.get_running_loop()
+        path = args.file = os.path.join(cwd, args.file)
+        if args.trace_file:
+            args.trace_file = os.path.join(cwd, args.trace_file)
+        if args.profile_json:
+            args.profile_json = os.path.join(cwd, args.profile_json)
+        try:
+            data = await loop.run_in_executor(None, _read_source, path)
+        except OSError as e:
+            return {"status": 1, "stdout": "", "stderr": f"{e}\n", "cached": False}
+
+        # --trace-file, --profile-json e --artifact (<arquivo>.lsia) escrevem
+        # arquivos, e o perfil mede tempos desta execução: nenhum deles pode
+        # vir do cache
+        key = None
+        if not (args.trace_file or args.profile or args.profile_json or args.artifact):
+            key = (hashlib.sha256(data).digest(), args.trace, args.quiet, args.ast, args.recover)
+            hit = self.cache.lookup(key)
+            if hit is not ResultCache.MISSING:
+                status, output = hit
+                return {"status": status, "stdout": output, "stderr": "", "cached": True}
+
+        try:
+            status, output = await loop.run_in_executor(None, _run, args, data)
+        except UnicodeDecodeError as e:
+            return {"status": 1, "stdout": "", "stderr": f"{e}\n", "cached": False}
+        if key is not None:
+            self.cache.store(key, status, output)
+        return {"status": status, "stdout": output, "stderr": "", "cached": False}
+
+    async def _dispatch(self, message):
+        op = message.get("op")
+        if op == "run":
+            return await self.handle_run(list(message["argv"]), message.get("cwd") or os.getcwd())
+        if op == "stats":
+            return self.cache.stats()
+        if op == "shutdown":
+            self._stopped.set()
+            return {"ok": True}
+        return {"error": f"operação desconhecida: {op!r}"}
+
+    async def _client(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                    reply = await self._dispatch(message)
+                except (ValueError, KeyError, TypeError) as e:
+                    reply = {"error": f"requisição inválida: {e}"}
+                writer.write(json.dumps(reply, ensure_ascii=False).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            # cliente desconectado, ou conexão ainda aberta no encerramento
+            # (asyncio.run cancela as tarefas pendentes)
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self):
+        """
+        Atende os clientes até receber {"op": "shutdown"}, SIGINT ou SIGTERM.
+
+        Um socket deixado em `path` por um servidor que terminou sem removê-lo
+        é substituído; um que ainda aceita conexões, não.
+
+        Lança:
+          OSError: (EADDRINUSE) Se já houver um servidor ativo em `path`.
+        """
+
+        if os.path.exists(self.path):
+            if _socket_in_use(self.path):
+                raise OSError(errno.EADDRINUSE, "já há um servidor ativo neste socket", self.path)
+            os.unlink(self.path)
+
+        # carrega as tabelas LL(1) antes de aceitar conexões
+        Parser()
+
+        self._stopped = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, self._stopped.set)
+
+        self._server = await asyncio.start_unix_server(self._client, path=self.path)
+        try:
+            await self._stopped.wait()
+        finally:
+            self._server.close()
+            await self._server.wait_closed()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+
+# =========================================
+# MAIN
+# =========================================
+if __name__ == "__main__":
+
+    """
+    Inicia o servidor em primeiro plano; --stats e --stop falam com um
+    servidor já ativo.
+    """
+
+    ap = argparse.ArgumentParser(description="Servidor residente de análise LSI (socket Unix).")
+    ap.add_argument("--socket", default=None, help="caminho do socket (padrão: $LSI_SOCKET ou um arquivo temporário)")
+    ap.add_argument("--cache-mb", type=float, default=DEFAULT_CACHE_BYTES / 2**20,
+                    help="limite do cache de resultados, em MB")
+    action = ap.add_mutually_exclusive_group()
+    action.add_argument("--stats", action="store_true", help="exibe os contadores do cache do servidor ativo")
+    action.add_argument("--stop", action="store_true", help="encerra o servidor ativo")
+    args = ap.parse_args()
+
+    path = args.socket or default_socket_path()
+    if args.stats or args.stop:
+        try:
+            reply = request({"op": "stats" if args.stats else "shutdown"}, path)
+        except OSError as e:
+            print(f"nenhum servidor em {path}: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(json.dumps(reply))
+        sys.exit(0)
+
+    print(f"servidor LSI em {path}", file=sys.stderr)
+    try:
+        asyncio.run(ParseServer(path, int(args.cache_mb * 2**20)).serve())
+    except OSError as e:
+        print(f"lsi_server: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,305 @@
+import os
+import re
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from operator import add
+
+from lsi_lexer import KEYWORDS, LexerError, RegexLexer, TokenBuffer
+from lsi_parser import Parser
+
+# =========================================
+# ANÁLISE PARALELA DE UM ÚNICO ARQUIVO
+# =========================================
+#
+# Pela gramática (MAIN -> FLIST, FLIST -> FDEF FLIST | ε), as funções de
+# nível superior são unidades independentes: um `def` fora de comentários e
+# com profundidade de chaves 0 começa um FDEF em qualquer programa válido, e o
+# parser chega a ele sempre no mesmo estado (FLIST no topo). O arquivo é
+# dividido nesses pontos em pedaços de tamanho parecido, e cada pedaço é
+# analisado (léxico + Parser.parse) em um processo separado.
+#
+# Cada processo recebe o texto do pedaço a partir do início da linha onde ele
+# começa e inicia o RegexLexer na posição, linha e coluna globais do `def`;
+# assim os tokens e os erros léxicos já saem com a numeração do arquivo
+# inteiro (os deslocamentos dos tokens também são corrigidos no processo). O
+# coordenador apenas concatena os TokenBuffers e junta as tabelas de símbolos
+# (na ordem dos pedaços, que é a ordem da primeira ocorrência) e os
+# resultados:
+#   * erro léxico: o do primeiro pedaço com erro, que é o mesmo da análise
+#     sequencial (a varredura não depende do que vem antes de um `def`);
+#   * sem erro sintático em nenhum pedaço: o programa inteiro é válido;
+#   * senão: os pedaços anteriores ao primeiro com erro são válidos, e
+#     Parser.parse_recover é executado a partir dele até o fim do arquivo,
+#     produzindo exatamente os diagnósticos da análise sequencial.
+
+# Tamanho mínimo de um pedaço: abaixo disso, a comunicação entre processos
+# custa mais do que a análise
+MIN_PIECE_CHARS = 256 * 1024
+
+# Pedaços por processo (equilíbrio de carga entre pedaços de custo desigual)
+PIECES_PER_JOB = 4
+
+# (o caractere anterior é verificado à parte: um lookbehind no início do
+# padrão impediria a busca rápida pelo literal "def")
+_DEF_PATTERN = re.compile(r"def(?!\w)")
+_COMMENT_PATTERN = re.compile(r"//[^\n]*")
+
+# Parser do processo de trabalho (criado por _init_worker)
+_PARSER = None
+
+
+def _brace_delta(text, start, end):
+    """
+    Retorna (abre - fecha) chaves de text[start:end], fora de comentários.
+    """
+
+    delta = text.count("{", start, end) - text.count("}", start, end)
+    if text.find("//", start, end) != -1:
+        for m in _COMMENT_PATTERN.finditer(text, start, end):
+            comment = m.group()
+            delta -= comment.count("{") - comment.count("}")
+    return delta
+
+
+def split_points(text):
+    """
+    Encontra os `def` de nível superior de `text`: fora de comentários `//`
+    e com profundidade de chaves 0.
+
+    Apenas os candidatos (a palavra `def`) são visitados em Python; as chaves
+    entre dois candidatos são contadas com str.count, e os comentários só são
+    percorridos nos trechos que contêm `//`.
+
+    Retorno:
+      list: Os deslocamentos dos `def`, em ordem.
+    """
+
+    points = []
+    depth = 0
+    prev = 0
+    for m in _DEF_PATTERN.finditer(text):
+        pos = m.start()
+        if pos and (text[pos - 1].isalnum() or text[pos - 1] == "_"):
+            continue
+        # um `//` antes, na mesma linha, faz do `def` parte de um comentário
+        if text.find("//", text.rfind("\n", 0, pos) + 1, pos) != -1:
+            continue
+        depth += _brace_delta(text, prev, pos)
+        prev = pos
+        if depth == 0:
+            points.append(pos)
+    return points
+
+
+def plan_pieces(text, points, n_pieces):
+    """
+    Escolhe até `n_pieces` pedaços de tamanho parecido, começando em
+    pontos de `points` (o primeiro pedaço começa sempre em 0).
+
+    Retorno:
+      list: Os deslocamentos iniciais dos pedaços.
+    """
+
+    starts = [0]
+    size = len(text)
+    for k in range(1, n_pieces):
+        i = bisect_left(points, size * k // n_pieces)
+        if i < len(points) and points[i] > starts[-1]:
+            starts.append(points[i])
+    return starts
+
+
+def _init_worker():
+    global _PARSER
+    _PARSER = Parser()
+
+
+def _analyze_piece(task):
+    """
+    Analisa um pedaço no processo de trabalho.
+
+    Parâmetros:
+      task (tuple): (texto a partir do início da linha do pedaço, posição do
+        pedaço nesse texto, linha global, coluna global, deslocamento do
+        texto no arquivo).
+
+    Retorno:
+      tuple: ("lexical_error", mensagem, linha, coluna) ou ("ok" |
+        "syntax_error", arrays do TokenBuffer (com o EOF), identificadores
+        novos, na ordem).
+    """
+
+    global _PARSER
+    if _PARSER is None:
+        _init_worker()
+
+    text, pos, line, col, base = task
+    lexer = RegexLexer(text)
+    lexer.i, lexer.line, lexer.col = pos, line, col
+    try:
+        tokens, symtab = lexer.tokenize_all(as_buffer=True)
+    except LexerError as e:
+        return ("lexical_error", str(e), e.line, e.col)
+
+    try:
+        _PARSER.parse(tokens)
+        status = "ok"
+    except Exception:
+        status = "syntax_error"
+
+    ids = [lex for lex, entry in symtab.items() if entry["kind"] == "id"]
+    starts, ends = tokens.starts, tokens.ends
+    if base:
+        starts = array("I", map(add, starts, repeat(base)))
+        ends = array("I", map(add, ends, repeat(base)))
+    arrays = (tokens.kinds, starts, ends, tokens.lines, tokens.cols)
+    return (status, arrays, ids)
+
+
+def _tasks(text, starts):
+    # (texto desde o início da linha, posição, linha, coluna, deslocamento)
+    # de cada pedaço
+    line = 1
+    prev = 0
+    for k, start in enumerate(starts):
+        end = starts[k + 1] if k + 1 < len(starts) else len(text)
+        line += text.count("\n", prev, start)
+        prev = start
+        line_start = text.rfind("\n", 0, start) + 1
+        yield text[line_start:end], start - line_start, line, start - line_start + 1, line_start
+
+
+def _slice(tokens, first):
+    # TokenBuffer com os tokens de `tokens` a partir do índice `first`
+    sub = TokenBuffer(tokens.text)
+    for f in ("kinds", "starts", "ends", "lines", "cols"):
+        getattr(sub, f).extend(getattr(tokens, f)[first:])
+    return sub
+
+
+def parse_parallel(text, jobs=None, pieces=None, parser=None):
+    """
+    Análise léxica e sintática de `text` dividida em pedaços analisados em
+    paralelo (ver o comentário do módulo).
+
+    O resultado é o mesmo de
+        tokens, symtab = RegexLexer(text).tokenize_all(as_buffer=True)
+        diagnostics = Parser().parse_recover(tokens)
+
+    Parâmetros:
+      text (str): O código-fonte.
+      jobs (int): Número de processos (padrão: os.cpu_count()). Com jobs=1,
+        os pedaços são analisados no processo atual.
+      pieces (int): Número de pedaços (padrão: PIECES_PER_JOB por processo,
+        com no mínimo MIN_PIECE_CHARS caracteres cada; um único pedaço com
+        jobs=1).
+      parser (Parser): Usado no processo atual (padrão: um novo Parser).
+
+    Retorno:
+      tuple: (TokenBuffer, dict Tabela de Símbolos, list de SyntaxDiagnostic)
+
+    Lança:
+      LexerError: O primeiro erro léxico do arquivo.
+    """
+
+    jobs = jobs or os.cpu_count() or 1
+    if pieces is None:
+        pieces = 1 if jobs == 1 else max(1, min(jobs * PIECES_PER_JOB, len(text) // MIN_PIECE_CHARS))
+    starts = plan_pieces(text, split_points(text), pieces) if pieces > 1 else [0]
+    tasks = _tasks(text, starts)
+
+    if jobs == 1 or len(starts) == 1:
+        results = map(_analyze_piece, tasks)
+        return _merge(text, results, parser)
+    with ProcessPoolExecutor(max_workers=min(jobs, len(starts)), initializer=_init_worker) as pool:
+        return _merge(text, pool.map(_analyze_piece, tasks), parser)
+
+
+def _merge(text, results, parser):
+    """
+    Junta os resultados dos pedaços, em ordem (ver parse_parallel).
+    """
+
+    tokens = TokenBuffer(text)
+    symtab = {kw: {"kind": "keyword"} for kw in KEYWORDS}
+    failed = None  # índice do primeiro token do primeiro pedaço com erro
+
+    for result in results:
+        if result[0] == "lexical_error":
+            _, message, line, col = result
+            raise LexerError(message, line, col)
+        status, arrays, ids = result
+
+        # o EOF de cada pedaço é descartado (só o do último fica no buffer)
+        if len(tokens):
+            for f in ("kinds", "starts", "ends", "lines", "cols"):
+                getattr(tokens, f).pop()
+        if status == "syntax_error" and failed is None:
+            failed = len(tokens)
+        for f, values in zip(("kinds", "starts", "ends", "lines", "cols"), arrays):
+            getattr(tokens, f).extend(values)
+
+        for lex in ids:
+            if lex not in symtab:
+                symtab[lex] = {"kind": "id"}
+
+    diagnostics = []
+    if failed is not None:
+        parser = parser or Parser()
+        diagnostics = parser.parse_recover(_slice(tokens, failed) if failed else tokens)
+    return tokens, symtab, diagnostics
+
+
+# =========================================
+# MAIN
+# =========================================
+if __name__ == "__main__":
+    import argparse
+
+    """
+    Analisa um arquivo grande em paralelo, com a mesma saída de lsi_parser.py
+    (o tempo e a vazão vão para stderr).
+    """
+
+    ap = argparse.ArgumentParser(description="Análise léxica e sintática paralela de um único arquivo .lsi.")
+    ap.add_argument("file", help="arquivo .lsi de entrada")
+    ap.add_argument("-j", "--jobs", type=int, default=None,
+                    help="número de processos (padrão: número de CPUs)")
+    ap.add_argument("--pieces", type=int, default=None,
+                    help=f"número de pedaços (padrão: {PIECES_PER_JOB} por processo)")
+    ap.add_argument("--recover", action="store_true",
+                    help="reporta todos os erros sintáticos")
+    ap.add_argument("--quiet", action="store_true",
+                    help="não imprime nada em caso de sucesso")
+    args = ap.parse_args()
+
+    with open(args.file) as f:
+        text = f.read()
+
+    t0 = time.perf_counter()
+    try:
+        tokens, symtab, diagnostics = parse_parallel(text, args.jobs, args.pieces)
+    except LexerError as e:
+        print(f"\n=== ERRO LÉXICO ===")
+        print(e)
+        sys.exit(1)
+    elapsed = time.perf_counter() - t0
+
+    if diagnostics and args.recover:
+        print(f"\n=== ERROS SINTÁTICOS ({len(diagnostics)}) ===")
+        for d in diagnostics:
+            print(d)
+    elif diagnostics:
+        print(f"\n=== ERRO SINTÁTICO ===")
+        print(diagnostics[0].message)
+    elif not args.quiet:
+        print("Parse OK.")
+
+    mb = len(text) / 2**20
+    print(f"{mb:.1f} MB, {len(tokens)} tokens em {elapsed:.2f} s ({mb / elapsed if elapsed else 0.0:.2f} MB/s)",
+          file=sys.stderr)
+    sys.exit(1 if diagnostics else 0)
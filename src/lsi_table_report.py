@@ -0,0 +1,198 @@
+import csv
+import json
+import sys
+
+from lsi_parser import EPS, GRAMMAR, build_table, compute_first, compute_follow
+
+# =========================================
+# DIAGNÓSTICO DA TABELA LL(1)
+# =========================================
+#
+# Ferramentas para validar uma alteração da gramática antes que ela chegue ao
+# Parser: conflitos LL(1) (ver build_table), estatísticas da tabela, símbolos
+# inalcançáveis ou improdutivos e exportação da tabela como matriz compacta.
+
+
+def grammar_terminals(grammar=GRAMMAR):
+    """
+    Retorna os terminais usados em `grammar` (todo símbolo que não é
+    Não-Terminal nem EPS), mais '$', em ordem alfabética.
+    """
+
+    terms = {"$"}
+    for prods in grammar.values():
+        for prod in prods:
+            terms.update(X for X in prod if X != EPS and X not in grammar)
+    return sorted(terms)
+
+
+def unreachable_symbols(grammar=GRAMMAR, start="MAIN"):
+    """
+    Retorna os Não-Terminais que não podem ser alcançados a partir de `start`.
+    """
+
+    reached = {start}
+    work = [start]
+    while work:
+        A = work.pop()
+        for prod in grammar[A]:
+            for X in prod:
+                if X in grammar and X not in reached:
+                    reached.add(X)
+                    work.append(X)
+    return [A for A in grammar if A not in reached]
+
+
+def unproductive_symbols(grammar=GRAMMAR):
+    """
+    Retorna os Não-Terminais improdutivos: que não derivam nenhuma sequência
+    só de terminais (ex: A -> a A, sem outra produção).
+    """
+
+    productive = set()
+    changed = True
+    while changed:
+        changed = False
+        for A, prods in grammar.items():
+            if A in productive:
+                continue
+            if any(all(X not in grammar or X in productive for X in prod) for prod in prods):
+                productive.add(A)
+                changed = True
+    return [A for A in grammar if A not in productive]
+
+
+def table_matrix(table, grammar=GRAMMAR):
+    """
+    Converte a tabela em uma matriz compacta.
+
+    Retorno:
+      tuple: (nonterminals, terminals, matrix), onde matrix[i][j] é o índice
+        da produção de nonterminals[i] (em grammar) para terminals[j], ou -1
+        para uma célula de erro.
+    """
+
+    nonterminals = list(grammar)
+    terminals = grammar_terminals(grammar)
+    col = {t: j for j, t in enumerate(terminals)}
+    row = {A: i for i, A in enumerate(nonterminals)}
+
+    matrix = [[-1] * len(terminals) for _ in nonterminals]
+    for (A, t), prod in table.items():
+        index = next(k for k, p in enumerate(grammar[A]) if p is prod)
+        matrix[row[A]][col[t]] = index
+    return nonterminals, terminals, matrix
+
+
+def table_stats(table, grammar=GRAMMAR, start="MAIN"):
+    """
+    Calcula estatísticas da tabela LL(1).
+
+    Retorno:
+      dict: "nonterminals", "terminals", "productions", "cells" (total de
+        células), "filled" (células com regra), "fill_ratio", "branching"
+        ({A: (nº de produções, nº de células preenchidas)}), "unreachable" e
+        "unproductive".
+    """
+
+    terminals = grammar_terminals(grammar)
+    cells = len(grammar) * len(terminals)
+    filled_by = {A: 0 for A in grammar}
+    for A, _ in table:
+        filled_by[A] += 1
+
+    branching = {A: (len(prods), filled_by[A]) for A, prods in grammar.items()}
+    return {
+        "nonterminals": len(grammar),
+        "terminals": len(terminals),
+        "productions": sum(len(prods) for prods in grammar.values()),
+        "cells": cells,
+        "filled": len(table),
+        "fill_ratio": len(table) / cells if cells else 0.0,
+        "branching": branching,
+        "unreachable": unreachable_symbols(grammar, start),
+        "unproductive": unproductive_symbols(grammar),
+    }
+
+
+def export_csv(table, stream, grammar=GRAMMAR):
+    """
+    Grava a tabela em `stream` como CSV: uma linha por Não-Terminal, uma
+    coluna por terminal, com o índice da produção (vazio = erro).
+    """
+
+    nonterminals, terminals, matrix = table_matrix(table, grammar)
+    writer = csv.writer(stream)
+    writer.writerow([""] + terminals)
+    for A, row in zip(nonterminals, matrix):
+        writer.writerow([A] + ["" if k < 0 else k for k in row])
+
+
+def export_json(table, stream, grammar=GRAMMAR):
+    """
+    Grava a tabela em `stream` como JSON: listas de Não-Terminais e
+    terminais, as produções de cada Não-Terminal e a matriz de índices
+    (-1 = erro).
+    """
+
+    nonterminals, terminals, matrix = table_matrix(table, grammar)
+    json.dump({
+        "nonterminals": nonterminals,
+        "terminals": terminals,
+        "productions": {A: [" ".join(p) for p in grammar[A]] for A in nonterminals},
+        "matrix": matrix,
+    }, stream, separators=(",", ":"))
+
+
+def format_report(conflicts, stats):
+    """
+    Retorna o relatório textual de conflitos e estatísticas.
+    """
+
+    lines = [f"Conflitos LL(1): {len(conflicts)}"]
+    lines.extend(f"  {c}" for c in conflicts)
+    lines.append(
+        f"Tabela: {stats['nonterminals']} Não-Terminais x {stats['terminals']} terminais, "
+        f"{stats['filled']}/{stats['cells']} células preenchidas ({stats['fill_ratio']:.1%})"
+    )
+    lines.append(f"Produções: {stats['productions']}")
+    lines.append("Ramificação (produções / células) por Não-Terminal:")
+    for A, (n_prods, n_cells) in stats["branching"].items():
+        lines.append(f"  {A:18} {n_prods:3d} {n_cells:4d}")
+    lines.append("Inalcançáveis: " + (", ".join(stats["unreachable"]) or "nenhum"))
+    lines.append("Improdutivos: " + (", ".join(stats["unproductive"]) or "nenhum"))
+    return "\n".join(lines)
+
+
+# =========================================
+# MAIN
+# =========================================
+if __name__ == "__main__":
+    import argparse
+
+    """
+    Verifica a GRAMMAR do lsi_parser: imprime conflitos LL(1) e estatísticas
+    da tabela e, opcionalmente, exporta a tabela (--csv / --json). O código
+    de saída é 1 se houver conflitos.
+    """
+
+    ap = argparse.ArgumentParser(description="Diagnóstico da Tabela LL(1) da linguagem LSI.")
+    ap.add_argument("--csv", metavar="ARQUIVO", help="exporta a tabela como CSV")
+    ap.add_argument("--json", metavar="ARQUIVO", help="exporta a tabela como JSON")
+    args = ap.parse_args()
+
+    FIRST = compute_first()
+    FOLLOW = compute_follow(FIRST)
+    conflicts = []
+    table = build_table(FIRST, FOLLOW, conflicts=conflicts)
+
+    print(format_report(conflicts, table_stats(table)))
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            export_csv(table, f)
+    if args.json:
+        with open(args.json, "w") as f:
+            export_json(table, f)
+
+    sys.exit(1 if conflicts else 0)
@@ -0,0 +1,644 @@
+import sys
+from array import array
+
+from lsi_ast import Assign, BinOp, Block, Call, If, Num, Print, Return, Var, VarDecl
+from lsi_interp import (
+    DEFAULT_ENTRY, DEFAULT_MEMO_SIZE, BufferedOutput, InterpreterError, MemoCache, _div,
+    function_slots, load_program, pure_functions, resolve_slot,
+)
+
+# =========================================
+# COMPILADOR DE BYTECODE E MÁQUINA VIRTUAL DA LINGUAGEM LSI
+# =========================================
+#
+# O programa (AST de Parser.parse_ast) é compilado para um único array('i')
+# de instruções, um pool de constantes e uma tabela de funções (endereço de
+# entrada, parâmetros e quantidade de slots locais). A VM é uma máquina de
+# pilha: os slots locais de cada chamada ficam na própria pilha de valores, a
+# partir do ponteiro de base `bp`, e as chamadas LSI não usam a pilha do
+# Python (não há limite de recursão além da memória).
+#
+# A semântica é a mesma do lsi_interp (ver docs/README_INTERP.md).
+
+# =========================================
+# OPCODES
+# =========================================
+# Instruções com operandos ocupam 1 + n posições do array. Os valores aparecem
+# como literais no laço de execute() (mais rápido que consultar as globais):
+# ao alterá-los, atualize-o também e a verificação logo abaixo da lista.
+LOAD = 0           # LOAD s: empilha o slot s
+CONST = 1          # CONST k: empilha consts[k]
+STORE = 2          # STORE s: desempilha no slot s
+CLEAR = 3          # CLEAR s: slot s = 0 (declaração)
+ADD = 4
+SUB = 5
+MUL = 6
+DIV = 7
+LT = 8
+LE = 9
+GT = 10
+GE = 11
+EQ = 12
+NE = 13
+JUMP = 14          # JUMP t
+JUMP_IF_FALSE = 15  # JUMP_IF_FALSE t: desempilha; salta se == 0
+CALL = 16          # CALL f: chama functions[f] com os argumentos da pilha
+RET = 17           # RET: devolve o topo da pilha
+RET0 = 18          # RET0: devolve 0
+PRINT = 19         # PRINT: desempilha e imprime
+# Superinstruções (geradas pelo compilador para padrões frequentes)
+LOAD_CONST_ADD = 20   # LOAD_CONST_ADD s k: empilha slot s + consts[k]
+LOAD_CONST_SUB = 21   # LOAD_CONST_SUB s k: empilha slot s - consts[k]
+JUMP_IF_NOT_LT = 22   # JUMP_IF_NOT_<cmp> t: desempilha b, a; salta se não (a cmp b)
+JUMP_IF_NOT_LE = 23
+JUMP_IF_NOT_GT = 24
+JUMP_IF_NOT_GE = 25
+JUMP_IF_NOT_EQ = 26
+JUMP_IF_NOT_NE = 27
+JUMP_IF_NOT_LT_SK = 28  # JUMP_IF_NOT_<cmp>_SK s k t: salta se não (slot s cmp consts[k])
+JUMP_IF_NOT_LE_SK = 29
+JUMP_IF_NOT_GT_SK = 30
+JUMP_IF_NOT_GE_SK = 31
+JUMP_IF_NOT_EQ_SK = 32
+JUMP_IF_NOT_NE_SK = 33
+RET_SLOT = 34         # RET_SLOT s: devolve o slot s
+# Memoização (ver execute)
+CALL_PURE = 35        # CALL_PURE f: como CALL, para uma função pura
+MEMO_STORE = 36       # MEMO_STORE: grava o retorno de uma CALL_PURE no cache
+
+# Os literais de execute() (inclusive os intervalos ADD..NE, JUMP_IF_NOT_<cmp>
+# e JUMP_IF_NOT_<cmp>_SK) supõem exatamente esta numeração
+assert (
+    LOAD, CONST, STORE, CLEAR, ADD, SUB, MUL, DIV, LT, LE, GT, GE, EQ, NE,
+    JUMP, JUMP_IF_FALSE, CALL, RET, RET0, PRINT, LOAD_CONST_ADD, LOAD_CONST_SUB,
+    JUMP_IF_NOT_LT, JUMP_IF_NOT_LE, JUMP_IF_NOT_GT, JUMP_IF_NOT_GE, JUMP_IF_NOT_EQ, JUMP_IF_NOT_NE,
+    JUMP_IF_NOT_LT_SK, JUMP_IF_NOT_LE_SK, JUMP_IF_NOT_GT_SK, JUMP_IF_NOT_GE_SK, JUMP_IF_NOT_EQ_SK,
+    JUMP_IF_NOT_NE_SK, RET_SLOT, CALL_PURE, MEMO_STORE,
+) == tuple(range(37)), "opcodes renumerados: atualize os literais de execute()"
+
+OPCODE_NAMES = {
+    value: name for name, value in globals().items()
+    if name.isupper() and isinstance(value, int)
+}
+
+# Quantidade de operandos de cada opcode
+OPERANDS = {
+    LOAD: 1, CONST: 1, STORE: 1, CLEAR: 1, JUMP: 1, JUMP_IF_FALSE: 1, CALL: 1,
+    LOAD_CONST_ADD: 2, LOAD_CONST_SUB: 2, RET_SLOT: 1, CALL_PURE: 1,
+}
+OPERANDS.update(dict.fromkeys(range(JUMP_IF_NOT_LT, JUMP_IF_NOT_NE + 1), 1))
+OPERANDS.update(dict.fromkeys(range(JUMP_IF_NOT_LT_SK, JUMP_IF_NOT_NE_SK + 1), 3))
+
+_BINARY = {
+    "PLUS": ADD, "MINUS": SUB, "TIMES": MUL, "DIV": DIV,
+    "LT": LT, "LE": LE, "GT": GT, "GE": GE, "EQ": EQ, "NE": NE,
+}
+
+# Comparação -> deslocamento a partir de JUMP_IF_NOT_LT / JUMP_IF_NOT_LT_SK
+_COMPARE_OFFSET = {"LT": 0, "LE": 1, "GT": 2, "GE": 3, "EQ": 4, "NE": 5}
+
+
+class CodeFunction:
+    """
+    Uma função compilada.
+
+    Atributos:
+      name (str): Nome da função.
+      entry (int): Endereço da primeira instrução em BytecodeProgram.code.
+      n_params (int): Quantidade de parâmetros (slots 0..n_params-1).
+      n_slots (int): Quantidade total de slots locais.
+      pure (bool): Se a função é pura (ver lsi_interp.pure_functions); as
+        chamadas a ela usam CALL_PURE.
+    """
+
+    __slots__ = ("name", "entry", "n_params", "n_slots", "pure")
+
+    def __init__(self, name, n_params, n_slots, pure=False):
+        self.name = name
+        self.entry = 0
+        self.n_params = n_params
+        self.n_slots = n_slots
+        self.pure = pure
+
+
+class BytecodeProgram:
+    """
+    Programa LSI compilado.
+
+    Atributos:
+      code (array 'i'): As instruções de todas as funções.
+      consts (list): O pool de constantes inteiras.
+      functions (list): Os CodeFunction, indexados pelo operando de CALL.
+      function_index (dict): Nome -> índice em `functions`.
+      positions (dict): Endereço de instrução DIV -> (linha, coluna), para
+        reportar a divisão por zero.
+      memo_store (int): Endereço da instrução MEMO_STORE (após a última
+        função).
+    """
+
+    def __init__(self):
+        self.code = array("i")
+        self.consts = []
+        self.functions = []
+        self.function_index = {}
+        self.positions = {}
+        self.memo_store = 0
+
+
+# =========================================
+# COMPILADOR
+# =========================================
+class Compiler:
+    """
+    Compila a AST de um programa LSI para um BytecodeProgram.
+
+    Lança:
+      InterpreterError: Nos mesmos casos da resolução do Interpreter
+        (variável não declarada, função inexistente ou com o número errado
+        de argumentos, função definida duas vezes).
+    """
+
+    def __init__(self, program):
+        self.out = BytecodeProgram()
+        self._const_index = {}
+        self._nodes = []
+        pure = pure_functions(program)
+
+        for node in program.functions:
+            if node.name in self.out.function_index:
+                raise InterpreterError(f"função '{node.name}' já definida", node.line, node.col)
+            slots = function_slots(node)
+            self.out.function_index[node.name] = len(self.out.functions)
+            self.out.functions.append(
+                CodeFunction(node.name, len(node.params), len(slots), node.name in pure))
+            self._nodes.append((node, slots))
+
+    def compile(self):
+        """
+        Retorno:
+          BytecodeProgram: O programa compilado.
+        """
+
+        for fn, (node, slots) in zip(self.out.functions, self._nodes):
+            fn.entry = len(self.out.code)
+            self._slots = slots
+            self._jumps = []
+            body = list(node.body)
+
+            # A VM zera os slots locais na chamada: as declarações no início
+            # do corpo só precisam zerar os parâmetros redeclarados.
+            while body and isinstance(body[0], VarDecl):
+                for ident in body.pop(0).names:
+                    if slots[ident.name] < fn.n_params:
+                        self._emit(CLEAR, slots[ident.name])
+
+            self._block(body)
+            self._emit(RET0)
+            self._thread_jumps()
+        self.out.memo_store = self._emit(MEMO_STORE)
+        return self.out
+
+    # -------------------------------------
+    # EMISSÃO
+    # -------------------------------------
+    def _emit(self, *words):
+        self.out.code.extend(words)
+        return len(self.out.code) - 1
+
+    def _patch(self, at):
+        """Aponta o operando de salto em `at` para o endereço atual."""
+        self.out.code[at] = len(self.out.code)
+
+    def _thread_jumps(self):
+        """
+        Otimização de saltos da função recém-compilada: um JUMP para outro
+        JUMP passa a apontar para o destino final, e um JUMP para RET_SLOT
+        é substituído pelo próprio RET_SLOT (as duas instruções têm o mesmo
+        tamanho).
+        """
+
+        code = self.out.code
+        for at in self._jumps:
+            target = code[at]
+            while code[target] == JUMP:
+                target = code[target + 1]
+            if code[target] == RET_SLOT:
+                code[at - 1] = RET_SLOT
+                code[at] = code[target + 1]
+            else:
+                code[at] = target
+
+    def _const(self, value):
+        index = self._const_index.get(value)
+        if index is None:
+            index = self._const_index[value] = len(self.out.consts)
+            self.out.consts.append(value)
+        return index
+
+    # -------------------------------------
+    # COMANDOS
+    # -------------------------------------
+    def _block(self, stmts):
+        for stmt in stmts:
+            self._stmt(stmt)
+
+    def _stmt(self, node):
+        if isinstance(node, Assign):
+            self._expr(node.value)
+            self._emit(STORE, resolve_slot(node.name, node, self._slots))
+        elif isinstance(node, Print):
+            self._expr(node.value)
+            self._emit(PRINT)
+        elif isinstance(node, Return):
+            if node.value is None:
+                self._emit(RET0)
+            elif isinstance(node.value, Var):
+                self._emit(RET_SLOT, resolve_slot(node.value.name, node.value, self._slots))
+            else:
+                self._expr(node.value)
+                self._emit(RET)
+        elif isinstance(node, If):
+            jump_else = self._condition(node.cond)
+            self._block(node.body)
+            if node.orelse is None:
+                self._patch(jump_else)
+            else:
+                jump_end = self._emit(JUMP, 0)
+                self._jumps.append(jump_end)
+                self._patch(jump_else)
+                self._block(node.orelse)
+                self._patch(jump_end)
+        elif isinstance(node, Block):
+            self._block(node.body)
+        elif isinstance(node, VarDecl):
+            for ident in node.names:
+                self._emit(CLEAR, self._slots[ident.name])
+        else:
+            raise InterpreterError(f"comando não suportado: {type(node).__name__}", node.line, node.col)
+
+    def _condition(self, cond):
+        """
+        Emite o teste de um `if` e um salto (ainda sem destino) para o caso
+        falso. Comparações viram uma única instrução JUMP_IF_NOT_<cmp>, ou
+        JUMP_IF_NOT_<cmp>_SK quando comparam uma variável a uma constante.
+
+        Retorno:
+          int: A posição do operando do salto, para _patch.
+        """
+
+        if isinstance(cond, BinOp) and cond.op in _COMPARE_OFFSET:
+            offset = _COMPARE_OFFSET[cond.op]
+            if isinstance(cond.left, Var) and isinstance(cond.right, Num):
+                slot = resolve_slot(cond.left.name, cond.left, self._slots)
+                return self._emit(JUMP_IF_NOT_LT_SK + offset, slot, self._const(cond.right.value), 0)
+            self._expr(cond.left)
+            self._expr(cond.right)
+            return self._emit(JUMP_IF_NOT_LT + offset, 0)
+        self._expr(cond)
+        return self._emit(JUMP_IF_FALSE, 0)
+
+    # -------------------------------------
+    # EXPRESSÕES
+    # -------------------------------------
+    def _expr(self, node):
+        if isinstance(node, Num):
+            self._emit(CONST, self._const(node.value))
+        elif isinstance(node, Var):
+            self._emit(LOAD, resolve_slot(node.name, node, self._slots))
+        elif isinstance(node, BinOp):
+            if (node.op in ("PLUS", "MINUS") and isinstance(node.left, Var)
+                    and isinstance(node.right, Num)):
+                slot = resolve_slot(node.left.name, node.left, self._slots)
+                op = LOAD_CONST_ADD if node.op == "PLUS" else LOAD_CONST_SUB
+                self._emit(op, slot, self._const(node.right.value))
+                return
+            self._expr(node.left)
+            self._expr(node.right)
+            at = self._emit(_BINARY[node.op])
+            if node.op == "DIV":
+                self.out.positions[at] = (node.line, node.col)
+        elif isinstance(node, Call):
+            index = self.out.function_index.get(node.name)
+            if index is None:
+                raise InterpreterError(f"função '{node.name}' não definida", node.line, node.col)
+            fn = self.out.functions[index]
+            if len(node.args) != fn.n_params:
+                raise InterpreterError(
+                    f"'{node.name}' espera {fn.n_params} argumento(s), recebeu {len(node.args)}",
+                    node.line, node.col,
+                )
+            for arg in node.args:
+                self._expr(arg)
+            self._emit(CALL_PURE if fn.pure else CALL, index)
+        else:
+            raise InterpreterError(f"expressão não suportada: {type(node).__name__}", node.line, node.col)
+
+
+def compile_program(program):
+    """
+    Compila a AST `program` (lsi_ast.Program) para um BytecodeProgram.
+    """
+
+    return Compiler(program).compile()
+
+
+def disassemble(bytecode):
+    """
+    Retorna a listagem textual do bytecode, uma instrução por linha.
+    """
+
+    code = bytecode.code
+    entries = {fn.entry: fn.name for fn in bytecode.functions}
+    lines = []
+    pc = 0
+    while pc < len(code):
+        if pc in entries:
+            lines.append(f"{entries[pc]}:")
+        elif pc == bytecode.memo_store:
+            lines.append("<memo>:")
+        op = code[pc]
+        args = list(code[pc + 1:pc + 1 + OPERANDS.get(op, 0)])
+        text = f"  {pc:5d} {OPCODE_NAMES[op]:20}" + " ".join(map(str, args))
+        if op == CONST:
+            text += f"    ({bytecode.consts[args[0]]})"
+        elif op in (CALL, CALL_PURE):
+            text += f"    ({bytecode.functions[args[0]].name})"
+        lines.append(text.rstrip())
+        pc += 1 + len(args)
+    return "\n".join(lines)
+
+
+# =========================================
+# MÁQUINA VIRTUAL
+# =========================================
+def _without_memo(code):
+    """Cópia em lista de `code` com cada CALL_PURE trocada por CALL."""
+
+    code = code.tolist()
+    pc = 0
+    while pc < len(code):
+        op = code[pc]
+        if op == CALL_PURE:
+            code[pc] = CALL
+        pc += 1 + OPERANDS.get(op, 0)
+    return code
+
+
+def execute(bytecode, entry=DEFAULT_ENTRY, args=(), out=None, memo=None):
+    """
+    Executa a função `entry` do programa compilado.
+
+    O laço de despacho lê as instruções de uma cópia em lista de `code`
+    (o acesso a um array('i') cria um objeto int a cada leitura) e compara
+    o opcode com literais (uma variável global custaria uma busca por
+    teste), com os opcodes mais frequentes testados primeiro.
+
+    Com `memo`, uma CALL_PURE consulta o cache com a chave (índice da
+    função, argumentos...). Em uma falha, a função é chamada com endereço
+    de retorno MEMO_STORE, que grava o resultado no cache e segue para o
+    endereço de retorno real (guardado em uma pilha à parte). Sem `memo`,
+    as CALL_PURE são trocadas por CALL antes da execução.
+
+    Parâmetros:
+      bytecode (BytecodeProgram): O programa compilado.
+      entry (str): A função de entrada (padrão: principal).
+      args (tuple): Os argumentos inteiros da função de entrada.
+      out (file): Destino do `print` (padrão: sys.stdout).
+      memo (lsi_interp.MemoCache): Cache das chamadas a funções puras
+        (padrão: sem memoização).
+
+    Retorno:
+      int: O valor devolvido pela função de entrada.
+
+    Lança:
+      InterpreterError: Se `entry` não existir ou receber o número errado de
+        argumentos, ou em uma divisão por zero.
+    """
+
+    index = bytecode.function_index.get(entry)
+    if index is None:
+        raise InterpreterError(f"função de entrada '{entry}' não definida")
+    fn = bytecode.functions[index]
+    if len(args) != fn.n_params:
+        raise InterpreterError(f"'{entry}' espera {fn.n_params} argumento(s), recebeu {len(args)}")
+
+    output = BufferedOutput(out if out is not None else sys.stdout)
+    write = output.write
+    if memo is None:
+        code = _without_memo(bytecode.code)
+    else:
+        code = bytecode.code.tolist()
+        lookup, store, missing = memo.lookup, memo.store, MemoCache.MISSING
+        memo_store = bytecode.memo_store
+        pending = []  # (chave, endereço de retorno) das CALL_PURE em andamento
+    consts = bytecode.consts
+    functions = [(f.entry, f.n_params, f.n_slots - f.n_params) for f in bytecode.functions]
+
+    stack = [int(a) for a in args] + [0] * (fn.n_slots - fn.n_params)
+    push = stack.append
+    pop = stack.pop
+    calls = []  # (endereço de retorno, bp) de cada chamada ativa
+    bp = 0
+    pc = fn.entry
+
+    try:
+        while True:
+            op = code[pc]
+
+            if op == 0:  # LOAD
+                push(stack[bp + code[pc + 1]])
+                pc += 2
+            elif op == 1:  # CONST
+                push(consts[code[pc + 1]])
+                pc += 2
+            elif op == 21:  # LOAD_CONST_SUB
+                push(stack[bp + code[pc + 1]] - consts[code[pc + 2]])
+                pc += 3
+            elif op == 16:  # CALL
+                f_entry, n_params, n_locals = functions[code[pc + 1]]
+                calls.append((pc + 2, bp))
+                bp = len(stack) - n_params
+                if n_locals:
+                    stack.extend([0] * n_locals)
+                pc = f_entry
+            elif op == 34:  # RET_SLOT
+                value = stack[bp + code[pc + 1]]
+                del stack[bp:]
+                if not calls:
+                    return value
+                push(value)
+                pc, bp = calls.pop()
+            elif 28 <= op <= 33:  # JUMP_IF_NOT_<cmp>_SK
+                a = stack[bp + code[pc + 1]]
+                b = consts[code[pc + 2]]
+                if op == 32:  # JUMP_IF_NOT_EQ_SK
+                    taken = a != b
+                elif op == 30:  # JUMP_IF_NOT_GT_SK
+                    taken = a <= b
+                elif op == 28:  # JUMP_IF_NOT_LT_SK
+                    taken = a >= b
+                elif op == 33:  # JUMP_IF_NOT_NE_SK
+                    taken = a == b
+                elif op == 29:  # JUMP_IF_NOT_LE_SK
+                    taken = a > b
+                else:  # JUMP_IF_NOT_GE_SK
+                    taken = a < b
+                pc = code[pc + 3] if taken else pc + 4
+            elif op == 2:  # STORE
+                stack[bp + code[pc + 1]] = pop()
+                pc += 2
+            elif 4 <= op <= 13:  # ADD..NE
+                b = pop()
+                a = stack[-1]
+                if op == 4:  # ADD
+                    stack[-1] = a + b
+                elif op == 5:  # SUB
+                    stack[-1] = a - b
+                elif op == 6:  # MUL
+                    stack[-1] = a * b
+                elif op == 7:  # DIV
+                    if b == 0:
+                        raise InterpreterError("divisão por zero", *bytecode.positions[pc])
+                    stack[-1] = _div(a, b)
+                elif op == 8:  # LT
+                    stack[-1] = 1 if a < b else 0
+                elif op == 9:  # LE
+                    stack[-1] = 1 if a <= b else 0
+                elif op == 10:  # GT
+                    stack[-1] = 1 if a > b else 0
+                elif op == 11:  # GE
+                    stack[-1] = 1 if a >= b else 0
+                elif op == 12:  # EQ
+                    stack[-1] = 1 if a == b else 0
+                else:  # NE
+                    stack[-1] = 1 if a != b else 0
+                pc += 1
+            elif 22 <= op <= 27:  # JUMP_IF_NOT_<cmp>
+                b = pop()
+                a = pop()
+                if op == 26:  # JUMP_IF_NOT_EQ
+                    taken = a != b
+                elif op == 24:  # JUMP_IF_NOT_GT
+                    taken = a <= b
+                elif op == 22:  # JUMP_IF_NOT_LT
+                    taken = a >= b
+                elif op == 27:  # JUMP_IF_NOT_NE
+                    taken = a == b
+                elif op == 23:  # JUMP_IF_NOT_LE
+                    taken = a > b
+                else:  # JUMP_IF_NOT_GE
+                    taken = a < b
+                pc = code[pc + 1] if taken else pc + 2
+            elif op == 20:  # LOAD_CONST_ADD
+                push(stack[bp + code[pc + 1]] + consts[code[pc + 2]])
+                pc += 3
+            elif op == 17:  # RET
+                value = pop()
+                del stack[bp:]
+                if not calls:
+                    return value
+                push(value)
+                pc, bp = calls.pop()
+            elif op == 14:  # JUMP
+                pc = code[pc + 1]
+            elif op == 15:  # JUMP_IF_FALSE
+                pc = code[pc + 1] if pop() == 0 else pc + 2
+            elif op == 18:  # RET0
+                del stack[bp:]
+                if not calls:
+                    return 0
+                push(0)
+                pc, bp = calls.pop()
+            elif op == 19:  # PRINT
+                write(pop())
+                pc += 1
+            elif op == 3:  # CLEAR
+                stack[bp + code[pc + 1]] = 0
+                pc += 2
+            elif op == 35:  # CALL_PURE
+                f = code[pc + 1]
+                f_entry, n_params, n_locals = functions[f]
+                base = len(stack) - n_params
+                key = (f, *stack[base:])
+                value = lookup(key)
+                if value is missing:
+                    pending.append((key, pc + 2))
+                    calls.append((memo_store, bp))
+                    bp = base
+                    if n_locals:
+                        stack.extend([0] * n_locals)
+                    pc = f_entry
+                else:
+                    del stack[base:]
+                    push(value)
+                    pc += 2
+            elif op == 36:  # MEMO_STORE
+                key, pc = pending.pop()
+                store(key, stack[-1])
+            else:
+                raise InterpreterError(f"opcode inválido {op} em {pc}")
+    finally:
+        output.flush()
+
+
+# =========================================
+# MAIN
+# =========================================
+if __name__ == "__main__":
+    import argparse
+    from lsi_lexer import LexerError
+    from lsi_opt import PASSES, format_stats, optimize
+
+    """
+    Compila um programa LSI para bytecode e o executa na VM a partir da
+    função de entrada (padrão: principal). --dis exibe o bytecode.
+    """
+
+    ap = argparse.ArgumentParser(description="Compilador de bytecode e VM da linguagem LSI.")
+    ap.add_argument("file", help="arquivo .lsi de entrada")
+    ap.add_argument("args", nargs="*", type=int, help="argumentos inteiros da função de entrada")
+    ap.add_argument("--entry", default=DEFAULT_ENTRY, help="função de entrada (padrão: principal)")
+    ap.add_argument("-O", "--optimize", action="store_true", help="aplica os passes do lsi_opt antes da execução")
+    ap.add_argument("--disable", action="append", default=[], choices=list(PASSES),
+                    metavar="PASS", help=f"com -O, desliga um pass ({', '.join(PASSES)}); pode repetir")
+    ap.add_argument("--opt-stats", action="store_true", help="com -O, exibe as estatísticas dos passes em stderr")
+    ap.add_argument("--memo", action="store_true", help="memoiza as chamadas a funções puras (cache LRU)")
+    ap.add_argument("--memo-size", type=int, default=DEFAULT_MEMO_SIZE, metavar="N",
+                    help=f"capacidade do cache de --memo (padrão: {DEFAULT_MEMO_SIZE})")
+    ap.add_argument("--memo-stats", action="store_true", help="com --memo, exibe acertos e falhas do cache em stderr")
+    ap.add_argument("--dis", action="store_true", help="exibe o bytecode em vez de executar")
+    args = ap.parse_args()
+
+    with open(args.file) as f:
+        text = f.read()
+
+    try:
+        program = load_program(text)
+    except LexerError as e:
+        print(f"\n=== ERRO LÉXICO ===")
+        print(e)
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n=== ERRO SINTÁTICO ===")
+        print(e)
+        sys.exit(1)
+
+    if args.optimize:
+        stats = optimize(program, disabled=args.disable)
+        if args.opt_stats:
+            print(format_stats(stats), file=sys.stderr)
+
+    memo = MemoCache(args.memo_size) if args.memo else None
+    try:
+        bytecode = compile_program(program)
+        if args.dis:
+            print(disassemble(bytecode))
+        else:
+            execute(bytecode, args.entry, args.args, memo=memo)
+    except InterpreterError as e:
+        print(f"\n=== ERRO DE EXECUÇÃO ===")
+        print(e)
+        sys.exit(1)
+    finally:
+        if memo is not None and args.memo_stats:
+            print(memo.stats(), file=sys.stderr)
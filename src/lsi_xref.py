@@ -0,0 +1,320 @@
+import base64
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from array import array
+from itertools import accumulate
+
+# =========================================
+# ÍNDICE DE REFERÊNCIAS CRUZADAS
+# =========================================
+#
+# Para cada identificador, as ocorrências de definição (o nome de um FDEF,
+# de um PARAM ou de uma VARLIST) e de uso (atribuição, variável, chamada).
+# O índice é montado na própria passada do parser (Parser.parse_xref): cada
+# expansão de uma produção que contém `id` registra o índice do token e o
+# papel do nome, sem nenhuma varredura extra dos tokens.
+#
+# Formato compacto (como uma matriz esparsa em linhas, CSR): as ocorrências
+# de todos os nomes ficam em arrays paralelos (deslocamento, linha, coluna,
+# tipo), agrupadas por nome e, dentro de cada nome, definições antes dos
+# usos, na ordem do código. `bounds[i]..bounds[i + 1]` delimita as
+# ocorrências do nome i e `splits[i]`, o início dos seus usos. A consulta de
+# um nome é uma busca no dicionário nome -> índice mais duas fatias.
+#
+# O índice pode ser gravado ao lado do fonte (`<arquivo>.xref`, JSON com os
+# arrays em base64) junto com o hash SHA-256 do conteúdo: enquanto o arquivo
+# não muda, as consultas leem o índice sem repetir a análise léxica.
+
+XREF_VERSION = 1
+XREF_SUFFIX = ".xref"
+
+# Tipos das ocorrências
+FUNCTION, PARAM, VAR, USE = range(4)
+KIND_NAMES = ("function", "param", "var", "use")
+
+# Papel do `id` de cada produção que o contém (o Não-Terminal do lado
+# esquerdo); as demais (ATRIBST, FACTOR, FCALL) são usos
+DEFINITION_KINDS = {"FDEF": FUNCTION, "PARAM": PARAM, "VARLIST": VAR, "VARLIST_TAIL": VAR}
+
+_ARRAYS = (("offsets", "I"), ("lines", "I"), ("cols", "I"), ("kinds", "B"),
+           ("bounds", "I"), ("splits", "I"))
+
+
+def source_hash(data):
+    """Retorna o hash SHA-256 (hex) do conteúdo `data` (str ou bytes)."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+class XrefIndex:
+    """
+    Índice de referências cruzadas de um arquivo (ver o comentário do módulo).
+
+    Atributos:
+      names (list): Os nomes, na ordem da primeira ocorrência.
+      offsets, lines, cols (array 'I'): Posição de cada ocorrência
+        (deslocamento no código-fonte, como em TokenBuffer.starts).
+      kinds (array 'B'): Tipo de cada ocorrência (FUNCTION, PARAM, VAR, USE).
+      bounds (array 'I'): Início das ocorrências de cada nome (len(names) + 1
+        posições).
+      splits (array 'I'): Início dos usos de cada nome.
+      source_hash (str): Hash do código-fonte indexado (ou None).
+    """
+
+    def __init__(self, names, offsets, lines, cols, kinds, bounds, splits, source_hash=None):
+        self.names = names
+        self.offsets = offsets
+        self.lines = lines
+        self.cols = cols
+        self.kinds = kinds
+        self.bounds = bounds
+        self.splits = splits
+        self.source_hash = source_hash
+        self._ids = {name: i for i, name in enumerate(names)}
+
+    @classmethod
+    def from_occurrences(cls, tokens, positions, kinds, source_hash=None):
+        """
+        Monta o índice a partir das ocorrências registradas pelo parser.
+
+        As ocorrências são agrupadas por nome com uma ordenação por contagem
+        (estável, em tempo linear): cada grupo fica com as definições e depois
+        os usos, na ordem do código.
+
+        Parâmetros:
+          tokens (TokenBuffer): Os tokens analisados.
+          positions (array): Índice do token de cada ocorrência.
+          kinds (array): Tipo de cada ocorrência.
+        """
+
+        ids = {}
+        lexeme = tokens.lexeme
+        # chave de cada ocorrência: 2 * índice do nome (+1 para os usos)
+        keys = [2 * ids.setdefault(lexeme(i), len(ids)) + (kind == USE)
+                for i, kind in zip(positions, kinds)]
+        n = len(ids)
+
+        # início de cada grupo (nome, definições/usos), por contagem
+        counts = [0] * (2 * n + 1)
+        for key in keys:
+            counts[key + 1] += 1
+        starts = list(accumulate(counts))
+        bounds = array("I", starts[0::2])
+        splits = array("I", starts[1::2])
+
+        order = [0] * len(keys)
+        for occ, key in enumerate(keys):
+            order[starts[key]] = occ
+            starts[key] += 1
+        at = array("I", map(positions.__getitem__, order))
+
+        return cls(
+            list(ids),
+            array("I", map(tokens.starts.__getitem__, at)),
+            array("I", map(tokens.lines.__getitem__, at)),
+            array("I", map(tokens.cols.__getitem__, at)),
+            array("B", map(kinds.__getitem__, order)),
+            bounds, splits, source_hash,
+        )
+
+    def __contains__(self, name):
+        return name in self._ids
+
+    def __len__(self):
+        return len(self.names)
+
+    def _occurrences(self, start, stop):
+        return [(KIND_NAMES[self.kinds[i]], self.offsets[i], self.lines[i], self.cols[i])
+                for i in range(start, stop)]
+
+    def definitions(self, name):
+        """
+        Retorna as definições de `name`: lista de (tipo, deslocamento, linha,
+        coluna), com tipo "function", "param" ou "var"; vazia se o nome não
+        ocorre no arquivo.
+        """
+
+        i = self._ids.get(name)
+        if i is None:
+            return []
+        return self._occurrences(self.bounds[i], self.splits[i])
+
+    def uses(self, name):
+        """
+        Retorna os usos de `name` (tipo "use"), no mesmo formato de
+        definitions.
+        """
+
+        i = self._ids.get(name)
+        if i is None:
+            return []
+        return self._occurrences(self.splits[i], self.bounds[i + 1])
+
+    def counts(self, name):
+        """Retorna (definições, usos) de `name`, sem criar as ocorrências."""
+        i = self._ids.get(name)
+        if i is None:
+            return 0, 0
+        return self.splits[i] - self.bounds[i], self.bounds[i + 1] - self.splits[i]
+
+    # -----------------------------------------
+    # Serialização
+    # -----------------------------------------
+    def to_dict(self):
+        data = {"version": XREF_VERSION, "byteorder": sys.byteorder,
+                "source_hash": self.source_hash, "names": self.names}
+        for field, _ in _ARRAYS:
+            data[field] = base64.b64encode(getattr(self, field).tobytes()).decode("ascii")
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Lança:
+          ValueError: Se o formato for de outra versão.
+        """
+        if data.get("version") != XREF_VERSION:
+            raise ValueError(f"versão do índice {data.get('version')} (esperada {XREF_VERSION})")
+        arrays = {}
+        for field, code in _ARRAYS:
+            a = array(code)
+            a.frombytes(base64.b64decode(data[field]))
+            if data["byteorder"] != sys.byteorder:
+                a.byteswap()
+            arrays[field] = a
+        return cls(data["names"], source_hash=data["source_hash"], **arrays)
+
+    def save(self, path):
+        """
+        Grava o índice em `path` (JSON). A escrita é atômica (arquivo
+        temporário + rename).
+        """
+
+        directory = os.path.dirname(path) or "."
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Lê um índice gravado por save.
+
+        Lança:
+          OSError, ValueError, KeyError: Se o arquivo não existir ou for
+            inválido.
+        """
+
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def index_source(data, parser=None):
+    """
+    Executa as análises léxica e sintática de `data` (str ou bytes) e
+    retorna o seu XrefIndex.
+
+    Lança:
+      LexerError: Em caso de erro léxico.
+      Exception: Em caso de erro sintático.
+    """
+
+    from lsi_lexer import RegexLexer, decode_source
+    from lsi_parser import Parser
+
+    text = data if isinstance(data, str) else decode_source(data)
+    tokens, _ = RegexLexer(text).tokenize_all(as_buffer=True)
+    index = (parser or Parser()).parse_xref(tokens)
+    index.source_hash = source_hash(data)
+    return index
+
+
+def load_or_build(path, parser=None, save=True):
+    """
+    Retorna o índice do arquivo `path`: o gravado em `path + XREF_SUFFIX`,
+    se ele corresponder ao conteúdo atual do arquivo, ou um novo (gravado ao
+    lado do fonte, se `save`).
+
+    Retorno:
+      tuple: (XrefIndex, bool lido do disco)
+    """
+
+    with open(path, "rb") as f:
+        data = f.read()
+    digest = source_hash(data)
+    try:
+        index = XrefIndex.load(path + XREF_SUFFIX)
+        if index.source_hash == digest:
+            return index, True
+    except (OSError, ValueError, KeyError):
+        pass
+
+    index = index_source(data, parser)
+    if save:
+        try:
+            index.save(path + XREF_SUFFIX)
+        except OSError:
+            pass
+    return index, False
+
+
+# =========================================
+# MAIN
+# =========================================
+if __name__ == "__main__":
+    import argparse
+    from lsi_batch import expand_inputs
+    from lsi_parser import Parser
+
+    """
+    Consulta as definições e os usos de nomes em arquivos .lsi, no formato
+    arquivo:linha:coluna: tipo nome. Sem --name, lista os nomes de cada
+    arquivo com a quantidade de definições e de usos.
+    """
+
+    ap = argparse.ArgumentParser(description="Índice de referências cruzadas de arquivos .lsi.")
+    ap.add_argument("inputs", nargs="+", metavar="ENTRADA",
+                    help="arquivo, diretório (recursivo) ou padrão glob")
+    ap.add_argument("-n", "--name", action="append", default=[],
+                    help="nome a consultar; pode repetir")
+    ap.add_argument("--definitions", action="store_true", help="mostra apenas as definições")
+    ap.add_argument("--no-save", action="store_true", help="não grava os índices ao lado dos fontes")
+    args = ap.parse_args()
+
+    try:
+        files = expand_inputs(args.inputs)
+    except FileNotFoundError as e:
+        ap.error(str(e))
+
+    parser = Parser()
+    loaded = built = failed = 0
+    for path in files:
+        try:
+            index, cached = load_or_build(path, parser, save=not args.no_save)
+        except Exception as e:  # OSError, UnicodeDecodeError, LexerError ou erro sintático
+            print(f"{path}: {e}", file=sys.stderr)
+            failed += 1
+            continue
+        loaded += cached
+        built += not cached
+
+        if not args.name:
+            for name in index.names:
+                n_defs, n_uses = index.counts(name)
+                print(f"{path}: {name}: {n_defs} definição(ões), {n_uses} uso(s)")
+            continue
+        for name in args.name:
+            occurrences = index.definitions(name)
+            if not args.definitions:
+                occurrences += index.uses(name)
+            for kind, _, line, col in occurrences:
+                print(f"{path}:{line}:{col}: {kind} {name}")
+
+    print(f"{len(files)} arquivo(s): {loaded} índice(s) lido(s), {built} construído(s), {failed} com erro",
+          file=sys.stderr)
+    sys.exit(1 if failed else 0)